@@ -0,0 +1,239 @@
+from __future__ import annotations
+
+import math
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+import numpy.typing as npt
+
+from .collision import points_in_collision
+from .control import PurePursuitParams
+from .costmap import CostMapLike
+from .localization import LocalizationParams
+from .sim import SimParams
+
+Point = Tuple[float, float]
+Pose = Tuple[float, float, float]
+FloatArray = npt.NDArray[np.float64]
+IntArray = npt.NDArray[np.int64]
+BoolArray = npt.NDArray[np.bool_]
+
+
+@dataclass
+class BatchResult:
+    # Per-trial outcome of a lockstep batch; poses are only kept with record=True.
+    steps: IntArray
+    final_poses: FloatArray
+    traj_length: FloatArray
+    collision: BoolArray
+    poses: List[List[Pose]] | None = None
+    est_poses: List[List[Pose]] | None = None
+    # Wall time of the whole batch spent computing commands and checking collisions.
+    stage_seconds: Dict[str, float] = field(default_factory=dict)
+
+
+def _wrap_angle(angle: FloatArray) -> FloatArray:
+    # Same subtraction sequence as control._wrap_angle, applied elementwise.
+    angle = angle.copy()
+    while True:
+        high = angle > math.pi
+        if not high.any():
+            break
+        angle[high] -= 2.0 * math.pi
+    while True:
+        low = angle < -math.pi
+        if not low.any():
+            break
+        angle[low] += 2.0 * math.pi
+    return angle
+
+
+def _bmm(a: FloatArray, b: FloatArray) -> FloatArray:
+    # Batched matrix product summed term by term in the order the scalar EKF's
+    # _mat_mul uses, so batched and per-trial estimates round the same way.
+    a, b = np.broadcast_arrays(a[..., :, :, None], b[..., None, :, :])
+    out = a[..., :, 0, :] * b[..., :, 0, :]
+    for k in range(1, a.shape[-2]):
+        out = out + a[..., :, k, :] * b[..., :, k, :]
+    return out
+
+
+class _BatchEKF:
+    def __init__(self, start: FloatArray, params: LocalizationParams) -> None:
+        self.params = params
+        self.x = start.copy()
+        self.P = np.tile(np.eye(3) * params.init_cov, (len(start), 1, 1))
+        noise = params.noise
+        q_xy = noise.odom_std_v
+        q_yaw = noise.odom_std_omega
+        self._q_rates = (q_xy, q_yaw)
+        self._r = np.array([[noise.meas_std_x**2, 0.0], [0.0, noise.meas_std_y**2]])
+        self._h = np.array([[1.0, 0.0, 0.0], [0.0, 1.0, 0.0]])
+
+    def predict(self, idx: IntArray, v: FloatArray, omega: FloatArray, dt: float) -> None:
+        x, y, yaw = self.x[idx, 0], self.x[idx, 1], self.x[idx, 2]
+        sin_yaw = np.sin(yaw)
+        cos_yaw = np.cos(yaw)
+        self.x[idx, 0] = x + v * cos_yaw * dt
+        self.x[idx, 1] = y + v * sin_yaw * dt
+        self.x[idx, 2] = _wrap_angle(yaw + omega * dt)
+        f = np.zeros((len(idx), 3, 3))
+        f[:, 0, 0] = f[:, 1, 1] = f[:, 2, 2] = 1.0
+        f[:, 0, 2] = -v * dt * sin_yaw
+        f[:, 1, 2] = v * dt * cos_yaw
+        q_xy = self._q_rates[0] * dt
+        q_yaw = self._q_rates[1] * dt
+        q = np.diag([q_xy * q_xy, q_xy * q_xy, q_yaw * q_yaw])
+        fpf = _bmm(_bmm(f, self.P[idx]), f.transpose(0, 2, 1))
+        self.P[idx] = fpf + q
+
+    def update(self, idx: IntArray, z_x: FloatArray, z_y: FloatArray) -> None:
+        h = self._h
+        P = self.P[idx]
+        s = _bmm(_bmm(h, P), h.T) + self._r
+        det = s[:, 0, 0] * s[:, 1, 1] - s[:, 0, 1] * s[:, 1, 0]
+        ok = np.abs(det) >= 1e-9
+        idx, P, s, det = idx[ok], P[ok], s[ok], det[ok]
+        if not len(idx):
+            return
+        s_inv = np.empty_like(s)
+        s_inv[:, 0, 0] = s[:, 1, 1] / det
+        s_inv[:, 0, 1] = -s[:, 0, 1] / det
+        s_inv[:, 1, 0] = -s[:, 1, 0] / det
+        s_inv[:, 1, 1] = s[:, 0, 0] / det
+        k = _bmm(_bmm(P, h.T), s_inv)
+        x = self.x[idx]
+        y_res = np.stack([z_x[ok] - x[:, 0], z_y[ok] - x[:, 1]], axis=1)[:, :, None]
+        x_update = _bmm(k, y_res)[:, :, 0]
+        self.x[idx, 0] = x[:, 0] + x_update[:, 0]
+        self.x[idx, 1] = x[:, 1] + x_update[:, 1]
+        self.x[idx, 2] = _wrap_angle(x[:, 2] + x_update[:, 2])
+        self.P[idx] = _bmm(np.eye(3) - _bmm(k, h), P)
+
+
+def _pad_paths(paths: Sequence[List[Point]]) -> Tuple[FloatArray, IntArray]:
+    lengths = np.array([len(path) for path in paths], dtype=np.int64)
+    if (lengths == 0).any():
+        raise ValueError("Batch simulation needs non-empty paths.")
+    points = np.empty((len(paths), int(lengths.max()), 2))
+    for i, path in enumerate(paths):
+        points[i, : len(path)] = path
+        points[i, len(path) :] = path[-1]
+    return points, lengths
+
+
+def simulate_path_batch(
+    paths: Sequence[List[Point]],
+    start_poses: Sequence[Pose],
+    params: SimParams,
+    ctrl_params: PurePursuitParams,
+    loc_params: LocalizationParams | None = None,
+    costmap: CostMapLike | None = None,
+    record: bool = False,
+) -> BatchResult:
+    # Pure pursuit for N trials in lockstep: struct-of-arrays poses, target
+    # indices and an active mask, so each tick is a few array operations over
+    # the trials still running. Trajectories match simulate_path (or, with
+    # loc_params, simulate_path_localized) run one trial at a time up to
+    # floating-point rounding of the vectorized trig. Every trial re-seeds its
+    # noise identically, so step k draws the same samples for all of them.
+    count = len(paths)
+    points, lengths = _pad_paths(paths) if count else (np.empty((0, 1, 2)), np.zeros(0, np.int64))
+    goals = points[np.arange(count), lengths - 1] if count else np.empty((0, 2))
+    pose = np.array(start_poses, dtype=np.float64).reshape(count, 3)
+    ekf = _BatchEKF(pose, loc_params) if loc_params is not None else None
+    rng = random.Random(loc_params.seed) if loc_params is not None else None
+
+    target = np.zeros(count, dtype=np.int64)
+    steps = np.zeros(count, dtype=np.int64)
+    traj_length = np.zeros(count)
+    active = np.ones(count, dtype=bool)
+    collision = np.zeros(count, dtype=bool)
+    stage_seconds = {"control": 0.0, "collision": 0.0}
+    if costmap is not None and count:
+        collision |= points_in_collision(costmap, pose[:, 0], pose[:, 1])
+    history: List[FloatArray] = [pose.copy()] if record else []
+    est_history: List[FloatArray] = [pose.copy()] if record and ekf is not None else []
+
+    lookahead = ctrl_params.lookahead
+    speed = ctrl_params.speed
+    dt = params.dt
+    rows = np.arange(count)
+    for _ in range(params.max_steps):
+        control = pose if ekf is None else ekf.x
+        reached = np.hypot(goals[:, 0] - control[:, 0], goals[:, 1] - control[:, 1])
+        active &= ~(reached <= params.goal_tolerance)
+        idx = rows[active]
+        if not len(idx):
+            break
+        t0 = time.perf_counter()
+        cx, cy, cyaw = control[idx, 0], control[idx, 1], control[idx, 2]
+
+        # Advance each target to the first waypoint at least lookahead away.
+        tgt = target[idx]
+        last = lengths[idx] - 1
+        pending = np.arange(len(idx))
+        while len(pending):
+            px = points[idx[pending], tgt[pending], 0]
+            py = points[idx[pending], tgt[pending], 1]
+            near = np.hypot(px - cx[pending], py - cy[pending]) < lookahead
+            pending = pending[near & (tgt[pending] < last[pending])]
+            tgt[pending] += 1
+        target[idx] = tgt
+
+        tx = points[idx, tgt, 0]
+        ty = points[idx, tgt, 1]
+        alpha = _wrap_angle(np.arctan2(ty - cy, tx - cx) - cyaw)
+        curvature = 2.0 * np.sin(alpha) / max(lookahead, 1e-3)
+        omega = np.clip(curvature * speed, -ctrl_params.max_omega, ctrl_params.max_omega)
+        stage_seconds["control"] += time.perf_counter() - t0
+
+        x, y, yaw = pose[idx, 0], pose[idx, 1], pose[idx, 2]
+        nx = x + speed * np.cos(yaw) * dt
+        ny = y + speed * np.sin(yaw) * dt
+        pose[idx, 0] = nx
+        pose[idx, 1] = ny
+        pose[idx, 2] = yaw + omega * dt
+        traj_length[idx] += np.hypot(x - nx, y - ny)
+        steps[idx] += 1
+        if costmap is not None:
+            t0 = time.perf_counter()
+            collision[idx] |= points_in_collision(costmap, nx, ny)
+            stage_seconds["collision"] += time.perf_counter() - t0
+
+        if ekf is not None and rng is not None:
+            noise = ekf.params.noise
+            v_noise = rng.gauss(0.0, noise.odom_std_v)
+            omega_noise = rng.gauss(0.0, noise.odom_std_omega)
+            ekf.predict(idx, np.full(len(idx), speed + v_noise), omega + omega_noise, dt)
+            z_x = nx + rng.gauss(0.0, noise.meas_std_x)
+            z_y = ny + rng.gauss(0.0, noise.meas_std_y)
+            ekf.update(idx, z_x, z_y)
+        if record:
+            history.append(pose.copy())
+            if ekf is not None:
+                est_history.append(ekf.x.copy())
+
+    result = BatchResult(
+        steps=steps,
+        final_poses=pose,
+        traj_length=traj_length,
+        collision=collision,
+        stage_seconds=stage_seconds,
+    )
+    if record:
+        result.poses = _split_history(history, steps)
+        if ekf is not None:
+            result.est_poses = _split_history(est_history, steps)
+    return result
+
+
+def _split_history(history: List[FloatArray], steps: IntArray) -> List[List[Pose]]:
+    stacked = np.stack(history)
+    return [
+        [(x, y, yaw) for x, y, yaw in stacked[: int(n) + 1, i].tolist()]
+        for i, n in enumerate(steps)
+    ]
@@ -5,20 +5,24 @@ import csv
 import random
 import statistics
 import time
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Tuple
+from typing import Dict, List, Optional, Sequence, Tuple
 
+import numpy as np
 import yaml
 
+from navsim.batch import simulate_path_batch
 from navsim.collision import trajectory_in_collision
 from navsim.control import PurePursuitParams
 from navsim.costmap import CostMap
 from navsim.local_planner import DWAParams
-from navsim.map import GridMap, demo_grid
+from navsim.map import GridMap, demo_grid, load_map
 from navsim.metrics import final_distance, goal_reached, path_length, trajectory_length
-from navsim.planner import plan_path
-from navsim.sim import SimParams, simulate_dwa, simulate_path
+from navsim.plan_cache import PlanCache
+from navsim.planner import PlanResult, plan_path
+from navsim.sim import DWAController, PurePursuitController, SimParams, Simulator
 
 Node = Tuple[int, int]
 Point = Tuple[float, float]
@@ -32,6 +36,7 @@ class BenchmarkConfig:
     lookahead: float
     speed: float
     dwa: DWAParams
+    plan_cache: Optional[PlanCache] = None
 
 
 def _load_config(path: Path) -> BenchmarkConfig:
@@ -57,16 +62,35 @@ def _load_config(path: Path) -> BenchmarkConfig:
     )
 
 
-def _free_cells(costmap: CostMap) -> List[Node]:
-    cells: List[Node] = []
-    for y in range(costmap.height):
-        for x in range(costmap.width):
-            if not costmap.is_occupied((x, y)):
-                cells.append((x, y))
-    return cells
+class _FreeCells(Sequence[Node]):
+    # Free costmap cells in row-major order without materializing them: only
+    # per-row counts are kept, and a cell is located when indexed. Sampling
+    # with random.choice picks exactly the cells it would from the full list.
+    def __init__(self, costmap: CostMap, rows_per_chunk: int = 1024) -> None:
+        self.inflated = costmap.inflated
+        counts = [
+            np.count_nonzero(self.inflated[y0 : y0 + rows_per_chunk] == 0, axis=1)
+            for y0 in range(0, costmap.height, rows_per_chunk)
+        ]
+        self._ends = np.cumsum(np.concatenate(counts)) if counts else np.zeros(0, np.int64)
 
+    def __len__(self) -> int:
+        return int(self._ends[-1]) if len(self._ends) else 0
 
-def _sample_start_goal(rng: random.Random, cells: List[Node]) -> Tuple[Node, Node]:
+    def __getitem__(self, index: int) -> Node:  # type: ignore[override]
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        y = int(np.searchsorted(self._ends, index, side="right"))
+        before = int(self._ends[y - 1]) if y else 0
+        x = int(np.flatnonzero(self.inflated[y] == 0)[index - before])
+        return (x, y)
+
+
+def _free_cells(costmap: CostMap) -> Sequence[Node]:
+    return _FreeCells(costmap)
+
+
+def _sample_start_goal(rng: random.Random, cells: Sequence[Node]) -> Tuple[Node, Node]:
     if len(cells) < 2:
         raise ValueError("Not enough free cells to sample start/goal.")
     start = rng.choice(cells)
@@ -77,7 +101,7 @@ def _sample_start_goal(rng: random.Random, cells: List[Node]) -> Tuple[Node, Nod
 
 
 def _sample_pairs(
-    rng: random.Random, cells: List[Node], trials: int
+    rng: random.Random, cells: Sequence[Node], trials: int
 ) -> List[Tuple[Node, Node]]:
     return [_sample_start_goal(rng, cells) for _ in range(trials)]
 
@@ -86,6 +110,38 @@ def _grid_to_path(plan: List[Node]) -> List[Point]:
     return [(float(x), float(y)) for x, y in plan]
 
 
+def _search_columns(plan: Optional[PlanResult]) -> dict:
+    if plan is None:
+        return {
+            "expansions": 0,
+            "pushes": 0,
+            "stale_pops": 0,
+            "los_checks": 0,
+            "peak_open": 0,
+            "suboptimality": 0.0,
+        }
+    return {
+        "expansions": plan.expansions,
+        "pushes": plan.pushes,
+        "stale_pops": plan.stale_pops,
+        "los_checks": plan.los_checks,
+        "peak_open": plan.peak_open,
+        "suboptimality": plan.suboptimality,
+    }
+
+
+def _plan(
+    costmap: CostMap, start: Node, goal: Node, cfg: BenchmarkConfig, global_planner: str
+) -> Tuple[Optional[PlanResult], float, int]:
+    # (plan, plan_ms, 1 if the plan came from cfg.plan_cache).
+    cache = cfg.plan_cache
+    hits = cache.hits if cache is not None else 0
+    t0 = time.perf_counter()
+    plan = plan_path(costmap.inflated_map(), start, goal, global_planner, cache=cache)
+    plan_ms = (time.perf_counter() - t0) * 1000.0
+    return plan, plan_ms, int(cache is not None and cache.hits > hits)
+
+
 def run_trial(
     grid: GridMap,
     costmap: CostMap,
@@ -96,9 +152,8 @@ def run_trial(
     global_planner: str,
 ) -> dict:
     t0 = time.perf_counter()
-    plan = plan_path(costmap.inflated_map(), start, goal, global_planner)
+    plan, plan_ms, cached = _plan(costmap, start, goal, cfg, global_planner)
     if plan is None:
-        elapsed_ms = (time.perf_counter() - t0) * 1000.0
         return {
             "start_x": start[0],
             "start_y": start[1],
@@ -112,24 +167,30 @@ def run_trial(
             "traj_length": 0.0,
             "final_distance": float("inf"),
             "collision": 0,
-            "elapsed_ms": elapsed_ms,
+            "elapsed_ms": plan_ms,
+            "plan_ms": plan_ms,
+            "control_ms": 0.0,
+            "collision_ms": 0.0,
+            **_search_columns(None),
+            "plan_cached": cached,
         }
 
     path = _grid_to_path(plan.path)
     start_pose = (float(start[0]), float(start[1]), 0.0)
     if cfg.local_planner == "dwa":
-        poses = simulate_dwa(path, start_pose, sim_params, costmap, cfg.dwa)
+        sim = Simulator(path, start_pose, sim_params, DWAController(cfg.dwa), costmap=costmap)
     else:
-        poses = simulate_path(
-            path,
-            start_pose,
-            sim_params,
-            PurePursuitParams(lookahead=cfg.lookahead, speed=cfg.speed),
+        controller = PurePursuitController(
+            PurePursuitParams(lookahead=cfg.lookahead, speed=cfg.speed)
         )
+        sim = Simulator(path, start_pose, sim_params, controller)
+    poses = sim.run().true_poses
     elapsed_ms = (time.perf_counter() - t0) * 1000.0
 
     success = goal_reached(poses, (float(goal[0]), float(goal[1])), sim_params.goal_tolerance)
+    t1 = time.perf_counter()
     collision = trajectory_in_collision(costmap, poses)
+    collision_ms = (time.perf_counter() - t1) * 1000.0
     return {
         "start_x": start[0],
         "start_y": start[1],
@@ -144,10 +205,15 @@ def run_trial(
         "final_distance": final_distance(poses, (float(goal[0]), float(goal[1]))),
         "collision": int(collision),
         "elapsed_ms": elapsed_ms,
+        "plan_ms": plan_ms,
+        "control_ms": sim.stage_seconds["control"] * 1000.0,
+        "collision_ms": collision_ms,
+        **_search_columns(plan),
+        "plan_cached": cached,
     }
 
 
-def run_benchmark(
+def run_batch_trials(
     grid: GridMap,
     costmap: CostMap,
     cfg: BenchmarkConfig,
@@ -155,12 +221,184 @@ def run_benchmark(
     pairs: List[Tuple[Node, Node]],
     global_planner: str,
 ) -> List[dict]:
-    rows = []
+    # Pure-pursuit trials planned one by one, then simulated together in one
+    # lockstep batch; elapsed_ms is the trial's planning time plus an equal
+    # share of the batch simulation time, and control_ms / collision_ms are
+    # equal shares of the batch's stage times.
+    rows: List[dict] = []
+    paths: List[List[Point]] = []
+    starts: List[Tuple[float, float, float]] = []
+    planned: List[int] = []
     for start, goal in pairs:
-        rows.append(run_trial(grid, costmap, cfg, sim_params, start, goal, global_planner))
+        plan, plan_ms, cached = _plan(costmap, start, goal, cfg, global_planner)
+        rows.append(
+            {
+                "start_x": start[0],
+                "start_y": start[1],
+                "goal_x": goal[0],
+                "goal_y": goal[1],
+                "global_planner": global_planner,
+                "plan_found": 0,
+                "success": 0,
+                "steps": 0,
+                "path_length": 0.0,
+                "traj_length": 0.0,
+                "final_distance": float("inf"),
+                "collision": 0,
+                "elapsed_ms": plan_ms,
+                "plan_ms": plan_ms,
+                "control_ms": 0.0,
+                "collision_ms": 0.0,
+                **_search_columns(plan),
+                "plan_cached": cached,
+            }
+        )
+        if plan is not None:
+            planned.append(len(rows) - 1)
+            paths.append(_grid_to_path(plan.path))
+            starts.append((float(start[0]), float(start[1]), 0.0))
+    if not planned:
+        return rows
+
+    t0 = time.perf_counter()
+    result = simulate_path_batch(
+        paths,
+        starts,
+        sim_params,
+        PurePursuitParams(lookahead=cfg.lookahead, speed=cfg.speed),
+        costmap=costmap,
+    )
+    share_ms = (time.perf_counter() - t0) * 1000.0 / len(planned)
+    control_ms = result.stage_seconds["control"] * 1000.0 / len(planned)
+    collision_ms = result.stage_seconds["collision"] * 1000.0 / len(planned)
+    for i, row_idx in enumerate(planned):
+        row = rows[row_idx]
+        goal_point = (float(row["goal_x"]), float(row["goal_y"]))
+        x, y, yaw = result.final_poses[i].tolist()
+        final = [(x, y, yaw)]
+        row.update(
+            plan_found=1,
+            success=int(goal_reached(final, goal_point, sim_params.goal_tolerance)),
+            steps=int(result.steps[i]),
+            path_length=path_length(paths[i]),
+            traj_length=float(result.traj_length[i]),
+            final_distance=final_distance(final, goal_point),
+            collision=int(result.collision[i]),
+            elapsed_ms=row["elapsed_ms"] + share_ms,
+            control_ms=control_ms,
+            collision_ms=collision_ms,
+        )
     return rows
 
 
+_WORKER_CONTEXT: dict = {}
+
+
+def _init_worker(
+    grid: GridMap, costmap: CostMap, cfg: BenchmarkConfig, sim_params: SimParams
+) -> None:
+    # Runs once per worker process, so the costmap crosses the process
+    # boundary once instead of being pickled with every task.
+    _WORKER_CONTEXT.update(grid=grid, costmap=costmap, cfg=cfg, sim_params=sim_params)
+
+
+def _run_worker_trial(task: Tuple[Node, Node, str]) -> dict:
+    start, goal, global_planner = task
+    ctx = _WORKER_CONTEXT
+    return run_trial(
+        ctx["grid"], ctx["costmap"], ctx["cfg"], ctx["sim_params"], start, goal, global_planner
+    )
+
+
+def _run_worker_batch(task: Tuple[List[Tuple[Node, Node]], str]) -> List[dict]:
+    pairs, global_planner = task
+    ctx = _WORKER_CONTEXT
+    return run_batch_trials(
+        ctx["grid"], ctx["costmap"], ctx["cfg"], ctx["sim_params"], pairs, global_planner
+    )
+
+
+def _run_suite_batched(
+    grid: GridMap,
+    costmap: CostMap,
+    cfg: BenchmarkConfig,
+    sim_params: SimParams,
+    pairs: List[Tuple[Node, Node]],
+    planners: List[str],
+    workers: int,
+) -> Dict[str, List[dict]]:
+    if workers <= 1:
+        return {
+            planner: run_batch_trials(grid, costmap, cfg, sim_params, pairs, planner)
+            for planner in planners
+        }
+    # One contiguous slice of the pairs per worker and planner keeps row order.
+    size = -(-len(pairs) // workers)
+    tasks = [
+        (pairs[lo : lo + size], planner)
+        for planner in planners
+        for lo in range(0, len(pairs), size)
+    ]
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(grid, costmap, cfg, sim_params),
+    ) as pool:
+        chunks = list(pool.map(_run_worker_batch, tasks))
+    results: Dict[str, List[dict]] = {planner: [] for planner in planners}
+    for (_, planner), rows in zip(tasks, chunks):
+        results[planner].extend(rows)
+    return results
+
+
+def run_suite(
+    grid: GridMap,
+    costmap: CostMap,
+    cfg: BenchmarkConfig,
+    sim_params: SimParams,
+    pairs: List[Tuple[Node, Node]],
+    planners: List[str],
+    workers: int = 1,
+    batch: bool = True,
+) -> Dict[str, List[dict]]:
+    if batch and cfg.local_planner == "pure_pursuit":
+        return _run_suite_batched(grid, costmap, cfg, sim_params, pairs, planners, workers)
+    tasks = [(start, goal, planner) for planner in planners for start, goal in pairs]
+    if workers <= 1:
+        rows = [
+            run_trial(grid, costmap, cfg, sim_params, start, goal, planner)
+            for start, goal, planner in tasks
+        ]
+    else:
+        chunksize = max(1, len(tasks) // (workers * 4))
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(grid, costmap, cfg, sim_params),
+        ) as pool:
+            # map() yields in submission order, so rows line up with a serial run.
+            rows = list(pool.map(_run_worker_trial, tasks, chunksize=chunksize))
+    return {
+        planner: rows[i * len(pairs) : (i + 1) * len(pairs)] for i, planner in enumerate(planners)
+    }
+
+
+def run_benchmark(
+    grid: GridMap,
+    costmap: CostMap,
+    cfg: BenchmarkConfig,
+    sim_params: SimParams,
+    pairs: List[Tuple[Node, Node]],
+    global_planner: str,
+    workers: int = 1,
+    batch: bool = True,
+) -> List[dict]:
+    results = run_suite(
+        grid, costmap, cfg, sim_params, pairs, [global_planner], workers, batch
+    )
+    return results[global_planner]
+
+
 def _summarize(rows: List[dict]) -> dict:
     trials = len(rows)
     plan_found = [row for row in rows if row["plan_found"] == 1]
@@ -279,6 +517,7 @@ def _write_summary_md(path: Path, summaries: List[dict]) -> None:
 def main() -> None:
     parser = argparse.ArgumentParser(description="Run navsim benchmarks.")
     parser.add_argument("--config", type=Path, default=Path("configs/default.yaml"))
+    parser.add_argument("--map", type=Path, default=None)
     parser.add_argument("--trials", type=int, default=30)
     parser.add_argument("--seed", type=int, default=0)
     parser.add_argument("--csv", type=Path, default=Path("reports/benchmark.csv"))
@@ -289,10 +528,33 @@ def main() -> None:
     )
     parser.add_argument(
         "--global-planner",
-        choices=["astar", "dijkstra", "theta"],
+        choices=[
+            "alt",
+            "ara",
+            "astar",
+            "astar_flat",
+            "bidirectional_astar",
+            "bidirectional_dijkstra",
+            "coarse_to_fine",
+            "dijkstra",
+            "goal_field",
+            "hpa",
+            "jps",
+            "lazy_theta",
+            "theta",
+        ],
         default=None,
     )
     parser.add_argument("--suite", action="store_true")
+    parser.add_argument(
+        "--plan-cache",
+        type=Path,
+        default=None,
+        help="Plan cache directory. With --workers, the plan_cached column "
+        "depends on the worker count.",
+    )
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--no-batch", dest="batch", action="store_false")
     parser.add_argument(
         "--summary-csv",
         type=Path,
@@ -310,8 +572,10 @@ def main() -> None:
         cfg.local_planner = args.local_planner
     if args.global_planner is not None:
         cfg.global_planner = args.global_planner
+    if args.plan_cache is not None:
+        cfg.plan_cache = PlanCache(directory=args.plan_cache)
 
-    grid = demo_grid()
+    grid = load_map(args.map) if args.map is not None else demo_grid()
     costmap = CostMap.from_grid(grid, cfg.inflation_radius)
     free_cells = _free_cells(costmap)
     rng = random.Random(args.seed)
@@ -323,10 +587,21 @@ def main() -> None:
         return
 
     if args.suite:
-        planners = ["astar", "dijkstra", "theta"]
+        planners = [
+            "astar",
+            "dijkstra",
+            "bidirectional_astar",
+            "bidirectional_dijkstra",
+            "theta",
+            "lazy_theta",
+            "jps",
+        ]
         summaries = []
+        results = run_suite(
+            grid, costmap, cfg, sim_params, pairs, planners, args.workers, args.batch
+        )
         for planner in planners:
-            rows = run_benchmark(grid, costmap, cfg, sim_params, pairs, planner)
+            rows = results[planner]
             per_csv = Path(f"reports/benchmark_{planner}.csv")
             _write_csv(per_csv, rows)
             summary = summarize_rows(rows, planner)
@@ -335,7 +610,9 @@ def main() -> None:
         _write_summary_csv(args.summary_csv, summaries)
         _write_summary_md(args.summary_md, summaries)
     else:
-        rows = run_benchmark(grid, costmap, cfg, sim_params, pairs, cfg.global_planner)
+        rows = run_benchmark(
+            grid, costmap, cfg, sim_params, pairs, cfg.global_planner, args.workers, args.batch
+        )
         _write_csv(args.csv, rows)
         summary = summarize_rows(rows, cfg.global_planner)
         _print_summary(summary, title=f"Benchmark summary ({cfg.global_planner})")
@@ -13,7 +13,7 @@ from navsim.costmap import CostMap, LocalCostmapParams
 from navsim.dynamic import DynamicObstacle, DynamicObstacleField
 from navsim.local_planner import DWAParams
 from navsim.localization import LocalizationParams
-from navsim.map import GridMap, demo_grid
+from navsim.map import GridMap, demo_grid, load_map
 from navsim.planner import plan_path
 from navsim.sensors import SensorNoise
 from navsim.sim import (
@@ -41,6 +41,8 @@ class DemoConfig:
     dynamic_enabled: bool
     dynamic_replan_interval: int
     dynamic_max_replans: int
+    dynamic_incremental_replan: bool
+    dynamic_replan_budget_ms: float | None
     dynamic_obstacles: List[DynamicObstacle]
     local_costmap: LocalCostmapParams
     localization_enabled: bool
@@ -97,6 +99,12 @@ def _load_config(path: Path) -> DemoConfig:
         dynamic_enabled=bool(dyn_cfg.get("enabled", False)),
         dynamic_replan_interval=int(dyn_cfg.get("replan_interval", 10)),
         dynamic_max_replans=int(dyn_cfg.get("max_replans", 50)),
+        dynamic_incremental_replan=bool(dyn_cfg.get("incremental_replan", False)),
+        dynamic_replan_budget_ms=(
+            float(dyn_cfg["replan_budget_ms"])
+            if dyn_cfg.get("replan_budget_ms") is not None
+            else None
+        ),
         dynamic_obstacles=obstacles,
         local_costmap=LocalCostmapParams(
             enabled=bool(local_cfg.get("enabled", False)),
@@ -166,6 +174,8 @@ def run_demo(
                 cfg.localization,
                 cfg.global_planner,
                 cfg.local_costmap,
+                incremental_replan=cfg.dynamic_incremental_replan,
+                replan_budget_ms=cfg.dynamic_replan_budget_ms,
             )
             costmap = CostMap.from_grid(
                 grid,
@@ -207,6 +217,8 @@ def run_demo(
                 cfg.dynamic_max_replans,
                 cfg.global_planner,
                 cfg.local_costmap,
+                incremental_replan=cfg.dynamic_incremental_replan,
+                replan_budget_ms=cfg.dynamic_replan_budget_ms,
             )
             costmap = CostMap.from_grid(
                 grid,
@@ -268,6 +280,7 @@ def run_demo(
 def main() -> None:
     parser = argparse.ArgumentParser(description="2D robot navigation demo.")
     parser.add_argument("--config", type=Path, default=Path("configs/default.yaml"))
+    parser.add_argument("--map", type=Path, default=None)
     parser.add_argument("--start", type=_parse_point, default=None)
     parser.add_argument("--goal", type=_parse_point, default=None)
     parser.add_argument("--png", type=Path, default=None)
@@ -275,7 +288,21 @@ def main() -> None:
     parser.add_argument("--inflation-radius", type=float, default=None)
     parser.add_argument(
         "--global-planner",
-        choices=["astar", "dijkstra", "theta"],
+        choices=[
+            "alt",
+            "ara",
+            "astar",
+            "astar_flat",
+            "bidirectional_astar",
+            "bidirectional_dijkstra",
+            "coarse_to_fine",
+            "dijkstra",
+            "goal_field",
+            "hpa",
+            "jps",
+            "lazy_theta",
+            "theta",
+        ],
         default=None,
     )
     parser.add_argument(
@@ -310,6 +337,13 @@ def main() -> None:
     )
     parser.add_argument("--replan-interval", type=int, default=None)
     parser.add_argument("--max-replans", type=int, default=None)
+    parser.add_argument(
+        "--incremental-replan",
+        dest="incremental_replan",
+        action="store_true",
+        default=None,
+    )
+    parser.add_argument("--replan-budget-ms", type=float, default=None)
     parser.add_argument(
         "--localization",
         dest="localization_enabled",
@@ -365,14 +399,23 @@ def main() -> None:
         cfg.dynamic_replan_interval = args.replan_interval
     if args.max_replans is not None:
         cfg.dynamic_max_replans = args.max_replans
+    if args.incremental_replan is not None:
+        cfg.dynamic_incremental_replan = args.incremental_replan
+    if args.replan_budget_ms is not None:
+        cfg.dynamic_replan_budget_ms = args.replan_budget_ms
     if args.localization_enabled is not None:
         cfg.localization_enabled = args.localization_enabled
     if args.lookahead is not None:
         cfg.lookahead = args.lookahead
     if args.speed is not None:
         cfg.speed = args.speed
+    if cfg.dynamic_enabled and cfg.dynamic_replan_budget_ms is not None:
+        if cfg.global_planner != "ara" or cfg.dynamic_incremental_replan:
+            parser.error(
+                "--replan-budget-ms needs --global-planner ara without --incremental-replan."
+            )
 
-    grid = demo_grid()
+    grid = load_map(args.map) if args.map is not None else demo_grid()
     run_demo(grid, cfg, out_png=args.png, out_gif=args.gif)
 
 
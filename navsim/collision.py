@@ -2,10 +2,15 @@ from __future__ import annotations
 
 from typing import Iterable, Tuple
 
-from .costmap import CostMap
+import numpy as np
+import numpy.typing as npt
+
+from .costmap import CostMapLike, TiledCostMap
 
 Point = Tuple[float, float]
 Pose = Tuple[float, float, float]
+FloatArray = npt.NDArray[np.float64]
+BoolArray = npt.NDArray[np.bool_]
 
 
 def _point_to_cell(point: Point) -> Tuple[int, int]:
@@ -13,16 +18,28 @@ def _point_to_cell(point: Point) -> Tuple[int, int]:
     return int(round(x)), int(round(y))
 
 
-def point_in_collision(costmap: CostMap, point: Point) -> bool:
+def point_in_collision(costmap: CostMapLike | TiledCostMap, point: Point) -> bool:
     cell = _point_to_cell(point)
     if not costmap.in_bounds(cell):
         return True
     return costmap.is_occupied(cell)
 
 
-def path_in_collision(costmap: CostMap, path: Iterable[Point]) -> bool:
+def path_in_collision(costmap: CostMapLike | TiledCostMap, path: Iterable[Point]) -> bool:
     return any(point_in_collision(costmap, point) for point in path)
 
 
-def trajectory_in_collision(costmap: CostMap, poses: Iterable[Pose]) -> bool:
+def trajectory_in_collision(costmap: CostMapLike | TiledCostMap, poses: Iterable[Pose]) -> bool:
     return any(point_in_collision(costmap, (x, y)) for x, y, _ in poses)
+
+
+def points_in_collision(
+    costmap: CostMapLike | TiledCostMap, xs: FloatArray, ys: FloatArray
+) -> BoolArray:
+    # Elementwise point_in_collision; np.rint rounds half to even like round().
+    cx = np.rint(xs).astype(np.int64)
+    cy = np.rint(ys).astype(np.int64)
+    inside = (cx >= 0) & (cx < costmap.width) & (cy >= 0) & (cy < costmap.height)
+    hit = np.ones(cx.shape, dtype=bool)
+    hit[inside] = costmap.occupied(cx[inside], cy[inside])
+    return hit
@@ -4,6 +4,8 @@ import math
 from dataclasses import dataclass
 from typing import List, Tuple
 
+from .path_index import PathIndex
+
 Point = Tuple[float, float]
 
 
@@ -27,18 +29,14 @@ def pure_pursuit_control(
     path: List[Point],
     params: PurePursuitParams,
     last_target_idx: int,
+    path_index: PathIndex | None = None,
 ) -> Tuple[float, float, int]:
     x, y, yaw = pose
 
-    # Find a target point ahead of the robot.
-    target_idx = last_target_idx
-    for i in range(last_target_idx, len(path)):
-        px, py = path[i]
-        if math.hypot(px - x, py - y) >= params.lookahead:
-            target_idx = i
-            break
-    else:
-        target_idx = len(path) - 1
+    # Find a target point ahead of the robot; pass a PathIndex built once per
+    # plan to avoid re-indexing the path on every call.
+    index = path_index if path_index is not None else PathIndex(path)
+    target_idx = index.lookahead_index((x, y), params.lookahead, last_target_idx)
 
     tx, ty = path[target_idx]
     angle_to_target = math.atan2(ty - y, tx - x)
@@ -1,55 +1,89 @@
 from __future__ import annotations
 
 import math
-from dataclasses import dataclass
-from typing import Iterable, Tuple
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import Any, Dict, FrozenSet, Iterable, List, Set, Tuple, Union
 
-from .map import Grid, GridMap
+import numpy as np
+import numpy.typing as npt
+
+from .distance import (
+    DistanceField,
+    IncrementalDistance,
+    distance_transform,
+    sample_bilinear,
+    squared_distance_transform,
+)
+from .map import Grid, GridMap, TiledGridMap, as_occupancy, toggle_fingerprint
 
 Node = Tuple[int, int]
 Point = Tuple[float, float]
+FloatArray = npt.NDArray[np.float64]
+IndexArray = npt.NDArray[np.int64]
+BoolArray = npt.NDArray[np.bool_]
 
 
 def _overlay_grid(grid: Grid, occupied: Iterable[Node]) -> Grid:
-    height = len(grid)
-    width = len(grid[0]) if height else 0
-    overlaid = [row[:] for row in grid]
+    height, width = grid.shape
+    overlaid = grid.copy()
     for x, y in occupied:
         if 0 <= x < width and 0 <= y < height:
-            overlaid[y][x] = 1
+            overlaid[y, x] = 1
     return overlaid
 
 
-def _inflate_grid(grid: Grid, radius: float) -> Grid:
-    height = len(grid)
-    width = len(grid[0]) if height else 0
-    inflated = [row[:] for row in grid]
-    if radius <= 0.0:
-        return inflated
-
+def _disk_kernel(radius: float) -> Grid:
     rad = int(math.ceil(radius))
     radius_sq = radius * radius + 1e-9
+    offsets = np.arange(-rad, rad + 1)
+    disk = offsets[None, :] ** 2 + offsets[:, None] ** 2 <= radius_sq
+    return disk.astype(np.uint8)
+
 
-    for y in range(height):
-        for x in range(width):
-            if grid[y][x] != 1:
-                continue
-            for dy in range(-rad, rad + 1):
-                for dx in range(-rad, rad + 1):
-                    if dx * dx + dy * dy > radius_sq:
-                        continue
-                    ny = y + dy
-                    nx = x + dx
-                    if 0 <= nx < width and 0 <= ny < height:
-                        inflated[ny][nx] = 1
+def _inflate_grid(grid: Grid, radius: float) -> Grid:
+    if radius <= 0.0:
+        # Nothing to inflate: alias the obstacle layer (costmaps never write to
+        # it), so a memory-mapped map is not copied into memory.
+        return grid
+    inflated = grid.copy()
+    # Exact Euclidean distances only need to reach ceil(radius) to decide the
+    # same dx^2 + dy^2 <= radius^2 footprint as stamping a disk per obstacle.
+    radius_sq = radius * radius + 1e-9
+    dist_sq = squared_distance_transform(grid, max_distance=math.ceil(radius))
+    inflated[dist_sq <= radius_sq] = 1
     return inflated
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, eq=False)
 class CostMap:
     base: GridMap
     inflated: Grid
     inflation_radius: float
+    obstacles: Grid | None = None
+    _cells: memoryview = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        inflated = as_occupancy(self.inflated)
+        object.__setattr__(self, "inflated", inflated)
+        if self.obstacles is not None:
+            object.__setattr__(self, "obstacles", as_occupancy(self.obstacles))
+        object.__setattr__(self, "_cells", inflated.reshape(-1).data)
+
+    def __reduce__(self) -> Tuple[Any, Tuple[Any, ...]]:
+        # Ships the arrays only; the byte view and cached fields are rebuilt lazily.
+        # Layers that alias the base grid are not shipped again, which keeps a
+        # memory-mapped base shared instead of copying it into every process.
+        grid = self.base.grid
+        return (
+            _restore_costmap,
+            (
+                self.base,
+                None if self.inflated is grid else self.inflated,
+                self.inflation_radius,
+                None if self.obstacles is grid else self.obstacles,
+            ),
+        )
 
     @classmethod
     def from_grid(
@@ -61,7 +95,7 @@ class CostMap:
         radius = max(0.0, float(inflation_radius))
         base_grid = _overlay_grid(grid.grid, occupied) if occupied else grid.grid
         inflated = _inflate_grid(base_grid, radius)
-        return cls(base=grid, inflated=inflated, inflation_radius=radius)
+        return cls(base=grid, inflated=inflated, inflation_radius=radius, obstacles=base_grid)
 
     @property
     def height(self) -> int:
@@ -71,32 +105,305 @@ class CostMap:
     def width(self) -> int:
         return self.base.width
 
+    @cached_property
+    def distance(self) -> DistanceField:
+        # Euclidean distance from each cell to the nearest (uninflated) obstacle.
+        return distance_transform(self.occupancy)
+
+    @cached_property
+    def clearance(self) -> DistanceField:
+        # Euclidean distance from each cell to the nearest inflated cell, built
+        # once per costmap for local-planner clearance lookups.
+        return distance_transform(self.inflated)
+
+    def clearance_at(self, xs: FloatArray, ys: FloatArray) -> FloatArray:
+        return sample_bilinear(self.clearance, xs, ys)
+
+    @property
+    def occupancy(self) -> Grid:
+        # Obstacle layer before inflation, including any overlaid cells.
+        return self.base.grid if self.obstacles is None else self.obstacles
+
     def in_bounds(self, node: Node) -> bool:
         return self.base.in_bounds(node)
 
     def is_occupied(self, node: Node) -> bool:
         x, y = node
-        return self.inflated[y][x] == 1
+        return self._cells[y * self.inflated.shape[1] + x] != 0
+
+    def occupied(self, xs: IndexArray, ys: IndexArray) -> BoolArray:
+        # Vectorized is_occupied for in-bounds cell index arrays.
+        result: BoolArray = self.inflated[ys, xs] != 0
+        return result
+
+    @cached_property
+    def _inflated_map(self) -> GridMap:
+        grid = GridMap(grid=self.inflated)
+        origin = self.base._origin
+        if origin is not None and self.obstacles is self.base.grid:
+            # Static layers of a loaded map are named after the file and
+            # radius, so files derived from them (landmarks) can be reused.
+            if self.inflated is not self.base.grid:
+                origin = f"{origin}.r{self.inflation_radius:g}"
+            object.__setattr__(grid, "_origin", origin)
+        return grid
 
     def inflated_map(self) -> GridMap:
-        return GridMap(grid=self.inflated)
+        # One GridMap per costmap, so its fingerprint and pyramid are built once.
+        return self._inflated_map
+
+    def region(self) -> Tuple[int, int, Grid]:
+        # (x0, y0, cells) covering every cell that can be occupied.
+        return 0, 0, self.inflated
 
     def windowed(
         self,
         center: Point,
         radius: float,
         unknown_as_obstacle: bool = False,
-    ) -> "CostMap":
+    ) -> CostMap | WindowedCostMap:
         if radius <= 0.0:
             return self
-        cx, cy = center
-        radius_sq = radius * radius
-        windowed = [row[:] for row in self.inflated]
-        for y in range(self.height):
-            for x in range(self.width):
-                if (x - cx) * (x - cx) + (y - cy) * (y - cy) > radius_sq:
-                    windowed[y][x] = 1 if unknown_as_obstacle else 0
-        return CostMap(base=self.base, inflated=windowed, inflation_radius=self.inflation_radius)
+        return WindowedCostMap(self, center, radius, unknown_as_obstacle)
+
+
+@dataclass(frozen=True, eq=False)
+class WindowedCostMap:
+    # Circular local window over a parent costmap. Cells outside the radius read
+    # as free (or as obstacles with unknown_as_obstacle) without copying the grid.
+    parent: CostMap
+    center: Point
+    radius: float
+    unknown_as_obstacle: bool = False
+
+    @property
+    def base(self) -> GridMap:
+        return self.parent.base
+
+    @property
+    def inflation_radius(self) -> float:
+        return self.parent.inflation_radius
+
+    @property
+    def height(self) -> int:
+        return self.parent.height
+
+    @property
+    def width(self) -> int:
+        return self.parent.width
+
+    def in_bounds(self, node: Node) -> bool:
+        return self.parent.in_bounds(node)
+
+    def is_occupied(self, node: Node) -> bool:
+        x, y = node
+        cx, cy = self.center
+        if (x - cx) * (x - cx) + (y - cy) * (y - cy) > self.radius * self.radius:
+            return self.unknown_as_obstacle
+        return self.parent.is_occupied(node)
+
+    def occupied(self, xs: IndexArray, ys: IndexArray) -> BoolArray:
+        cx, cy = self.center
+        outside = (xs - cx) * (xs - cx) + (ys - cy) * (ys - cy) > self.radius * self.radius
+        inside = self.parent.occupied(xs, ys)
+        result: BoolArray = np.where(outside, self.unknown_as_obstacle, inside)
+        return result
+
+    def _mask(self, x0: int, y0: int, cells: Grid) -> Grid:
+        cx, cy = self.center
+        xs = np.arange(x0, x0 + cells.shape[1]) - cx
+        ys = np.arange(y0, y0 + cells.shape[0]) - cy
+        outside = xs[None, :] ** 2 + ys[:, None] ** 2 > self.radius * self.radius
+        masked = cells.copy()
+        masked[outside] = 1 if self.unknown_as_obstacle else 0
+        return masked
+
+    def region(self) -> Tuple[int, int, Grid]:
+        # Bounding box of the window plus a one-cell ring, so that with
+        # unknown_as_obstacle the nearest outside cell to any point in the
+        # window is always included.
+        cx, cy = self.center
+        x0 = max(0, int(math.floor(cx - self.radius)) - 1)
+        y0 = max(0, int(math.floor(cy - self.radius)) - 1)
+        x1 = min(self.width, int(math.ceil(cx + self.radius)) + 2)
+        y1 = min(self.height, int(math.ceil(cy + self.radius)) + 2)
+        if x0 >= x1 or y0 >= y1:
+            return 0, 0, np.zeros((0, 0), dtype=np.uint8)
+        return x0, y0, self._mask(x0, y0, self.parent.inflated[y0:y1, x0:x1])
+
+    @cached_property
+    def _clearance_region(self) -> Tuple[int, int, DistanceField]:
+        x0, y0, cells = self.region()
+        return x0, y0, distance_transform(cells)
+
+    def clearance_at(self, xs: FloatArray, ys: FloatArray) -> FloatArray:
+        # Distance field over region() only, so a window costs a small transform.
+        x0, y0, field = self._clearance_region
+        return sample_bilinear(field, xs - x0, ys - y0)
+
+    @cached_property
+    def inflated(self) -> Grid:
+        # Full-size materialization, only built when a caller asks for it.
+        return self._mask(0, 0, self.parent.inflated)
+
+    def inflated_map(self) -> GridMap:
+        return GridMap(grid=self.inflated)
+
+    def windowed(
+        self,
+        center: Point,
+        radius: float,
+        unknown_as_obstacle: bool = False,
+    ) -> CostMap | WindowedCostMap:
+        flattened = CostMap(
+            base=self.base,
+            inflated=self.inflated,
+            inflation_radius=self.inflation_radius,
+            obstacles=self.parent.obstacles,
+        )
+        return flattened.windowed(center, radius, unknown_as_obstacle)
+
+
+def _restore_costmap(
+    base: GridMap, inflated: Grid | None, inflation_radius: float, obstacles: Grid | None
+) -> CostMap:
+    return CostMap(
+        base=base,
+        inflated=base.grid if inflated is None else inflated,
+        inflation_radius=inflation_radius,
+        obstacles=obstacles,
+    )
+
+
+CostMapLike = Union[CostMap, WindowedCostMap]
+
+
+class _InflatedTiles:
+    # Reads inflated rectangles of a tiled map. The source rectangle is grown by
+    # a halo of ceil(radius) cells, so obstacles in neighbouring tiles inflate
+    # across the tile border exactly as CostMap.from_grid does on the full map.
+    def __init__(self, source: TiledGridMap, radius: float) -> None:
+        self.source = source
+        self.radius = radius
+
+    def __call__(self, x0: int, y0: int, x1: int, y1: int) -> Grid:
+        halo = int(math.ceil(self.radius))
+        left, top = max(0, x0 - halo), max(0, y0 - halo)
+        cells = self.source.region(left, top, x1 + halo, y1 + halo)
+        inflated = _inflate_grid(cells, self.radius)
+        return inflated[y0 - top : y1 - top, x0 - left : x1 - left].copy()
+
+
+@dataclass(frozen=True, eq=False)
+class TiledCostMap:
+    # CostMap over a TiledGridMap: inflated tiles are computed on first use and
+    # cached in their own LRU, so neither layer is ever materialized in full.
+    base: TiledGridMap
+    inflated: TiledGridMap
+    inflation_radius: float
+
+    @classmethod
+    def from_grid(cls, grid: TiledGridMap, inflation_radius: float) -> "TiledCostMap":
+        radius = max(0.0, float(inflation_radius))
+        if radius <= 0.0:
+            return cls(base=grid, inflated=grid, inflation_radius=radius)
+        inflated = TiledGridMap(
+            _InflatedTiles(grid, radius), grid.width, grid.height, grid.tile_size, grid.max_tiles
+        )
+        return cls(base=grid, inflated=inflated, inflation_radius=radius)
+
+    @property
+    def height(self) -> int:
+        return self.base.height
+
+    @property
+    def width(self) -> int:
+        return self.base.width
+
+    def in_bounds(self, node: Node) -> bool:
+        return self.base.in_bounds(node)
+
+    def is_occupied(self, node: Node) -> bool:
+        return not self.inflated.is_free(node)
+
+    def occupied(self, xs: IndexArray, ys: IndexArray) -> BoolArray:
+        result: BoolArray = self.inflated.cells(xs, ys) != 0
+        return result
+
+    def inflated_map(self) -> TiledGridMap:
+        return self.inflated
+
+
+class IncrementalCostMap:
+    # Static layer inflated once; dynamic cells are stamped in and out of a
+    # coverage count so each update only touches the neighbourhoods that changed.
+    # Costmaps returned by update() share buffers and are only valid until the
+    # next call.
+    def __init__(self, grid: GridMap, inflation_radius: float) -> None:
+        self.base = grid
+        self.static = CostMap.from_grid(grid, inflation_radius)
+        self.inflation_radius = self.static.inflation_radius
+        self._kernel = _disk_kernel(self.inflation_radius)
+        self._coverage = np.zeros(grid.grid.shape, dtype=np.uint16)
+        self._obstacles = grid.grid.copy()
+        self._inflated = self.static.inflated.copy()
+        # Clearance for the local planner, repaired only around changed cells.
+        self._clearance = IncrementalDistance(self._inflated)
+        self._cells: Set[Node] = set()
+        self._flipped: Dict[Node, int] = {}
+        self.changed: List[Node] = []
+        self.fingerprint = self.static.inflated_map().fingerprint
+
+    @property
+    def cells(self) -> FrozenSet[Node]:
+        return frozenset(self._cells)
+
+    def _stamp(self, cell: Node, add: bool) -> None:
+        x, y = cell
+        height, width = self.base.height, self.base.width
+        rad = self._kernel.shape[0] // 2
+        y0, y1 = max(0, y - rad), min(height, y + rad + 1)
+        x0, x1 = max(0, x - rad), min(width, x + rad + 1)
+        window = self._kernel[y0 - y + rad : y1 - y + rad, x0 - x + rad : x1 - x + rad]
+        coverage = self._coverage[y0:y1, x0:x1]
+        before = self._inflated[y0:y1, x0:x1].copy()
+        if add:
+            coverage += window
+            self._obstacles[y, x] = 1
+        else:
+            coverage -= window
+            self._obstacles[y, x] = self.base.grid[y, x]
+        np.logical_or(
+            self.static.inflated[y0:y1, x0:x1],
+            coverage > 0,
+            out=self._inflated[y0:y1, x0:x1],
+            casting="unsafe",
+        )
+        for dy, dx in np.argwhere(before != self._inflated[y0:y1, x0:x1]):
+            self._flipped.setdefault((x0 + int(dx), y0 + int(dy)), int(before[dy, dx]))
+
+    def update(self, occupied: Iterable[Node]) -> CostMap:
+        cells = {cell for cell in occupied if self.base.in_bounds(cell)}
+        for cell in self._cells - cells:
+            self._stamp(cell, add=False)
+        for cell in cells - self._cells:
+            self._stamp(cell, add=True)
+        self._cells = cells
+        # Cells whose inflated occupancy differs from the previous update.
+        self.changed = [
+            (x, y) for (x, y), value in self._flipped.items() if self._inflated[y, x] != value
+        ]
+        self._flipped.clear()
+        self.fingerprint = toggle_fingerprint(self.fingerprint, self.base.width, self.changed)
+        costmap = CostMap(
+            base=self.base,
+            inflated=self._inflated,
+            inflation_radius=self.inflation_radius,
+            obstacles=self._obstacles,
+        )
+        object.__setattr__(costmap.inflated_map(), "_fingerprint", self.fingerprint)
+        costmap.__dict__["clearance"] = self._clearance.update(self.changed)
+        return costmap
 
 
 @dataclass(frozen=True)
@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import math
+from typing import Iterable, Tuple
+
+import numpy as np
+import numpy.typing as npt
+
+from .map import Grid
+
+DistanceField = npt.NDArray[np.float64]
+
+
+def _column_distance(grid: Grid) -> DistanceField:
+    # Distance to the nearest obstacle in the same column (two sweeps over rows).
+    height, width = grid.shape
+    occupied = grid != 0
+    dist = np.empty((height, width))
+    run = np.full(width, np.inf)
+    for y in range(height):
+        run = np.where(occupied[y], 0.0, run + 1.0)
+        dist[y] = run
+    run = np.full(width, np.inf)
+    for y in range(height - 1, -1, -1):
+        run = np.where(occupied[y], 0.0, run + 1.0)
+        np.minimum(dist[y], run, out=dist[y])
+    return dist
+
+
+def _lower_envelope_rows(f: DistanceField) -> DistanceField:
+    # Felzenszwalb & Huttenlocher 1D squared distance transform, run on every
+    # row at once: d[r, q] = min_p (q - p)^2 + f[r, p].
+    rows, width = f.shape
+    d = np.empty_like(f)
+    if width == 0 or rows == 0:
+        return d
+    row_idx = np.arange(rows)
+    v = np.zeros((rows, width), dtype=np.int64)
+    z = np.empty((rows, width + 1), dtype=np.float64)
+    z[:, 0] = -np.inf
+    z[:, 1] = np.inf
+    k = np.zeros(rows, dtype=np.int64)
+
+    for q in range(1, width):
+        fq = f[:, q] + q * q
+        active = row_idx
+        while active.size:
+            vk = v[active, k[active]]
+            s = (fq[active] - (f[active, vk] + vk * vk)) / (2.0 * (q - vk))
+            pop = s <= z[active, k[active]]
+            settle = active[~pop]
+            k[settle] += 1
+            v[settle, k[settle]] = q
+            z[settle, k[settle]] = s[~pop]
+            z[settle, k[settle] + 1] = np.inf
+            active = active[pop]
+            k[active] -= 1
+
+    k[:] = 0
+    for q in range(width):
+        behind = z[row_idx, k + 1] < q
+        while behind.any():
+            k[behind] += 1
+            behind = z[row_idx, k + 1] < q
+        vk = v[row_idx, k]
+        d[:, q] = (q - vk) ** 2 + f[row_idx, vk]
+    return d
+
+
+def _windowed_rows(f: DistanceField, reach: int) -> DistanceField:
+    # Same recurrence as _lower_envelope_rows, restricted to |q - p| <= reach.
+    d = f.copy()
+    width = f.shape[1]
+    shifted = np.empty_like(f)
+    for dx in range(1, min(reach, width - 1) + 1):
+        step = float(dx * dx)
+        np.add(f[:, :-dx], step, out=shifted[:, dx:])
+        np.minimum(d[:, dx:], shifted[:, dx:], out=d[:, dx:])
+        np.add(f[:, dx:], step, out=shifted[:, :-dx])
+        np.minimum(d[:, :-dx], shifted[:, :-dx], out=d[:, :-dx])
+    return d
+
+
+def squared_distance_transform(grid: Grid, max_distance: float | None = None) -> DistanceField:
+    # Exact squared Euclidean distance from every cell centre to the nearest
+    # obstacle cell centre. With max_distance, cells farther than that are +inf,
+    # which costs O(max_distance) array passes instead of a full transform.
+    height, width = grid.shape
+    if height == 0 or width == 0 or not grid.any():
+        return np.full((height, width), np.inf)
+    if max_distance is not None:
+        limit = max(0.0, float(max_distance))
+        reach = int(math.floor(limit))
+        column = _column_distance(grid)
+        np.copyto(column, np.inf, where=column > limit)
+        dist_sq = _windowed_rows(column * column, reach)
+        dist_sq[dist_sq > limit * limit] = np.inf
+        return dist_sq
+    column = _column_distance(grid)
+    # Every row now has a finite entry (the grid has an obstacle), but entries in
+    # obstacle-free columns are +inf; a finite stand-in keeps the envelope NaN-free.
+    far = float((height + width) ** 2)
+    f = np.minimum(column * column, far)
+    return _lower_envelope_rows(f)
+
+
+def distance_transform(grid: Grid, max_distance: float | None = None) -> DistanceField:
+    result: DistanceField = np.sqrt(squared_distance_transform(grid, max_distance))
+    return result
+
+
+class IncrementalDistance:
+    # distance_transform of a live grid that changes a few cells at a time.
+    # The transform is separable: a changed cell only alters the column
+    # distances of its column, and the row pass is rerun only on rows whose
+    # column distances changed, giving the same values as a full transform.
+    def __init__(self, grid: Grid) -> None:
+        self.grid = grid
+        self._blocked = int(np.count_nonzero(grid))
+        self._column = _column_distance(grid)
+        self.field = distance_transform(grid)
+
+    def update(self, changed: Iterable[Tuple[int, int]]) -> DistanceField:
+        # changed lists the cells whose occupancy flipped since the last call.
+        changed = list(changed)
+        if not changed:
+            return self.field
+        was_empty = self._blocked == 0
+        for x, y in changed:
+            self._blocked += 1 if self.grid[y, x] else -1
+        if was_empty or self._blocked == 0:
+            # The all-free field is +inf everywhere, which the row pass does not
+            # produce, so entering or leaving it is a full transform.
+            self._column = _column_distance(self.grid)
+            self.field = distance_transform(self.grid)
+            return self.field
+        columns = np.unique([x for x, _ in changed])
+        column = _column_distance(self.grid[:, columns])
+        rows = np.flatnonzero((column != self._column[:, columns]).any(axis=1))
+        self._column[:, columns] = column
+        if rows.size:
+            height, width = self.grid.shape
+            far = float((height + width) ** 2)
+            f = np.minimum(self._column[rows] ** 2, far)
+            self.field[rows] = np.sqrt(_lower_envelope_rows(f))
+        return self.field
+
+
+def sample_bilinear(field: DistanceField, xs: DistanceField, ys: DistanceField) -> DistanceField:
+    # Bilinear lookup at continuous (x, y) cell coordinates. Points beyond the
+    # field are clamped onto its edge plus the clamp offset, which keeps the
+    # result a valid distance (1-Lipschitz) outside the sampled area.
+    height, width = field.shape
+    if height == 0 or width == 0:
+        return np.full(np.shape(xs), np.inf)
+    cx = np.clip(xs, 0.0, width - 1)
+    cy = np.clip(ys, 0.0, height - 1)
+    x0 = np.minimum(cx.astype(np.int64), max(width - 2, 0))
+    y0 = np.minimum(cy.astype(np.int64), max(height - 2, 0))
+    x1 = np.minimum(x0 + 1, width - 1)
+    y1 = np.minimum(y0 + 1, height - 1)
+    fx = cx - x0
+    fy = cy - y0
+    result = np.zeros(np.shape(xs))
+    term = np.empty_like(result)
+    for wy, ry in ((1.0 - fy, y0), (fy, y1)):
+        for wx, rx in ((1.0 - fx, x0), (fx, x1)):
+            weight = wx * wy
+            # Skip zero-weight corners so +inf entries do not turn into NaN.
+            term.fill(0.0)
+            np.multiply(weight, field[ry, rx], out=term, where=weight > 0.0)
+            result += term
+    result += np.hypot(xs - cx, ys - cy)
+    return result
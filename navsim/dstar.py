@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import heapq
+import math
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from .map import GridMap
+from .planner import Node, PlanResult, manhattan
+
+Key = Tuple[float, float]
+
+
+class DStarLite:
+    # D* Lite (Koenig & Likhachev) on the same 4-connected unit-cost grid as
+    # astar. The search runs from the goal, so g/rhs survive start moves and
+    # only vertices around changed cells are repaired on the next plan().
+    # The grid is read live: callers mutate it in place and report the cells
+    # they touched through mark_changed().
+    def __init__(self, grid: GridMap, goal: Node) -> None:
+        self.grid = grid
+        self.goal = goal
+        self.start: Optional[Node] = None
+        self.km = 0.0
+        self.g: Dict[Node, float] = {}
+        self.rhs: Dict[Node, float] = {goal: 0.0}
+        self._open: Dict[Node, Key] = {}
+        self._heap: List[Tuple[Key, Node]] = []
+        self._pending: Set[Node] = set()
+        self.expansions = 0
+
+    def _free(self, node: Node) -> bool:
+        return self.grid.in_bounds(node) and self.grid.is_free(node)
+
+    def _neighbors(self, node: Node) -> List[Node]:
+        x, y = node
+        candidates = [(x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)]
+        return [nxt for nxt in candidates if self.grid.in_bounds(nxt)]
+
+    def _cost(self, a: Node, b: Node) -> float:
+        return 1.0 if self._free(a) and self._free(b) else math.inf
+
+    def _key(self, node: Node) -> Key:
+        assert self.start is not None
+        best = min(self.g.get(node, math.inf), self.rhs.get(node, math.inf))
+        return (best + manhattan(self.start, node) + self.km, best)
+
+    def _push(self, node: Node) -> None:
+        key = self._key(node)
+        self._open[node] = key
+        heapq.heappush(self._heap, (key, node))
+
+    def _top(self) -> Optional[Tuple[Key, Node]]:
+        while self._heap:
+            key, node = self._heap[0]
+            if self._open.get(node) == key:
+                return key, node
+            heapq.heappop(self._heap)
+        return None
+
+    def _update_vertex(self, node: Node) -> None:
+        if node != self.goal:
+            best = math.inf
+            if self._free(node):
+                for nxt in self._neighbors(node):
+                    best = min(best, self._cost(node, nxt) + self.g.get(nxt, math.inf))
+            self.rhs[node] = best
+        self._open.pop(node, None)
+        if self.g.get(node, math.inf) != self.rhs.get(node, math.inf):
+            self._push(node)
+
+    def _compute_shortest_path(self) -> None:
+        assert self.start is not None
+        while True:
+            top = self._top()
+            if top is None:
+                return
+            start_g = self.g.get(self.start, math.inf)
+            start_rhs = self.rhs.get(self.start, math.inf)
+            if top[0] >= self._key(self.start) and start_rhs == start_g:
+                return
+            key_old, node = top
+            key_new = self._key(node)
+            if key_old < key_new:
+                # Only the key was outdated (km grew); requeue without expanding.
+                self._push(node)
+                continue
+            self.expansions += 1
+            heapq.heappop(self._heap)
+            del self._open[node]
+            g_old = self.g.get(node, math.inf)
+            rhs = self.rhs.get(node, math.inf)
+            if g_old > rhs:
+                self.g[node] = rhs
+                for prev in self._neighbors(node):
+                    self._update_vertex(prev)
+            else:
+                self.g[node] = math.inf
+                self._update_vertex(node)
+                for prev in self._neighbors(node):
+                    self._update_vertex(prev)
+
+    def mark_changed(self, cells: Iterable[Node]) -> None:
+        self._pending.update(cells)
+
+    def plan(self, start: Node) -> Optional[PlanResult]:
+        if not self.grid.in_bounds(start) or not self.grid.in_bounds(self.goal):
+            return None
+        if self.start is None:
+            self.start = start
+            self._push(self.goal)
+        elif start != self.start:
+            self.km += manhattan(self.start, start)
+            self.start = start
+
+        pending, self._pending = self._pending, set()
+        for cell in pending:
+            if not self.grid.in_bounds(cell):
+                continue
+            # A cell's cost change affects its own edges and its neighbours'.
+            self._update_vertex(cell)
+            for prev in self._neighbors(cell):
+                self._update_vertex(prev)
+
+        if not self._free(start) or not self._free(self.goal):
+            return None
+        expanded = self.expansions
+        self._compute_shortest_path()
+        cost = self.g.get(start, math.inf)
+        if math.isinf(cost):
+            return None
+
+        path = [start]
+        node = start
+        limit = self.grid.width * self.grid.height
+        while node != self.goal:
+            if len(path) > limit:
+                return None
+            best_next = None
+            best = math.inf
+            for nxt in self._neighbors(node):
+                step = self._cost(node, nxt) + self.g.get(nxt, math.inf)
+                if step < best:
+                    best = step
+                    best_next = nxt
+            if best_next is None:
+                return None
+            node = best_next
+            path.append(node)
+        return PlanResult(path=path, cost=cost, expansions=self.expansions - expanded)
@@ -0,0 +1,478 @@
+from __future__ import annotations
+
+import argparse
+import csv
+import math
+import random
+import time
+from dataclasses import asdict, dataclass, field, fields
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+import numpy.typing as npt
+
+from .collision import point_in_collision
+from .control import PurePursuitParams, pure_pursuit_control
+from .costmap import CostMap
+from .goal_field import GoalFieldCache
+from .map import Grid, GridMap, warehouse_grid
+from .path_index import PathIndex
+from .planner import PlanResult, _plan_dense, plan_path
+from .sim import SimParams
+
+Node = Tuple[int, int]
+Point = Tuple[float, float]
+Pose = Tuple[float, float, float]
+
+# Planners whose paths are optimal on the same 4-connected unit-cost grid, so a
+# shared goal field can answer their requests.
+_GOAL_FIELD_PLANNERS = {"astar", "astar_flat", "dijkstra", "goal_field"}
+
+
+@dataclass
+class FleetParams:
+    robot_radius: float = 0.4
+    hash_cell_size: float = 2.0
+    replan_after: int = 5
+    detour_window: int = 8
+    global_planner: str = "astar"
+
+
+class SpatialHash:
+    # Uniform bucket hash of robot positions. Neighbour queries only touch the
+    # buckets overlapping the query disc, so a tick costs O(robots) rather
+    # than O(robots^2).
+    def __init__(self, cell_size: float) -> None:
+        if cell_size <= 0.0:
+            raise ValueError("cell_size must be positive.")
+        self.cell_size = cell_size
+        self._buckets: Dict[Node, Set[int]] = {}
+        self._positions: Dict[int, Point] = {}
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def _key(self, point: Point) -> Node:
+        return (
+            int(math.floor(point[0] / self.cell_size)),
+            int(math.floor(point[1] / self.cell_size)),
+        )
+
+    def move(self, item: int, point: Point) -> None:
+        old = self._positions.get(item)
+        key = self._key(point)
+        if old is not None:
+            old_key = self._key(old)
+            if old_key != key:
+                self._discard(item, old_key)
+        self._buckets.setdefault(key, set()).add(item)
+        self._positions[item] = point
+
+    def remove(self, item: int) -> None:
+        old = self._positions.pop(item, None)
+        if old is not None:
+            self._discard(item, self._key(old))
+
+    def _discard(self, item: int, key: Node) -> None:
+        bucket = self._buckets[key]
+        bucket.discard(item)
+        if not bucket:
+            del self._buckets[key]
+
+    def position(self, item: int) -> Point:
+        return self._positions[item]
+
+    def near(self, point: Point, radius: float) -> List[int]:
+        # Items within radius of point, in ascending order.
+        x, y = point
+        kx0, ky0 = self._key((x - radius, y - radius))
+        kx1, ky1 = self._key((x + radius, y + radius))
+        found: List[int] = []
+        for kx in range(kx0, kx1 + 1):
+            for ky in range(ky0, ky1 + 1):
+                for item in self._buckets.get((kx, ky), ()):
+                    px, py = self._positions[item]
+                    if math.hypot(px - x, py - y) <= radius:
+                        found.append(item)
+        found.sort()
+        return found
+
+
+def plan_requests(
+    grid: GridMap,
+    requests: Sequence[Tuple[Node, Node]],
+    method: str = "astar",
+    cache: GoalFieldCache | None = None,
+    min_shared: int = 8,
+) -> List[Optional[PlanResult]]:
+    # Plans a batch of (start, goal) requests. A goal-rooted field costs about
+    # as much as a handful of single searches, so goals shared by at least
+    # min_shared requests get one field; the rest are searched one by one, with
+    # astar served by astar_flat (same paths, cheaper on large grids).
+    counts: Dict[Node, int] = {}
+    for _, goal in requests:
+        counts[goal] = counts.get(goal, 0) + 1
+    fields = cache if cache is not None else GoalFieldCache()
+    single = "astar_flat" if method == "astar" else method
+    results: List[Optional[PlanResult]] = []
+    for start, goal in requests:
+        if method in _GOAL_FIELD_PLANNERS and counts[goal] >= min_shared:
+            results.append(fields.plan(grid, start, goal))
+        else:
+            results.append(plan_path(grid, start, goal, single))
+    return results
+
+
+@dataclass
+class RobotStats:
+    robot: int
+    completed: bool = False
+    ticks: int = 0
+    steps: int = 0
+    distance: float = 0.0
+    blocked_ticks: int = 0
+    replans: int = 0
+    failed_replans: int = 0
+    collisions: int = 0
+
+
+@dataclass
+class FleetReport:
+    robots: List[RobotStats]
+    ticks: int
+    dt: float
+    wall_seconds: float
+    plan_seconds: float
+
+    @property
+    def sim_seconds(self) -> float:
+        return self.ticks * self.dt
+
+    @property
+    def completed(self) -> int:
+        return sum(robot.completed for robot in self.robots)
+
+    @property
+    def real_time_factor(self) -> float:
+        return self.sim_seconds / self.wall_seconds if self.wall_seconds > 0.0 else math.inf
+
+    @property
+    def robot_steps_per_second(self) -> float:
+        steps = sum(robot.ticks for robot in self.robots)
+        return steps / self.wall_seconds if self.wall_seconds > 0.0 else math.inf
+
+    @property
+    def goals_per_minute(self) -> float:
+        return 60.0 * self.completed / self.sim_seconds if self.sim_seconds > 0.0 else 0.0
+
+    def rows(self) -> List[dict]:
+        rows = []
+        for robot in self.robots:
+            row = asdict(robot)
+            row["completed"] = int(robot.completed)
+            active_seconds = robot.ticks * self.dt
+            row["avg_speed"] = robot.distance / active_seconds if active_seconds else 0.0
+            rows.append(row)
+        return rows
+
+    def summary(self) -> dict:
+        return {
+            "robots": len(self.robots),
+            "completed": self.completed,
+            "ticks": self.ticks,
+            "sim_seconds": self.sim_seconds,
+            "wall_seconds": self.wall_seconds,
+            "plan_seconds": self.plan_seconds,
+            "real_time_factor": self.real_time_factor,
+            "robot_steps_per_second": self.robot_steps_per_second,
+            "goals_per_minute": self.goals_per_minute,
+            "replans": sum(robot.replans for robot in self.robots),
+            "collisions": sum(robot.collisions for robot in self.robots),
+        }
+
+
+@dataclass
+class _Robot:
+    index: int
+    pose: Pose
+    goal: Node
+    path: List[Point]
+    path_index: PathIndex
+    stats: RobotStats
+    target_idx: int = 0
+    blocked: int = 0
+    done: bool = False
+
+
+@dataclass
+class Fleet:
+    # Many pure-pursuit robots sharing one static costmap. Robots move one at a
+    # time within a tick, so each move is checked against neighbours' latest
+    # positions from the spatial hash and footprints never overlap. A robot
+    # held up for replan_after ticks asks for a detour; the tick's requests are
+    # planned together on small windows with nearby footprints stamped in.
+    # Robots leave the floor once they reach their goal.
+    costmap: CostMap
+    starts: Sequence[Pose]
+    goals: Sequence[Node]
+    params: FleetParams = field(default_factory=FleetParams)
+    sim_params: SimParams = field(default_factory=SimParams)
+    ctrl_params: PurePursuitParams = field(default_factory=PurePursuitParams)
+
+    def __post_init__(self) -> None:
+        if len(self.starts) != len(self.goals):
+            raise ValueError("Fleet needs one goal per start pose.")
+        self.tick = 0
+        self.hash = SpatialHash(self.params.hash_cell_size)
+        self._robots: List[_Robot] = []
+        t0 = time.perf_counter()
+        grid = self.costmap.inflated_map()
+        requests = [
+            ((int(round(x)), int(round(y))), goal)
+            for (x, y, _), goal in zip(self.starts, self.goals)
+        ]
+        plans = plan_requests(grid, requests, self.params.global_planner)
+        self.plan_seconds = time.perf_counter() - t0
+        for i, (start, goal, plan) in enumerate(zip(self.starts, self.goals, plans)):
+            path = [(float(x), float(y)) for x, y in plan.path] if plan else [(start[0], start[1])]
+            robot = _Robot(i, start, goal, path, PathIndex(path), RobotStats(robot=i))
+            # Robots without a plan stay parked (and in the way) for the run.
+            robot.done = plan is None
+            self._robots.append(robot)
+            self.hash.move(i, (start[0], start[1]))
+        self.wall_seconds = 0.0
+
+    @property
+    def poses(self) -> List[Pose]:
+        return [robot.pose for robot in self._robots]
+
+    @property
+    def active(self) -> int:
+        return sum(not robot.done for robot in self._robots)
+
+    def _blocked(self, index: int, old: Point, new: Point) -> bool:
+        # A move is refused if it ends inside another footprint and gets closer
+        # to that robot; moving apart is always allowed.
+        clearance = 2.0 * self.params.robot_radius
+        for other in self.hash.near(new, clearance):
+            if other == index:
+                continue
+            ox, oy = self.hash.position(other)
+            dist_new = math.hypot(new[0] - ox, new[1] - oy)
+            if dist_new < clearance and dist_new < math.hypot(old[0] - ox, old[1] - oy):
+                return True
+        return False
+
+    def step(self) -> bool:
+        t0 = time.perf_counter()
+        params = self.sim_params
+        requests: List[_Robot] = []
+        for robot in self._robots:
+            if robot.done:
+                continue
+            x, y, yaw = robot.pose
+            gx, gy = robot.goal
+            if math.hypot(gx - x, gy - y) <= params.goal_tolerance:
+                robot.done = True
+                robot.stats.completed = True
+                self.hash.remove(robot.index)
+                continue
+            robot.stats.ticks += 1
+            v, omega, robot.target_idx = pure_pursuit_control(
+                robot.pose, robot.path, self.ctrl_params, robot.target_idx, robot.path_index
+            )
+            nx = x + v * math.cos(yaw) * params.dt
+            ny = y + v * math.sin(yaw) * params.dt
+            if self._blocked(robot.index, (x, y), (nx, ny)):
+                # Held in place, but still turning towards the target so a
+                # detour can be taken once it is planned.
+                robot.pose = (x, y, yaw + omega * params.dt)
+                robot.blocked += 1
+                robot.stats.blocked_ticks += 1
+                if robot.blocked >= self.params.replan_after:
+                    requests.append(robot)
+                continue
+            robot.blocked = 0
+            robot.pose = (nx, ny, yaw + omega * params.dt)
+            robot.stats.steps += 1
+            robot.stats.distance += math.hypot(nx - x, ny - y)
+            self.hash.move(robot.index, (nx, ny))
+            if point_in_collision(self.costmap, (nx, ny)):
+                robot.stats.collisions += 1
+        if requests:
+            self._detour(requests)
+        self.tick += 1
+        self.wall_seconds += time.perf_counter() - t0
+        return self.active > 0
+
+    def _detour(self, robots: List[_Robot]) -> None:
+        # The tick's requests are handled as one batch: footprints of robots
+        # near any requester are stamped once into a coverage count over the
+        # union of the requesters' windows, each window is cut from it without
+        # the requester's own footprint, and the windows are then planned.
+        t0 = time.perf_counter()
+        w = self.params.detour_window
+        clearance = 2.0 * self.params.robot_radius
+        windows = []
+        for robot in robots:
+            robot.blocked = 0
+            cx, cy = int(round(robot.pose[0])), int(round(robot.pose[1]))
+            x0, y0 = max(0, cx - w), max(0, cy - w)
+            x1 = min(self.costmap.width, cx + w + 1)
+            y1 = min(self.costmap.height, cy + w + 1)
+            windows.append((robot, (cx, cy), (x0, y0, x1, y1)))
+        bx0 = min(bounds[0] for _, _, bounds in windows)
+        by0 = min(bounds[1] for _, _, bounds in windows)
+        bx1 = max(bounds[2] for _, _, bounds in windows)
+        by1 = max(bounds[3] for _, _, bounds in windows)
+        region = (bx0, by0, bx1, by1)
+        coverage = np.zeros((by1 - by0, bx1 - bx0), dtype=np.int32)
+        stamped: Set[int] = set()
+        for robot, _, _ in windows:
+            for other in self.hash.near(robot.pose[:2], w * math.sqrt(2.0) + clearance):
+                if other not in stamped:
+                    stamped.add(other)
+                    self._stamp(coverage, region, self.hash.position(other), 1)
+
+        requests = []
+        for robot, cell, (x0, y0, x1, y1) in windows:
+            if robot.index in stamped:
+                self._stamp(coverage, region, self.hash.position(robot.index), -1)
+            window = self.costmap.inflated[y0:y1, x0:x1] | (
+                coverage[y0 - by0 : y1 - by0, x0 - bx0 : x1 - bx0] > 0
+            )
+            if robot.index in stamped:
+                self._stamp(coverage, region, self.hash.position(robot.index), 1)
+            window[cell[1] - y0, cell[0] - x0] = 0
+            requests.append((robot, cell, (x0, y0), window))
+
+        for robot, cell, origin, window in requests:
+            path = self._detour_path(robot, cell, origin, window)
+            if path is None:
+                robot.stats.failed_replans += 1
+                continue
+            robot.path = path
+            robot.path_index = PathIndex(path)
+            robot.target_idx = 0
+            robot.stats.replans += 1
+        self.plan_seconds += time.perf_counter() - t0
+
+    def _stamp(
+        self,
+        coverage: npt.NDArray[np.int32],
+        region: Tuple[int, int, int, int],
+        point: Point,
+        add: int,
+    ) -> None:
+        # Adds (or with add=-1 removes) one footprint in the coverage count.
+        x0, y0, x1, y1 = region
+        ox, oy = point
+        clearance = 2.0 * self.params.robot_radius
+        reach = int(math.ceil(clearance))
+        gy0, gy1 = max(y0, int(math.floor(oy)) - reach), min(y1, int(math.ceil(oy)) + reach + 1)
+        gx0, gx1 = max(x0, int(math.floor(ox)) - reach), min(x1, int(math.ceil(ox)) + reach + 1)
+        for gy in range(gy0, gy1):
+            for gx in range(gx0, gx1):
+                if math.hypot(gx - ox, gy - oy) < clearance:
+                    coverage[gy - y0, gx - x0] += add
+
+    def _detour_path(
+        self, robot: _Robot, cell: Node, origin: Node, window: Grid
+    ) -> Optional[List[Point]]:
+        # Replans inside the robot's window back to the farthest reachable
+        # waypoint of the current path that lies in the window. Windows are
+        # throwaway grids, so they are planned without the module-level caches.
+        cx, cy = cell
+        x0, y0 = origin
+        height, width = window.shape
+        rejoin = None
+        for i in range(robot.target_idx, len(robot.path)):
+            px, py = int(round(robot.path[i][0])), int(round(robot.path[i][1]))
+            if not (x0 <= px < x0 + width and y0 <= py < y0 + height):
+                break
+            if window[py - y0, px - x0] == 0 and (px, py) != (cx, cy):
+                rejoin = i
+        if rejoin is None:
+            return None
+        gx, gy = int(round(robot.path[rejoin][0])), int(round(robot.path[rejoin][1]))
+        plan = _plan_dense(
+            GridMap(window), (cx - x0, cy - y0), (gx - x0, gy - y0), self.params.global_planner
+        )
+        if plan is None:
+            return None
+        detour = [(float(px + x0), float(py + y0)) for px, py in plan.path]
+        return detour + robot.path[rejoin + 1 :]
+
+    def run(self) -> FleetReport:
+        while self.tick < self.sim_params.max_steps and self.step():
+            pass
+        return FleetReport(
+            robots=[robot.stats for robot in self._robots],
+            ticks=self.tick,
+            dt=self.sim_params.dt,
+            wall_seconds=self.wall_seconds,
+            plan_seconds=self.plan_seconds,
+        )
+
+
+def sample_tasks(
+    costmap: CostMap, robots: int, rng: random.Random
+) -> Tuple[List[Pose], List[Node]]:
+    # Distinct free start cells (one robot per cell) and free goal cells.
+    free = [(int(x), int(y)) for y, x in np.argwhere(costmap.inflated == 0)]
+    if len(free) < robots:
+        raise ValueError("Not enough free cells for the requested fleet size.")
+    starts = rng.sample(free, robots)
+    goals = [rng.choice(free) for _ in range(robots)]
+    poses = [(float(x), float(y), rng.uniform(-math.pi, math.pi)) for x, y in starts]
+    return poses, goals
+
+
+def _print_summary(summary: dict) -> None:
+    print("Fleet summary")
+    print(f"Robots: {summary['robots']} (completed {summary['completed']})")
+    print(f"Ticks: {summary['ticks']} ({summary['sim_seconds']:.1f} s simulated)")
+    print(f"Wall time: {summary['wall_seconds']:.2f} s (+{summary['plan_seconds']:.2f} s planning)")
+    print(f"Real-time factor: {summary['real_time_factor']:.1f}x")
+    print(f"Robot steps per second: {summary['robot_steps_per_second']:.0f}")
+    print(f"Goals per minute: {summary['goals_per_minute']:.1f}")
+    print(f"Replans: {summary['replans']}, collisions: {summary['collisions']}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run a navsim fleet simulation.")
+    parser.add_argument("--robots", type=int, default=50)
+    parser.add_argument("--size", type=int, default=200)
+    parser.add_argument("--steps", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--inflation-radius", type=float, default=0.0)
+    parser.add_argument("--global-planner", default="astar")
+    parser.add_argument("--csv", type=Path, default=None)
+    args = parser.parse_args()
+
+    grid = warehouse_grid(args.size, args.size)
+    costmap = CostMap.from_grid(grid, args.inflation_radius)
+    starts, goals = sample_tasks(costmap, args.robots, random.Random(args.seed))
+    fleet = Fleet(
+        costmap,
+        starts,
+        goals,
+        FleetParams(global_planner=args.global_planner),
+        SimParams(max_steps=args.steps),
+    )
+    report = fleet.run()
+    _print_summary(report.summary())
+    if args.csv is not None:
+        rows = report.rows()
+        # An empty fleet still gets a header row.
+        columns = list(rows[0]) if rows else [f.name for f in fields(RobotStats)] + ["avg_speed"]
+        args.csv.parent.mkdir(parents=True, exist_ok=True)
+        with args.csv.open("w", newline="") as handle:
+            writer = csv.DictWriter(handle, fieldnames=columns)
+            writer.writeheader()
+            writer.writerows(rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import math
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Deque, Optional, Tuple
+
+import numpy as np
+
+from .distance import DistanceField
+from .map import GridMap
+from .planner import Node, PlanResult, _flat_layout
+
+
+@dataclass(frozen=True, eq=False)
+class GoalField:
+    # Cost-to-go from every cell to one goal on the 4-connected unit-cost grid
+    # used by astar; +inf where the goal is unreachable.
+    grid: GridMap
+    goal: Node
+    cost: DistanceField
+
+    def cost_to_go(self, node: Node) -> float:
+        x, y = node
+        if not self.grid.in_bounds(node):
+            return math.inf
+        return float(self.cost[y, x])
+
+    def heuristic(self, node: Node, goal: Node) -> float:
+        # Exact (perfect) heuristic for searches towards this field's goal.
+        if goal != self.goal:
+            raise ValueError(f"Goal field for {self.goal} queried towards {goal}.")
+        return self.cost_to_go(node)
+
+    def extract(self, start: Node) -> Optional[PlanResult]:
+        total = self.cost_to_go(start)
+        if math.isinf(total):
+            return None
+        path = [start]
+        node = start
+        remaining = total
+        while remaining > 0.0:
+            x, y = node
+            for nxt in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+                if self.cost_to_go(nxt) == remaining - 1.0:
+                    node = nxt
+                    break
+            else:
+                return None
+            remaining -= 1.0
+            path.append(node)
+        return PlanResult(path=path, cost=total)
+
+
+def goal_field(grid: GridMap, goal: Node) -> GoalField:
+    # Reverse breadth-first search from the goal (Dijkstra with unit costs).
+    cost = np.full((grid.height, grid.width), np.inf)
+    if not grid.in_bounds(goal) or not grid.is_free(goal):
+        return GoalField(grid=grid, goal=goal, cost=cost)
+    cells, stride = _flat_layout(grid)
+    dist = [-1] * len(cells)
+    goal_idx = (goal[0] + 1) * stride + goal[1] + 1
+    dist[goal_idx] = 0
+    queue: Deque[int] = deque([goal_idx])
+    offsets = (stride, -stride, 1, -1)
+    while queue:
+        current = queue.popleft()
+        step = dist[current] + 1
+        for offset in offsets:
+            nxt = current + offset
+            if cells[nxt] or dist[nxt] >= 0:
+                continue
+            dist[nxt] = step
+            queue.append(nxt)
+    # Back from the padded column-major layout to a (height, width) array.
+    flat = np.asarray(dist, dtype=np.float64).reshape(grid.width + 2, stride)
+    field = flat[1:-1, 1:-1].T
+    cost[field >= 0] = field[field >= 0]
+    return GoalField(grid=grid, goal=goal, cost=cost)
+
+
+class GoalFieldCache:
+    # LRU of goal fields keyed by (occupancy fingerprint, shape, goal), so a
+    # field is reused for any grid with the same cells and a grid edited through
+    # IncrementalCostMap, whose GridMaps carry the updated fingerprint, misses.
+    # After other in-place edits, wrap the grid in a new GridMap.
+    def __init__(self, max_entries: int = 32) -> None:
+        self.max_entries = max_entries
+        self._fields: OrderedDict[Tuple[int, int, int, Node], GoalField] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._fields)
+
+    def get(self, grid: GridMap, goal: Node) -> GoalField:
+        key = (grid.fingerprint, grid.width, grid.height, goal)
+        field = self._fields.get(key)
+        if field is not None:
+            self.hits += 1
+            self._fields.move_to_end(key)
+            return field
+        self.misses += 1
+        field = goal_field(grid, goal)
+        self._fields[key] = field
+        while len(self._fields) > self.max_entries:
+            self._fields.popitem(last=False)
+        return field
+
+    def plan(self, grid: GridMap, start: Node, goal: Node) -> Optional[PlanResult]:
+        if not grid.in_bounds(start) or not grid.is_free(start):
+            return None
+        return self.get(grid, goal).extract(start)
+
+    def invalidate(self, grid: GridMap | None = None) -> None:
+        if grid is None:
+            self._fields.clear()
+            return
+        shape = (grid.fingerprint, grid.width, grid.height)
+        for key in [key for key in self._fields if key[:3] == shape]:
+            del self._fields[key]
+
+
+default_cache = GoalFieldCache()
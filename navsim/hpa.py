@@ -0,0 +1,337 @@
+from __future__ import annotations
+
+import heapq
+import math
+from collections import OrderedDict, deque
+from typing import Deque, Dict, Iterable, List, Optional, Set, Tuple
+
+from .map import GridMap
+from .planner import Node, PlanResult, _flat_layout, _SearchStats, manhattan
+
+Cluster = Tuple[int, int]
+Border = Tuple[Cluster, Cluster]
+
+# Free border stretches up to this wide get one transition at their middle,
+# wider ones a transition at each end.
+_WIDE_ENTRANCE = 6
+
+
+class ClusterGraph:
+    # HPA* abstraction of the 4-connected unit-cost grid used by astar: square
+    # clusters, transition cells on each free stretch of a cluster border, and
+    # exact in-cluster distances between the transitions of each cluster.
+    # Queries search this graph first and then refine only the chosen edges, so
+    # paths are near-optimal rather than shortest. Like DStarLite the grid is
+    # read live: callers report cells they change through mark_changed(), and
+    # the next plan() rebuilds just those clusters plus any neighbour whose
+    # shared border transitions moved.
+    def __init__(self, grid: GridMap, cluster_size: int = 16) -> None:
+        if cluster_size < 2:
+            raise ValueError("cluster_size must be at least 2.")
+        self.grid = grid
+        self.cluster_size = cluster_size
+        self.columns = -(-grid.width // cluster_size)
+        self.rows = -(-grid.height // cluster_size)
+        self._borders: Dict[Border, List[Tuple[Node, Node]]] = {}
+        self._links: Dict[Node, Set[Node]] = {}
+        self._edges: Dict[Cluster, Dict[Node, Dict[Node, float]]] = {}
+        self._refined: Dict[Cluster, Dict[Tuple[Node, Node], List[Node]]] = {}
+        self._pending: Set[Cluster] = set()
+        self.rebuilds = 0
+        clusters = [(cx, cy) for cx in range(self.columns) for cy in range(self.rows)]
+        for cluster in clusters:
+            for border in self._border_keys(cluster):
+                if border[0] == cluster:
+                    self._set_border(border, self._scan_border(border))
+        for cluster in clusters:
+            self._build_cluster(cluster)
+
+    def cluster_of(self, node: Node) -> Cluster:
+        return node[0] // self.cluster_size, node[1] // self.cluster_size
+
+    def _bounds(self, cluster: Cluster) -> Tuple[int, int, int, int]:
+        x0 = cluster[0] * self.cluster_size
+        y0 = cluster[1] * self.cluster_size
+        x1 = min(x0 + self.cluster_size, self.grid.width)
+        y1 = min(y0 + self.cluster_size, self.grid.height)
+        return x0, y0, x1, y1
+
+    def _border_keys(self, cluster: Cluster) -> List[Border]:
+        # Borders are keyed (left, right) or (lower, upper).
+        cx, cy = cluster
+        keys = []
+        if cx > 0:
+            keys.append(((cx - 1, cy), cluster))
+        if cx + 1 < self.columns:
+            keys.append((cluster, (cx + 1, cy)))
+        if cy > 0:
+            keys.append(((cx, cy - 1), cluster))
+        if cy + 1 < self.rows:
+            keys.append((cluster, (cx, cy + 1)))
+        return keys
+
+    def _scan_border(self, border: Border) -> List[Tuple[Node, Node]]:
+        (cx, _), (nx, _) = border
+        x0, y0, x1, y1 = self._bounds(border[0])
+        cells = self.grid.grid
+        if nx != cx:
+            free = (cells[y0:y1, x1 - 1] == 0) & (cells[y0:y1, x1] == 0)
+        else:
+            free = (cells[y1 - 1, x0:x1] == 0) & (cells[y1, x0:x1] == 0)
+        picks: List[int] = []
+        run_start = -1
+        for i, ok in enumerate(free.tolist() + [False]):
+            if ok and run_start < 0:
+                run_start = i
+            elif not ok and run_start >= 0:
+                if i - run_start < _WIDE_ENTRANCE:
+                    picks.append((run_start + i - 1) // 2)
+                else:
+                    picks += [run_start, i - 1]
+                run_start = -1
+        if nx != cx:
+            return [((x1 - 1, y0 + i), (x1, y0 + i)) for i in picks]
+        return [((x0 + i, y1 - 1), (x0 + i, y1)) for i in picks]
+
+    def _set_border(self, border: Border, transitions: List[Tuple[Node, Node]]) -> bool:
+        old = self._borders.get(border, [])
+        if old == transitions:
+            return False
+        for a, b in old:
+            self._links[a].discard(b)
+            self._links[b].discard(a)
+        for a, b in transitions:
+            self._links.setdefault(a, set()).add(b)
+            self._links.setdefault(b, set()).add(a)
+        self._borders[border] = transitions
+        return True
+
+    def _entrances(self, cluster: Cluster) -> List[Node]:
+        found: Set[Node] = set()
+        for border in self._border_keys(cluster):
+            side = 0 if border[0] == cluster else 1
+            found.update(pair[side] for pair in self._borders.get(border, []))
+        return sorted(found)
+
+    def _layout(self, cluster: Cluster) -> Tuple[bytes, int, int, int]:
+        # The cluster's own cells in the padded column-major layout of astar_flat.
+        x0, y0, x1, y1 = self._bounds(cluster)
+        cells, stride = _flat_layout(GridMap(self.grid.grid[y0:y1, x0:x1]))
+        return cells, stride, x0, y0
+
+    @staticmethod
+    def _flood(
+        layout: Tuple[bytes, int, int, int], source: Node, stop: Optional[Set[int]] = None
+    ) -> List[int]:
+        # Breadth-first distances from source without leaving the cluster
+        # (-1 where unreached), ending early once every index in stop is reached.
+        cells, stride, x0, y0 = layout
+        dist = [-1] * len(cells)
+        src = (source[0] - x0 + 1) * stride + source[1] - y0 + 1
+        if cells[src]:
+            return dist
+        dist[src] = 0
+        remaining = len(stop) if stop is not None else -1
+        queue: Deque[int] = deque([src])
+        offsets = (stride, -stride, 1, -1)
+        while queue and remaining:
+            current = queue.popleft()
+            step = dist[current] + 1
+            for offset in offsets:
+                nxt = current + offset
+                if cells[nxt] or dist[nxt] >= 0:
+                    continue
+                dist[nxt] = step
+                queue.append(nxt)
+                if stop is not None and nxt in stop:
+                    remaining -= 1
+        return dist
+
+    def _distances(
+        self, layout: Tuple[bytes, int, int, int], source: Node, targets: Iterable[Node]
+    ) -> Dict[Node, float]:
+        _, stride, x0, y0 = layout
+        index = {(x - x0 + 1) * stride + y - y0 + 1: (x, y) for x, y in targets}
+        found: Dict[Node, float] = {}
+        if not index:
+            return found
+        dist = self._flood(layout, source, set(index))
+        for idx, node in index.items():
+            if dist[idx] > 0:
+                found[node] = float(dist[idx])
+        return found
+
+    def _build_cluster(self, cluster: Cluster) -> None:
+        entrances = self._entrances(cluster)
+        layout = self._layout(cluster)
+        edges: Dict[Node, Dict[Node, float]] = {node: {} for node in entrances}
+        # Distances are symmetric, so each pair is measured from one end only.
+        for i, node in enumerate(entrances):
+            for other, cost in self._distances(layout, node, entrances[i + 1 :]).items():
+                edges[node][other] = cost
+                edges[other][node] = cost
+        self._edges[cluster] = edges
+        self._refined[cluster] = {}
+        self.rebuilds += 1
+
+    def mark_changed(self, cells: Iterable[Node]) -> None:
+        self._pending.update(self.cluster_of(cell) for cell in cells if self.grid.in_bounds(cell))
+
+    def _refresh(self) -> None:
+        pending, self._pending = self._pending, set()
+        dirty = set(pending)
+        for cluster in pending:
+            for border in self._border_keys(cluster):
+                if self._set_border(border, self._scan_border(border)):
+                    dirty.update(border)
+        for cluster in sorted(dirty):
+            self._build_cluster(cluster)
+
+    def _refine(self, a: Node, b: Node) -> Optional[List[Node]]:
+        # Shortest in-cluster cell path from a to b, cached between transitions.
+        # None if b cannot be reached from a inside the cluster, which happens
+        # when the grid changed without mark_changed().
+        cluster = self.cluster_of(a)
+        cached = self._refined[cluster].get((a, b))
+        if cached is not None:
+            return cached
+        layout = self._layout(cluster)
+        _, stride, x0, y0 = layout
+        dist = self._flood(layout, b)
+        idx = (a[0] - x0 + 1) * stride + a[1] - y0 + 1
+        if dist[idx] < 0:
+            return None
+        path = [a]
+        while dist[idx] > 0:
+            for offset in (stride, -stride, 1, -1):
+                if dist[idx + offset] == dist[idx] - 1:
+                    idx += offset
+                    break
+            else:
+                return None
+            x, y = divmod(idx, stride)
+            path.append((x + x0 - 1, y + y0 - 1))
+        edges = self._edges[cluster]
+        if a in edges and b in edges:
+            self._refined[cluster][(a, b)] = path
+        return path
+
+    def plan(self, start: Node, goal: Node) -> Optional[PlanResult]:
+        if not self.grid.in_bounds(start) or not self.grid.in_bounds(goal):
+            return None
+        if not self.grid.is_free(start) or not self.grid.is_free(goal):
+            return None
+        self._refresh()
+        if start == goal:
+            return PlanResult(path=[start], cost=0.0)
+
+        # Start and goal join their clusters' transitions for this query only.
+        start_cluster = self.cluster_of(start)
+        goal_cluster = self.cluster_of(goal)
+        targets = list(self._edges[start_cluster])
+        if goal_cluster == start_cluster:
+            targets.append(goal)
+        leave = self._distances(self._layout(start_cluster), start, targets)
+        arrive = self._distances(self._layout(goal_cluster), goal, self._edges[goal_cluster])
+
+        open_heap: List[Tuple[float, Node]] = [(float(manhattan(start, goal)), start)]
+        came_from: Dict[Node, Node] = {}
+        g_cost: Dict[Node, float] = {start: 0.0}
+        closed: Set[Node] = set()
+        # Counters describe the abstract search; refinement is not counted.
+        stats = _SearchStats()
+        while open_heap:
+            stats.pop(len(open_heap))
+            _, current = heapq.heappop(open_heap)
+            if current in closed:
+                stats.stale_pops += 1
+                continue
+            if current == goal:
+                path = self._refine_path(came_from, start, goal)
+                if path is None:
+                    return None
+                return stats.result(path, g_cost[goal], len(open_heap))
+            closed.add(current)
+
+            if current == start:
+                edges = dict(leave)
+            else:
+                edges = dict(self._edges[self.cluster_of(current)].get(current, {}))
+                if current in arrive:
+                    edges[goal] = arrive[current]
+            for linked in self._links.get(current, ()):
+                edges[linked] = 1.0
+            base = g_cost[current]
+            for nxt, cost in edges.items():
+                tentative = base + cost
+                if nxt in closed or tentative >= g_cost.get(nxt, math.inf):
+                    continue
+                came_from[nxt] = current
+                g_cost[nxt] = tentative
+                heapq.heappush(open_heap, (tentative + manhattan(nxt, goal), nxt))
+
+        return None
+
+    def _refine_path(
+        self, came_from: Dict[Node, Node], start: Node, goal: Node
+    ) -> Optional[List[Node]]:
+        abstract = [goal]
+        while abstract[-1] != start:
+            abstract.append(came_from[abstract[-1]])
+        abstract.reverse()
+        path = [start]
+        for a, b in zip(abstract, abstract[1:]):
+            if manhattan(a, b) == 1:
+                path.append(b)
+                continue
+            refined = self._refine(a, b)
+            if refined is None:
+                return None
+            path.extend(refined[1:])
+        return path
+
+
+class ClusterGraphCache:
+    # LRU of cluster abstractions keyed by occupancy fingerprint and shape, as
+    # GoalFieldCache, so a grid edited through IncrementalCostMap misses. After
+    # other in-place edits wrap the grid in a new GridMap, or keep a
+    # ClusterGraph and report the cells through mark_changed() as DynamicWorld
+    # does.
+    def __init__(self, max_entries: int = 8, cluster_size: int = 16) -> None:
+        self.max_entries = max_entries
+        self.cluster_size = cluster_size
+        self._graphs: OrderedDict[Tuple[int, int, int], ClusterGraph] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._graphs)
+
+    def get(self, grid: GridMap) -> ClusterGraph:
+        key = (grid.fingerprint, grid.width, grid.height)
+        graph = self._graphs.get(key)
+        if graph is not None:
+            self.hits += 1
+            self._graphs.move_to_end(key)
+            # Same cells, possibly in another buffer: refinement reads the
+            # grid live, so it must read the one being queried.
+            graph.grid = grid
+            return graph
+        self.misses += 1
+        graph = ClusterGraph(grid, self.cluster_size)
+        self._graphs[key] = graph
+        while len(self._graphs) > self.max_entries:
+            self._graphs.popitem(last=False)
+        return graph
+
+    def plan(self, grid: GridMap, start: Node, goal: Node) -> Optional[PlanResult]:
+        return self.get(grid).plan(start, goal)
+
+    def invalidate(self, grid: GridMap | None = None) -> None:
+        if grid is None:
+            self._graphs.clear()
+            return
+        self._graphs.pop((grid.fingerprint, grid.width, grid.height), None)
+
+
+default_cache = ClusterGraphCache()
@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import os
+from collections import OrderedDict
+from pathlib import Path
+from typing import List, Optional, Tuple, Union
+
+import numpy as np
+import numpy.typing as npt
+
+from .goal_field import goal_field
+from .map import GridMap
+from .planner import Node, PlanResult, astar_flat
+
+# Distances are stored as float32, which holds path lengths exactly up to 2**24.
+Distances = npt.NDArray[np.float32]
+
+
+class Landmarks:
+    # ALT preprocessing for the 4-connected unit-cost grid of astar: exact
+    # distances from a few landmark cells to every cell. By the triangle
+    # inequality |d(L, goal) - d(L, node)| never exceeds d(node, goal), so the
+    # largest such bound (and manhattan) is a consistent heuristic that sees
+    # walls. A node and goal reachable from different sets of landmarks lie in
+    # different components and get +inf.
+    def __init__(self, grid: GridMap, nodes: List[Node], distances: Distances) -> None:
+        self.grid = grid
+        self.nodes = nodes
+        self.distances = distances
+        # Flat float views; indexing them yields Python floats cheaply.
+        self._flat = [layer.reshape(-1).data for layer in distances]
+        self._goal: Optional[Node] = None
+        self._goal_costs: List[float] = []
+
+    def heuristic(self, node: Node, goal: Node) -> float:
+        if goal != self._goal:
+            index = goal[1] * self.grid.width + goal[0]
+            self._goal = goal
+            self._goal_costs = [layer[index] for layer in self._flat]
+        best = float(abs(node[0] - goal[0]) + abs(node[1] - goal[1]))
+        index = node[1] * self.grid.width + node[0]
+        for layer, to_goal in zip(self._flat, self._goal_costs):
+            # inf - inf is nan when neither end is reachable, and nan never wins.
+            bound = abs(to_goal - layer[index])
+            if bound > best:
+                best = bound
+        return best
+
+    def plan(self, start: Node, goal: Node) -> Optional[PlanResult]:
+        return astar_flat(self.grid, start, goal, heuristic=self.heuristic)
+
+    def save(self, path: Union[str, Path]) -> None:
+        # Written under a temporary name and renamed, so readers never see a
+        # partial file.
+        path = Path(path)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with tmp.open("wb") as handle:
+            np.savez(
+                handle,
+                fingerprint=np.array([self.grid.fingerprint], dtype=np.uint64),
+                shape=np.array(self.grid.grid.shape, dtype=np.int64),
+                nodes=np.array(self.nodes, dtype=np.int64).reshape(-1, 2),
+                distances=self.distances,
+            )
+        os.replace(tmp, path)
+
+
+def select_landmarks(grid: GridMap, count: int = 8) -> Landmarks:
+    # Farthest-point selection: the first landmark is the cell farthest from
+    # the first free cell, and each next one the cell farthest from all chosen
+    # so far, which spreads them along the map's periphery.
+    free = np.flatnonzero(grid.grid.reshape(-1) == 0)
+    nodes: List[Node] = []
+    distances = np.zeros((max(count, 0), grid.height, grid.width), dtype=np.float32)
+    if free.size and count > 0:
+        seed = int(free[0])
+        nearest = goal_field(grid, (seed % grid.width, seed // grid.width)).cost
+        while len(nodes) < count:
+            reach = np.where(np.isfinite(nearest), nearest, -1.0)
+            index = int(np.argmax(reach))
+            if nodes and reach.flat[index] <= 0.0:
+                break
+            node = (index % grid.width, index // grid.width)
+            layer = goal_field(grid, node).cost
+            nearest = layer if not nodes else np.minimum(nearest, layer)
+            distances[len(nodes)] = layer
+            nodes.append(node)
+    if len(nodes) < len(distances):
+        distances = distances[: len(nodes)].copy()
+    return Landmarks(grid, nodes, distances)
+
+
+def load_landmarks(path: Union[str, Path], grid: GridMap) -> Optional[Landmarks]:
+    # None unless the file holds landmarks for exactly this occupancy.
+    try:
+        with np.load(Path(path)) as data:
+            fingerprint = int(data["fingerprint"][0])
+            shape = tuple(int(v) for v in data["shape"])
+            nodes = [(int(x), int(y)) for x, y in data["nodes"]]
+            distances = data["distances"]
+    except (OSError, KeyError, ValueError):
+        return None
+    if shape != grid.grid.shape or fingerprint != grid.fingerprint:
+        return None
+    return Landmarks(grid, nodes, distances)
+
+
+class LandmarkCache:
+    # LRU of landmark sets keyed by occupancy fingerprint and shape. For
+    # a map loaded from a file, sets are also saved next to it as
+    # <map>.alt<count>.npz (<map>.r<radius>.alt<count>.npz for its inflated
+    # static costmap layer) and reloaded when the fingerprint still matches.
+    def __init__(self, max_entries: int = 4, count: int = 8) -> None:
+        self.max_entries = max_entries
+        self.count = count
+        self._sets: OrderedDict[Tuple[int, int, int], Landmarks] = OrderedDict()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._sets)
+
+    def _file(self, grid: GridMap) -> Optional[Path]:
+        if grid._origin is None:
+            return None
+        origin = Path(grid._origin)
+        return origin.with_name(f"{origin.name}.alt{self.count}.npz")
+
+    def get(self, grid: GridMap) -> Landmarks:
+        key = (grid.fingerprint, grid.width, grid.height)
+        landmarks = self._sets.get(key)
+        if landmarks is not None:
+            self.hits += 1
+            self._sets.move_to_end(key)
+            if landmarks.grid is not grid:
+                # Same cells in another GridMap; the distances still apply.
+                landmarks = Landmarks(grid, landmarks.nodes, landmarks.distances)
+            return landmarks
+        path = self._file(grid)
+        loaded = load_landmarks(path, grid) if path is not None and path.exists() else None
+        if loaded is not None:
+            self.hits += 1
+            self.disk_hits += 1
+            landmarks = loaded
+        else:
+            self.misses += 1
+            landmarks = select_landmarks(grid, self.count)
+            if path is not None:
+                try:
+                    landmarks.save(path)
+                except OSError:
+                    pass
+        self._sets[key] = landmarks
+        while len(self._sets) > self.max_entries:
+            self._sets.popitem(last=False)
+        return landmarks
+
+    def plan(self, grid: GridMap, start: Node, goal: Node) -> Optional[PlanResult]:
+        return self.get(grid).plan(start, goal)
+
+
+default_cache = LandmarkCache()
@@ -1,14 +1,18 @@
 from __future__ import annotations
 
-import math
 from dataclasses import dataclass
-from typing import Iterable, List, Tuple
+from typing import List, Tuple
 
-from .collision import trajectory_in_collision
-from .costmap import CostMap
+import numpy as np
+import numpy.typing as npt
+
+from .collision import points_in_collision
+from .costmap import CostMapLike
+from .path_index import PathIndex
 
 Point = Tuple[float, float]
 Pose = Tuple[float, float, float]
+FloatArray = npt.NDArray[np.float64]
 
 
 @dataclass
@@ -31,92 +35,66 @@ def _linspace(start: float, stop: float, num: int) -> List[float]:
     return [start + i * step for i in range(num)]
 
 
-def _simulate_trajectory(
-    pose: Pose, v: float, omega: float, dt: float, horizon: float
-) -> List[Pose]:
+def _rollout(
+    pose: Pose, v: FloatArray, omega: FloatArray, dt: float, horizon: float
+) -> Tuple[FloatArray, FloatArray, FloatArray]:
+    # Unicycle rollouts for every (v, omega) pair at once, one row per candidate
+    # and one column per pose (the initial pose included).
     steps = max(1, int(horizon / max(dt, 1e-3)))
-    x, y, yaw = pose
-    poses: List[Pose] = [(x, y, yaw)]
-    for _ in range(steps):
-        x += v * math.cos(yaw) * dt
-        y += v * math.sin(yaw) * dt
-        yaw += omega * dt
-        poses.append((x, y, yaw))
-    return poses
-
-
-def _min_distance(point: Point, obstacles: Iterable[Point]) -> float:
-    if not obstacles:
-        return float("inf")
-    x, y = point
-    return min(math.hypot(x - ox, y - oy) for ox, oy in obstacles)
-
-
-def _trajectory_clearance(poses: Iterable[Pose], obstacles: Iterable[Point]) -> float:
-    if not obstacles:
-        return float("inf")
-    min_dist = float("inf")
-    for x, y, _ in poses:
-        dist = _min_distance((x, y), obstacles)
-        if dist < min_dist:
-            min_dist = dist
-    return min_dist
-
-
-def _distance_to_path(point: Point, path: Iterable[Point]) -> float:
-    x, y = point
-    return min(math.hypot(x - px, y - py) for px, py in path)
-
-
-def _obstacle_points(costmap: CostMap) -> List[Point]:
-    obstacles: List[Point] = []
-    for y, row in enumerate(costmap.inflated):
-        for x, cell in enumerate(row):
-            if cell == 1:
-                obstacles.append((float(x), float(y)))
-    return obstacles
+    xs = np.empty((v.size, steps + 1))
+    ys = np.empty_like(xs)
+    yaws = np.empty_like(xs)
+    xs[:, 0], ys[:, 0], yaws[:, 0] = pose
+    for k in range(steps):
+        xs[:, k + 1] = xs[:, k] + v * np.cos(yaws[:, k]) * dt
+        ys[:, k + 1] = ys[:, k] + v * np.sin(yaws[:, k]) * dt
+        yaws[:, k + 1] = yaws[:, k] + omega * dt
+    return xs, ys, yaws
+
+
+def _trajectory_clearance(
+    costmap: CostMapLike, xs: FloatArray, ys: FloatArray
+) -> FloatArray:
+    # Closest inflated cell to any pose of each trajectory, read from the
+    # costmap's distance field instead of scanning obstacle points.
+    result: FloatArray = costmap.clearance_at(xs, ys).min(axis=1)
+    return result
 
 
 def dwa_control(
     pose: Pose,
     path: List[Point],
-    costmap: CostMap,
+    costmap: CostMapLike,
     params: DWAParams,
     dt: float,
+    path_index: PathIndex | None = None,
 ) -> Tuple[float, float, List[Pose]]:
     goal = path[-1]
-    obstacles = _obstacle_points(costmap)
-
-    best_cost = float("inf")
-    best_v = 0.0
-    best_omega = 0.0
-    best_traj: List[Pose] = [pose]
+    index = path_index if path_index is not None else PathIndex(path)
 
     v_samples = _linspace(params.v_min, params.v_max, params.v_samples)
     omega_samples = _linspace(-params.omega_max, params.omega_max, params.omega_samples)
-
-    for v in v_samples:
-        for omega in omega_samples:
-            traj = _simulate_trajectory(pose, v, omega, dt, params.horizon)
-            if trajectory_in_collision(costmap, traj):
-                continue
-
-            end_x, end_y, _ = traj[-1]
-            goal_dist = math.hypot(goal[0] - end_x, goal[1] - end_y)
-            path_dist = _distance_to_path((end_x, end_y), path)
-            clearance = _trajectory_clearance(traj, obstacles)
-            clearance_cost = 1.0 / max(clearance, 1e-3)
-
-            cost = (
-                params.goal_weight * goal_dist
-                + params.path_weight * path_dist
-                + params.clearance_weight * clearance_cost
-            )
-
-            if cost < best_cost:
-                best_cost = cost
-                best_v = v
-                best_omega = omega
-                best_traj = traj
-
-    return best_v, best_omega, best_traj
+    # v-major candidate order, so argmin ties resolve like the nested loops did.
+    v = np.repeat(np.asarray(v_samples), len(omega_samples))
+    omega = np.tile(np.asarray(omega_samples), len(v_samples))
+
+    xs, ys, yaws = _rollout(pose, v, omega, dt, params.horizon)
+    valid = ~points_in_collision(costmap, xs, ys).any(axis=1)
+    if not valid.any():
+        return 0.0, 0.0, [pose]
+    xs, ys, yaws = xs[valid], ys[valid], yaws[valid]
+
+    end_x, end_y = xs[:, -1], ys[:, -1]
+    goal_dist = np.hypot(goal[0] - end_x, goal[1] - end_y)
+    path_dist = index.distance(end_x, end_y)
+    clearance = _trajectory_clearance(costmap, xs, ys)
+    clearance_cost = 1.0 / np.maximum(clearance, 1e-3)
+
+    cost = (
+        params.goal_weight * goal_dist
+        + params.path_weight * path_dist
+        + params.clearance_weight * clearance_cost
+    )
+    best = int(np.argmin(cost))
+    traj = list(zip(xs[best].tolist(), ys[best].tolist(), yaws[best].tolist()))
+    return float(v[valid][best]), float(omega[valid][best]), traj
@@ -1,22 +1,93 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Iterable, Tuple
+import os
+import struct
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Iterable, List, Optional, Sequence, Tuple, Union
 
-Grid = list[list[int]]
+import numpy as np
+import numpy.typing as npt
 
+# Occupancy grids are stored as contiguous uint8 arrays (0 free, 1 obstacle).
+Grid = npt.NDArray[np.uint8]
+GridLike = Union[Grid, Sequence[Sequence[int]]]
 
-@dataclass(frozen=True)
+# On-disk map: a 32-byte little-endian header (magic, version, encoding, width,
+# height) followed by the row-major body, either one uint8 per cell (memory
+# mapped on load) or rows bit-packed least significant bit first.
+_MAGIC = b"NAVSIMAP"
+_VERSION = 1
+_RAW = 0
+_PACKED = 1
+_HEADER = struct.Struct("<8sIIQQ")
+
+
+def _is_mapped(array: object) -> bool:
+    # True for a memmap or any view of one (np.asarray drops the subclass).
+    while isinstance(array, np.ndarray):
+        if isinstance(array, np.memmap):
+            return True
+        array = array.base
+    return False
+
+
+def as_occupancy(grid: GridLike) -> Grid:
+    mapped = _is_mapped(grid)
+    array = np.asarray(grid)
+    if array.size == 0:
+        return np.zeros((0, 0), dtype=np.uint8)
+    if array.ndim != 2:
+        raise ValueError(f"Occupancy grid must be 2D, got shape {array.shape}.")
+    if array.dtype != np.uint8:
+        array = (array != 0).astype(np.uint8)
+    elif not mapped and array.max() > 1:
+        # Nonzero bytes other than 1 are normalized so every reader agrees on
+        # them. Memory-mapped map bodies are left unscanned to stay lazily
+        # paged; readers treat any nonzero cell as blocked.
+        array = (array != 0).astype(np.uint8)
+    return np.ascontiguousarray(array)
+
+
+@dataclass(frozen=True, eq=False, init=False)
 class GridMap:
     grid: Grid
+    _cells: memoryview = field(repr=False)
+    _source: Optional[str] = field(default=None, repr=False)
+    _pyramid: List["GridMap"] = field(default_factory=list, repr=False)
+    _fingerprint: Optional[int] = field(default=None, repr=False)
+    # Path-like label of where the cells came from (a map file, or a map file
+    # inflated by some radius), used to name files derived from them.
+    _origin: Optional[str] = field(default=None, repr=False)
+
+    def __init__(self, grid: GridLike) -> None:
+        # Accepts list-of-lists for compatibility; arrays are wrapped without copying.
+        array = as_occupancy(grid)
+        object.__setattr__(self, "grid", array)
+        # Flat byte view of the same buffer; scalar lookups on it are much cheaper
+        # than ndarray indexing in the planners' inner loops.
+        object.__setattr__(self, "_cells", array.reshape(-1).data)
+        object.__setattr__(self, "_source", None)
+        object.__setattr__(self, "_pyramid", [])
+        object.__setattr__(self, "_fingerprint", None)
+        object.__setattr__(self, "_origin", None)
+
+    def __reduce__(self) -> Tuple[Any, Tuple[Any, ...]]:
+        # The flat memoryview is not picklable; rebuild it from the array. A
+        # memory-mapped map is reopened from its file instead, so processes
+        # share its pages rather than each receiving a copy.
+        if self._source is not None:
+            return (load_map, (self._source,))
+        return (GridMap, (self.grid,))
 
     @property
     def height(self) -> int:
-        return len(self.grid)
+        return int(self.grid.shape[0])
 
     @property
     def width(self) -> int:
-        return len(self.grid[0]) if self.grid else 0
+        return int(self.grid.shape[1])
 
     def in_bounds(self, node: Tuple[int, int]) -> bool:
         x, y = node
@@ -24,7 +95,7 @@ class GridMap:
 
     def is_free(self, node: Tuple[int, int]) -> bool:
         x, y = node
-        return self.grid[y][x] == 0
+        return self._cells[y * self.grid.shape[1] + x] == 0
 
     def neighbors(self, node: Tuple[int, int]) -> Iterable[Tuple[int, int]]:
         x, y = node
@@ -33,6 +104,73 @@ class GridMap:
             if self.in_bounds(nxt) and self.is_free(nxt):
                 yield nxt
 
+    @property
+    def fingerprint(self) -> int:
+        # occupancy_fingerprint of the grid, computed on first use and kept on
+        # this object like the pyramid.
+        fingerprint = self._fingerprint
+        if fingerprint is None:
+            fingerprint = occupancy_fingerprint(self.grid)
+            object.__setattr__(self, "_fingerprint", fingerprint)
+        return fingerprint
+
+    @property
+    def levels(self) -> int:
+        # Number of pyramid levels above this one; the top level is one cell.
+        return (max(self.width, self.height, 1) - 1).bit_length()
+
+    def level(self, k: int) -> GridMap:
+        # Level k of the occupancy pyramid: cell (x, y) covers the 2**k square
+        # block at (x << k, y << k) and is blocked if any cell in it is, so a
+        # free coarse cell is free at every finer level. Levels are built on
+        # first use and kept on this object; after editing the grid in place,
+        # wrap it in a new GridMap to get a fresh pyramid.
+        if not 0 <= k <= self.levels:
+            raise ValueError(f"Pyramid level must be in [0, {self.levels}], got {k}.")
+        while len(self._pyramid) < k:
+            below = self._pyramid[-1].grid if self._pyramid else self.grid
+            self._pyramid.append(GridMap(_max_pool(below)))
+        return self if k == 0 else self._pyramid[k - 1]
+
+
+def _cell_hashes(indices: npt.NDArray[np.uint64]) -> npt.NDArray[np.uint64]:
+    # splitmix64 finalizer of flat cell indices; uint64 arithmetic wraps.
+    z = indices + np.uint64(0x9E3779B97F4A7C15)
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+
+def occupancy_fingerprint(grid: Grid, rows_per_chunk: int = 1024) -> int:
+    # XOR of a per-cell hash over the blocked cells, so flipping cells updates
+    # it in time proportional to the flips (toggle_fingerprint). Grids of
+    # different shapes can collide; callers key on the shape as well.
+    height, width = grid.shape
+    fingerprint = 0
+    for y0 in range(0, height, rows_per_chunk):
+        blocked = np.flatnonzero(grid[y0 : y0 + rows_per_chunk]).astype(np.uint64)
+        if blocked.size:
+            hashes = _cell_hashes(blocked + np.uint64(y0 * width))
+            fingerprint ^= int(np.bitwise_xor.reduce(hashes))
+    return fingerprint
+
+
+def toggle_fingerprint(fingerprint: int, width: int, cells: Iterable[Tuple[int, int]]) -> int:
+    # Fingerprint after flipping the occupancy of each cell once.
+    indices = np.array([y * width + x for x, y in cells], dtype=np.uint64)
+    if indices.size:
+        fingerprint ^= int(np.bitwise_xor.reduce(_cell_hashes(indices)))
+    return fingerprint
+
+
+def _max_pool(grid: Grid) -> Grid:
+    # 2x2 max-pool; an odd last row or column pools with free padding.
+    height, width = grid.shape
+    padded = np.zeros((height + height % 2, width + width % 2), dtype=np.uint8)
+    padded[:height, :width] = grid
+    blocks = padded.reshape(padded.shape[0] // 2, 2, padded.shape[1] // 2, 2)
+    return np.ascontiguousarray(blocks.max(axis=(1, 3)))
+
 
 def demo_grid() -> GridMap:
     # 0 free, 1 obstacle
@@ -48,4 +186,234 @@ def demo_grid() -> GridMap:
         [0, 0, 0, 1, 0, 1, 1, 0, 0, 0],
         [0, 0, 0, 0, 0, 0, 0, 0, 1, 0],
     ]
-    return GridMap(grid=grid)
+    return GridMap(grid=as_occupancy(grid))
+
+
+def warehouse_grid(
+    width: int, height: int, shelf_length: int = 10, shelf_depth: int = 2, aisle: int = 3
+) -> GridMap:
+    # Blocks of shelving separated by aisles, with a free lane around the edge;
+    # used for large fleet runs where the 10x10 demo map is too small.
+    ys = np.arange(height)
+    xs = np.arange(width)
+    rows = ((ys - aisle) % (shelf_depth + aisle) < shelf_depth) & (ys >= aisle)
+    rows &= ys < height - aisle
+    cols = ((xs - aisle) % (shelf_length + aisle) < shelf_length) & (xs >= aisle)
+    cols &= xs < width - aisle
+    return GridMap(grid=(rows[:, None] & cols[None, :]).astype(np.uint8))
+
+
+def save_map(grid: GridMap, path: Union[str, Path], packed: bool = False) -> None:
+    height, width = grid.grid.shape
+    encoding = _PACKED if packed else _RAW
+    with Path(path).open("wb") as handle:
+        handle.write(_HEADER.pack(_MAGIC, _VERSION, encoding, width, height))
+        if packed:
+            handle.write(np.packbits(grid.grid, axis=1, bitorder="little").tobytes())
+        else:
+            handle.write(grid.grid.data)
+
+
+def _read_header(path: Path) -> Tuple[int, int, int]:
+    # (encoding, width, height) of a map file, validating the header.
+    with path.open("rb") as handle:
+        header = handle.read(_HEADER.size)
+    if len(header) < _HEADER.size:
+        raise ValueError(f"{path} is too short to be a navsim map.")
+    magic, version, encoding, width, height = _HEADER.unpack(header)
+    if magic != _MAGIC:
+        raise ValueError(f"{path} is not a navsim map.")
+    if version != _VERSION:
+        raise ValueError(f"Unsupported navsim map version {version} in {path}.")
+    if encoding not in (_RAW, _PACKED):
+        raise ValueError(f"Unknown navsim map encoding {encoding} in {path}.")
+    return encoding, width, height
+
+
+def load_map(path: Union[str, Path]) -> GridMap:
+    # Raw bodies are memory-mapped read-only, so loading only reads the header
+    # and cells are paged in as planners touch them. Packed bodies are unpacked
+    # into memory.
+    path = Path(path)
+    encoding, width, height = _read_header(path)
+    if width == 0 or height == 0:
+        return GridMap(np.zeros((height, width), dtype=np.uint8))
+    row_bytes = width if encoding == _RAW else (width + 7) // 8
+    body = np.memmap(
+        path, dtype=np.uint8, mode="r", offset=_HEADER.size, shape=(height, row_bytes)
+    )
+    source = str(path.resolve())
+    if encoding == _PACKED:
+        grid = GridMap(np.unpackbits(body, axis=1, count=width, bitorder="little"))
+    else:
+        grid = GridMap(body)
+        object.__setattr__(grid, "_source", source)
+    object.__setattr__(grid, "_origin", source)
+    return grid
+
+
+# Reads the cells [y0:y1, x0:x1] of a map as a fresh array.
+RegionReader = Callable[[int, int, int, int], Grid]
+
+
+class _ArrayReader:
+    def __init__(self, grid: Grid) -> None:
+        self.grid = grid
+
+    def __call__(self, x0: int, y0: int, x1: int, y1: int) -> Grid:
+        return self.grid[y0:y1, x0:x1].copy()
+
+
+class _MapFileReader:
+    # Positioned reads of a save_map file, one per row of the requested
+    # rectangle. Unlike the memory map of load_map, nothing of the body stays
+    # resident once the rectangle has been copied out.
+    def __init__(self, path: Union[str, Path]) -> None:
+        resolved = Path(path).resolve()
+        self.path = str(resolved)
+        self.encoding, self.width, self.height = _read_header(resolved)
+        self.row_bytes = self.width if self.encoding == _RAW else (self.width + 7) // 8
+
+    def __call__(self, x0: int, y0: int, x1: int, y1: int) -> Grid:
+        out = np.empty((y1 - y0, x1 - x0), dtype=np.uint8)
+        if self.encoding == _RAW:
+            b0, b1 = x0, x1
+        else:
+            b0, b1 = x0 // 8, (x1 + 7) // 8
+        fd = os.open(self.path, os.O_RDONLY)
+        try:
+            for row in range(y0, y1):
+                offset = _HEADER.size + row * self.row_bytes + b0
+                data = np.frombuffer(os.pread(fd, b1 - b0, offset), dtype=np.uint8)
+                if self.encoding == _PACKED:
+                    data = np.unpackbits(data, bitorder="little")[x0 - 8 * b0 : x1 - 8 * b0]
+                out[row - y0] = data
+        finally:
+            os.close(fd)
+        return out
+
+
+class TiledGridMap:
+    # Occupancy split into tile_size x tile_size tiles that are read on first
+    # use and kept in an LRU of at most max_tiles, so resident memory stays near
+    # max_tiles * tile_size**2 bytes however large the map is. Offers the cell
+    # lookups of GridMap; region() copies out a dense window for code that
+    # needs an array.
+    def __init__(
+        self,
+        reader: RegionReader,
+        width: int,
+        height: int,
+        tile_size: int = 256,
+        max_tiles: int = 1024,
+    ) -> None:
+        if tile_size < 1 or max_tiles < 1:
+            raise ValueError("tile_size and max_tiles must be positive.")
+        self.reader = reader
+        self.width = width
+        self.height = height
+        self.tile_size = tile_size
+        self.max_tiles = max_tiles
+        self.loads = 0
+        self.evictions = 0
+        self._tiles: OrderedDict[Tuple[int, int], Grid] = OrderedDict()
+        # Flat view of the tile is_free touched last; consecutive lookups stay
+        # on one tile far more often than not.
+        self._hot_key = (-1, -1)
+        self._hot_cells = memoryview(b"")
+        self._hot_width = 0
+
+    def __reduce__(self) -> Tuple[Any, Tuple[Any, ...]]:
+        # Tiles are not shipped; the copy reads its own on demand.
+        return (
+            TiledGridMap,
+            (self.reader, self.width, self.height, self.tile_size, self.max_tiles),
+        )
+
+    @classmethod
+    def from_grid(
+        cls, grid: GridMap, tile_size: int = 256, max_tiles: int = 1024
+    ) -> "TiledGridMap":
+        return cls(_ArrayReader(grid.grid), grid.width, grid.height, tile_size, max_tiles)
+
+    @property
+    def resident_bytes(self) -> int:
+        return sum(tile.nbytes for tile in self._tiles.values())
+
+    def tile(self, tx: int, ty: int) -> Grid:
+        key = (tx, ty)
+        cached = self._tiles.get(key)
+        if cached is not None:
+            self._tiles.move_to_end(key)
+            return cached
+        size = self.tile_size
+        x0, y0 = tx * size, ty * size
+        tile = self.reader(x0, y0, min(x0 + size, self.width), min(y0 + size, self.height))
+        self.loads += 1
+        self._tiles[key] = tile
+        while len(self._tiles) > self.max_tiles:
+            self._tiles.popitem(last=False)
+            self.evictions += 1
+        return tile
+
+    def in_bounds(self, node: Tuple[int, int]) -> bool:
+        x, y = node
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def is_free(self, node: Tuple[int, int]) -> bool:
+        x, y = node
+        size = self.tile_size
+        key = (x // size, y // size)
+        if key != self._hot_key:
+            tile = self.tile(*key)
+            self._hot_key = key
+            self._hot_cells = tile.reshape(-1).data
+            self._hot_width = tile.shape[1]
+        return self._hot_cells[(y % size) * self._hot_width + x % size] == 0
+
+    def neighbors(self, node: Tuple[int, int]) -> Iterable[Tuple[int, int]]:
+        x, y = node
+        candidates = [(x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)]
+        for nxt in candidates:
+            if self.in_bounds(nxt) and self.is_free(nxt):
+                yield nxt
+
+    def cells(self, xs: npt.NDArray[np.int64], ys: npt.NDArray[np.int64]) -> Grid:
+        # Vectorized lookup of in-bounds cells, one gather per tile touched.
+        size = self.tile_size
+        columns = -(-self.width // size)
+        keys = (ys // size) * columns + xs // size
+        out = np.empty(xs.shape, dtype=np.uint8)
+        for key in np.unique(keys).tolist():
+            mask = keys == key
+            tile = self.tile(key % columns, key // columns)
+            out[mask] = tile[ys[mask] % size, xs[mask] % size]
+        return out
+
+    def region(self, x0: int, y0: int, x1: int, y1: int) -> Grid:
+        # Dense copy of [y0:y1, x0:x1], clipped to the map.
+        x0, y0 = max(x0, 0), max(y0, 0)
+        x1, y1 = min(x1, self.width), min(y1, self.height)
+        out = np.empty((max(y1 - y0, 0), max(x1 - x0, 0)), dtype=np.uint8)
+        size = self.tile_size
+        for ty in range(y0 // size, -(-y1 // size)):
+            for tx in range(x0 // size, -(-x1 // size)):
+                tile = self.tile(tx, ty)
+                left, top = tx * size, ty * size
+                cx0, cy0 = max(x0, left), max(y0, top)
+                cx1, cy1 = min(x1, left + size), min(y1, top + size)
+                out[cy0 - y0 : cy1 - y0, cx0 - x0 : cx1 - x0] = tile[
+                    cy0 - top : cy1 - top, cx0 - left : cx1 - left
+                ]
+        return out
+
+
+MapLike = Union[GridMap, TiledGridMap]
+
+
+def load_tiled_map(
+    path: Union[str, Path], tile_size: int = 256, max_tiles: int = 1024
+) -> TiledGridMap:
+    # Only the header is read here; tiles are read from the file on demand.
+    reader = _MapFileReader(path)
+    return TiledGridMap(reader, reader.width, reader.height, tile_size, max_tiles)
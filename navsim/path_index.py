@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import math
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+import numpy.typing as npt
+
+Point = Tuple[float, float]
+FloatArray = npt.NDArray[np.float64]
+IndexArray = npt.NDArray[np.int64]
+
+
+class PathIndex:
+    # Uniform bucket grid over the waypoints of one global path, built once per
+    # plan. Queries only visit buckets near the query points, so controllers no
+    # longer pay for the full path on every step. Distances are measured to
+    # waypoints, exactly as the linear scans they replace did.
+    def __init__(self, path: Sequence[Point], bucket_size: float = 2.0) -> None:
+        if bucket_size <= 0.0:
+            raise ValueError("bucket_size must be positive.")
+        self.path = list(path)
+        self.points: FloatArray = np.asarray(self.path, dtype=np.float64).reshape(-1, 2)
+        self.bucket_size = bucket_size
+        keys = np.floor(self.points / bucket_size).astype(np.int64)
+        buckets: Dict[Tuple[int, int], List[int]] = {}
+        for i, (bx, by) in enumerate(keys.tolist()):
+            buckets.setdefault((bx, by), []).append(i)
+        self._buckets = {key: np.asarray(idx, dtype=np.int64) for key, idx in buckets.items()}
+        if len(self.path):
+            self._lo = (int(keys[:, 0].min()), int(keys[:, 1].min()))
+            self._hi = (int(keys[:, 0].max()), int(keys[:, 1].max()))
+        else:
+            self._lo, self._hi = (0, 0), (-1, -1)
+
+    def __len__(self) -> int:
+        return len(self.path)
+
+    def _bucket(self, value: float) -> int:
+        return int(math.floor(value / self.bucket_size))
+
+    def _gather(self, bx0: int, by0: int, bx1: int, by1: int) -> IndexArray:
+        bx0, by0 = max(bx0, self._lo[0]), max(by0, self._lo[1])
+        bx1, by1 = min(bx1, self._hi[0]), min(by1, self._hi[1])
+        if bx0 > bx1 or by0 > by1:
+            return np.zeros(0, dtype=np.int64)
+        if (bx1 - bx0 + 1) * (by1 - by0 + 1) <= len(self._buckets):
+            found = [
+                self._buckets[key]
+                for key in ((bx, by) for bx in range(bx0, bx1 + 1) for by in range(by0, by1 + 1))
+                if key in self._buckets
+            ]
+        else:
+            found = [
+                idx
+                for (bx, by), idx in self._buckets.items()
+                if bx0 <= bx <= bx1 and by0 <= by <= by1
+            ]
+        if not found:
+            return np.zeros(0, dtype=np.int64)
+        return np.concatenate(found)
+
+    def within(self, point: Point, radius: float) -> List[int]:
+        # Sorted indices of waypoints strictly closer than radius to point.
+        x, y = point
+        idx = self._gather(
+            self._bucket(x - radius),
+            self._bucket(y - radius),
+            self._bucket(x + radius),
+            self._bucket(y + radius),
+        )
+        return sorted(
+            i for i in idx.tolist() if math.hypot(self.path[i][0] - x, self.path[i][1] - y) < radius
+        )
+
+    def lookahead_index(self, point: Point, lookahead: float, start: int) -> int:
+        # First waypoint from start on that is at least lookahead away, else the
+        # last waypoint. Only waypoints inside the lookahead disc are visited.
+        near = set(self.within(point, lookahead))
+        idx = start
+        while idx in near:
+            idx += 1
+        return min(idx, len(self.path) - 1)
+
+    def distance(self, xs: FloatArray, ys: FloatArray) -> FloatArray:
+        # Distance from each query point to its nearest waypoint. The searched
+        # box grows until every query's best candidate is closer than the box edge.
+        size = self.bucket_size
+        if not len(self.path) or not xs.size:
+            return np.full(xs.shape, np.inf)
+        bx0, by0 = self._bucket(float(xs.min())), self._bucket(float(ys.min()))
+        bx1, by1 = self._bucket(float(xs.max())), self._bucket(float(ys.max()))
+        ring = 0
+        while True:
+            covers_all = (
+                bx0 - ring <= self._lo[0]
+                and by0 - ring <= self._lo[1]
+                and bx1 + ring >= self._hi[0]
+                and by1 + ring >= self._hi[1]
+            )
+            idx = self._gather(bx0 - ring, by0 - ring, bx1 + ring, by1 + ring)
+            if idx.size:
+                points = self.points[idx]
+                dist: FloatArray = np.hypot(
+                    xs[:, None] - points[:, 0], ys[:, None] - points[:, 1]
+                ).min(axis=1)
+                if covers_all:
+                    return dist
+                margin = np.minimum.reduce(
+                    [
+                        xs - (bx0 - ring) * size,
+                        (bx1 + ring + 1) * size - xs,
+                        ys - (by0 - ring) * size,
+                        (by1 + ring + 1) * size - ys,
+                    ]
+                )
+                if (dist <= margin).all():
+                    return dist
+            ring = 2 * ring + 1
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import pickle
+from collections import OrderedDict
+from dataclasses import replace
+from pathlib import Path
+from typing import Any, Callable, Optional, Tuple, Union
+
+from .map import GridMap
+from .planner import Node, PlanResult
+
+# (fingerprint, width, height, start, goal, method)
+PlanKey = Tuple[int, int, int, Node, Node, str]
+
+
+def _copy(result: Optional[PlanResult]) -> Optional[PlanResult]:
+    # Callers may edit a result's path, so cached results are never handed out.
+    return None if result is None else replace(result, path=list(result.path))
+
+
+class PlanCache:
+    # LRU of plan results keyed by occupancy fingerprint, map shape, endpoints
+    # and method, so a query repeated on an unchanged map (or on one that
+    # changed and changed back) is answered without searching. Unreachable
+    # goals are cached too. With a directory, every result is also pickled
+    # there and read back on a memory miss, which lets separate runs and worker
+    # processes reuse each other's plans.
+    def __init__(
+        self, max_entries: int = 1024, directory: Union[str, Path, None] = None
+    ) -> None:
+        self.max_entries = max_entries
+        self.directory = None if directory is None else Path(directory)
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+        self._plans: OrderedDict[PlanKey, Optional[PlanResult]] = OrderedDict()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._plans)
+
+    def __reduce__(self) -> Tuple[Any, Tuple[Any, ...]]:
+        # Worker processes start empty and share only the directory.
+        return (PlanCache, (self.max_entries, self.directory))
+
+    @staticmethod
+    def key(grid: GridMap, start: Node, goal: Node, method: str) -> PlanKey:
+        return (grid.fingerprint, grid.width, grid.height, start, goal, method.lower())
+
+    def _file(self, key: PlanKey) -> Path:
+        assert self.directory is not None
+        digest = hashlib.blake2b(repr(key).encode(), digest_size=16).hexdigest()
+        return self.directory / f"{digest}.pkl"
+
+    def _remember(self, key: PlanKey, result: Optional[PlanResult]) -> None:
+        self._plans[key] = result
+        while len(self._plans) > self.max_entries:
+            self._plans.popitem(last=False)
+
+    def plan(
+        self,
+        grid: GridMap,
+        start: Node,
+        goal: Node,
+        method: str,
+        planner: Callable[[], Optional[PlanResult]],
+    ) -> Optional[PlanResult]:
+        key = self.key(grid, start, goal, method)
+        if key in self._plans:
+            self.hits += 1
+            self._plans.move_to_end(key)
+            return _copy(self._plans[key])
+        if self.directory is not None:
+            path = self._file(key)
+            try:
+                stored_key, result = pickle.loads(path.read_bytes())
+            except (OSError, pickle.UnpicklingError, EOFError, ValueError):
+                stored_key = None
+            if stored_key == key:
+                self.hits += 1
+                self.disk_hits += 1
+                self._remember(key, result)
+                return _copy(result)
+        self.misses += 1
+        result = planner()
+        self._remember(key, _copy(result))
+        if self.directory is not None:
+            # Written under a temporary name and renamed, so concurrent
+            # processes never read a partial file.
+            path = self._file(key)
+            tmp = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_bytes(pickle.dumps((key, result)))
+            os.replace(tmp, path)
+        return result
+
+    def clear(self) -> None:
+        # Drops the in-memory entries; files in the directory are kept.
+        self._plans.clear()
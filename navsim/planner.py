@@ -2,10 +2,17 @@ from __future__ import annotations
 
 import heapq
 import math
+import time
 from dataclasses import dataclass
-from typing import Dict, Iterable, List, Optional, Tuple
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, List, Optional, Tuple
 
-from .map import GridMap
+import numpy as np
+import numpy.typing as npt
+
+from .map import GridMap, MapLike, TiledGridMap
+
+if TYPE_CHECKING:
+    from .plan_cache import PlanCache
 
 Node = Tuple[int, int]
 
@@ -14,6 +21,23 @@ Node = Tuple[int, int]
 class PlanResult:
     path: List[Node]
     cost: float
+    # Search counters; a planner that does not track one leaves it at zero.
+    # Stale pops are heap entries discarded because their node was already
+    # expanded (or its cost improved) after they were pushed.
+    expansions: int = 0
+    pushes: int = 0
+    stale_pops: int = 0
+    los_checks: int = 0
+    peak_open: int = 0
+    # Factor within which cost is known to be optimal; only the anytime
+    # planner (ara_star) fills it in, others leave it at zero.
+    suboptimality: float = 0.0
+
+
+class PlanBudgetExhausted(RuntimeError):
+    # Raised by budgeted planning when the budget runs out before any path is
+    # found, which is not the same as there being no path (None).
+    pass
 
 
 def manhattan(a: Node, b: Node) -> float:
@@ -24,7 +48,7 @@ def euclidean(a: Node, b: Node) -> float:
     return math.hypot(a[0] - b[0], a[1] - b[1])
 
 
-def _neighbors(grid: GridMap, node: Node, diagonal: bool = False) -> Iterable[Node]:
+def _neighbors(grid: MapLike, node: Node, diagonal: bool = False) -> Iterable[Node]:
     x, y = node
     candidates = [(x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)]
     if diagonal:
@@ -61,7 +85,7 @@ def _bresenham(a: Node, b: Node) -> Iterable[Node]:
             y0 += sy
 
 
-def line_of_sight(grid: GridMap, a: Node, b: Node) -> bool:
+def line_of_sight(grid: MapLike, a: Node, b: Node) -> bool:
     for node in _bresenham(a, b):
         if not grid.in_bounds(node) or not grid.is_free(node):
             return False
@@ -78,8 +102,34 @@ def reconstruct(came_from: Dict[Node, Node], start: Node, goal: Node) -> List[No
     return path
 
 
+class _SearchStats:
+    # Counts pops as they happen; pushes are recovered at the end as every pop
+    # plus whatever is still queued, so the inner loops stay untouched.
+    def __init__(self) -> None:
+        self.pops = 0
+        self.stale_pops = 0
+        self.peak_open = 0
+        self.los_checks = 0
+
+    def pop(self, open_size: int) -> None:
+        self.pops += 1
+        if open_size > self.peak_open:
+            self.peak_open = open_size
+
+    def result(self, path: List[Node], cost: float, queued: int) -> PlanResult:
+        return PlanResult(
+            path=path,
+            cost=cost,
+            expansions=self.pops - self.stale_pops,
+            pushes=self.pops + queued,
+            stale_pops=self.stale_pops,
+            los_checks=self.los_checks,
+            peak_open=self.peak_open,
+        )
+
+
 def astar(
-    grid: GridMap,
+    grid: MapLike,
     start: Node,
     goal: Node,
     heuristic=manhattan,
@@ -93,12 +143,21 @@ def astar(
     heapq.heappush(open_heap, (0.0, start))
     came_from: Dict[Node, Node] = {}
     g_cost: Dict[Node, float] = {start: 0.0}
+    closed = set()
+    stats = _SearchStats()
 
     while open_heap:
+        stats.pop(len(open_heap))
         _, current = heapq.heappop(open_heap)
+        if current in closed:
+            # The heuristic is consistent, so a second entry can only repeat
+            # relaxations that already happened.
+            stats.stale_pops += 1
+            continue
+        closed.add(current)
         if current == goal:
             path = reconstruct(came_from, start, goal)
-            return PlanResult(path=path, cost=g_cost[current])
+            return stats.result(path, g_cost[current], len(open_heap))
 
         for nxt in _neighbors(grid, current):
             tentative = g_cost[current] + 1.0
@@ -111,11 +170,553 @@ def astar(
     return None
 
 
-def dijkstra(grid: GridMap, start: Node, goal: Node) -> Optional[PlanResult]:
+def _flat_layout(grid: GridMap) -> Tuple[bytes, int]:
+    # Column-major cell bytes with a one-cell obstacle border: index
+    # (x + 1) * stride + (y + 1), where stride = height + 2. Neighbours are
+    # constant offsets that never leave the array, and index order matches
+    # (x, y) tuple order so heap ties break exactly like the tuple-keyed search.
+    padded = np.pad(grid.grid, 1, constant_values=1)
+    return padded.T.tobytes(), grid.height + 2
+
+
+def astar_flat(
+    grid: GridMap,
+    start: Node,
+    goal: Node,
+    heuristic=manhattan,
+) -> Optional[PlanResult]:
+    if not grid.in_bounds(start) or not grid.in_bounds(goal):
+        return None
+    if not grid.is_free(start) or not grid.is_free(goal):
+        return None
+
+    cells, stride = _flat_layout(grid)
+    size = len(cells)
+    start_idx = (start[0] + 1) * stride + start[1] + 1
+    goal_idx = (goal[0] + 1) * stride + goal[1] + 1
+    gx, gy = goal[0] + 1, goal[1] + 1
+    offsets = (stride, -stride, 1, -1)
+    inline_manhattan = heuristic is manhattan
+
+    g_cost = [math.inf] * size
+    parent = [-1] * size
+    closed = bytearray(size)
+    g_cost[start_idx] = 0.0
+    open_heap: List[Tuple[float, int]] = [(0.0, start_idx)]
+    heappush = heapq.heappush
+    heappop = heapq.heappop
+    stats = _SearchStats()
+
+    while open_heap:
+        stats.pop(len(open_heap))
+        _, current = heappop(open_heap)
+        if closed[current]:
+            stats.stale_pops += 1
+            continue
+        if current == goal_idx:
+            path: List[Node] = []
+            node = current
+            while node != -1:
+                x, y = divmod(node, stride)
+                path.append((x - 1, y - 1))
+                node = parent[node]
+            path.reverse()
+            return stats.result(path, g_cost[current], len(open_heap))
+        closed[current] = 1
+
+        tentative = g_cost[current] + 1.0
+        for offset in offsets:
+            nxt = current + offset
+            if cells[nxt] or closed[nxt] or tentative >= g_cost[nxt]:
+                continue
+            parent[nxt] = current
+            g_cost[nxt] = tentative
+            x, y = divmod(nxt, stride)
+            if inline_manhattan:
+                h = abs(x - gx) + abs(y - gy)
+            else:
+                h = heuristic((x - 1, y - 1), goal)
+            heappush(open_heap, (tentative + h, nxt))
+
+    return None
+
+
+def ara_star(
+    grid: GridMap,
+    start: Node,
+    goal: Node,
+    deadline_ms: Optional[float] = None,
+    max_expansions: Optional[int] = None,
+    initial_weight: float = 2.5,
+    weight_step: float = 0.5,
+) -> Optional[PlanResult]:
+    # Anytime Repairing A* (Likhachev, Gordon & Thrun) on the flat layout of
+    # astar_flat. Each pass is weighted A* with keys g + w * h, so its path is
+    # at most w times optimal. Then w drops by weight_step and the search
+    # resumes with g-values kept. Nodes improved after being closed in a pass
+    # wait in an inconsistent list, and only they are re-expanded next pass.
+    # Stops after the w = 1 pass, or when deadline_ms (from the call) or
+    # max_expansions runs out, and returns the last completed pass's path.
+    # Its suboptimality is min(w, cost / min g + h over open and inconsistent
+    # nodes). None means there is no path. If the budget runs out before the
+    # first pass finishes, PlanBudgetExhausted is raised.
+    if not grid.in_bounds(start) or not grid.in_bounds(goal):
+        return None
+    if not grid.is_free(start) or not grid.is_free(goal):
+        return None
+    stop_at = None if deadline_ms is None else time.perf_counter() + deadline_ms / 1000.0
+
+    cells, stride = _flat_layout(grid)
+    size = len(cells)
+    start_idx = (start[0] + 1) * stride + start[1] + 1
+    goal_idx = (goal[0] + 1) * stride + goal[1] + 1
+    gx, gy = goal[0] + 1, goal[1] + 1
+    offsets = (stride, -stride, 1, -1)
+
+    def h(idx: int) -> float:
+        x, y = divmod(idx, stride)
+        return float(abs(x - gx) + abs(y - gy))
+
+    weight = max(1.0, initial_weight)
+    g_cost = [math.inf] * size
+    parent = [-1] * size
+    closed = bytearray(size)
+    g_cost[start_idx] = 0.0
+    open_heap: List[Tuple[float, int]] = [(weight * h(start_idx), start_idx)]
+    inconsistent: List[int] = []
+    best: Optional[PlanResult] = None
+    expansions = stale_pops = 0
+    pushes = peak_open = 1
+    heappush = heapq.heappush
+    heappop = heapq.heappop
+
+    while True:
+        exhausted = False
+        while open_heap and g_cost[goal_idx] > open_heap[0][0]:
+            if max_expansions is not None and expansions >= max_expansions:
+                exhausted = True
+                break
+            if stop_at is not None and expansions % 64 == 0 and time.perf_counter() > stop_at:
+                exhausted = True
+                break
+            if len(open_heap) > peak_open:
+                peak_open = len(open_heap)
+            key, current = heappop(open_heap)
+            if closed[current] or key > g_cost[current] + weight * h(current):
+                stale_pops += 1
+                continue
+            closed[current] = 1
+            expansions += 1
+            tentative = g_cost[current] + 1.0
+            for offset in offsets:
+                nxt = current + offset
+                if cells[nxt] or tentative >= g_cost[nxt]:
+                    continue
+                g_cost[nxt] = tentative
+                parent[nxt] = current
+                if closed[nxt]:
+                    inconsistent.append(nxt)
+                else:
+                    heappush(open_heap, (tentative + weight * h(nxt), nxt))
+                    pushes += 1
+        if exhausted:
+            break
+        if math.isinf(g_cost[goal_idx]):
+            # Open list ran dry: the goal is unreachable.
+            return None
+
+        frontier = {idx for _, idx in open_heap if not closed[idx]}
+        frontier.update(inconsistent)
+        lower = min((g_cost[idx] + h(idx) for idx in frontier), default=math.inf)
+        bound = max(1.0, min(weight, g_cost[goal_idx] / lower)) if lower > 0.0 else 1.0
+        path: List[Node] = []
+        node = goal_idx
+        while node != -1:
+            x, y = divmod(node, stride)
+            path.append((x - 1, y - 1))
+            node = parent[node]
+        path.reverse()
+        best = PlanResult(path=path, cost=g_cost[goal_idx], suboptimality=bound)
+        if weight <= 1.0 or bound <= 1.0:
+            break
+        weight = max(1.0, weight - weight_step)
+        open_heap = [(g_cost[idx] + weight * h(idx), idx) for idx in frontier]
+        heapq.heapify(open_heap)
+        pushes += len(open_heap)
+        inconsistent = []
+        closed = bytearray(size)
+
+    if best is None:
+        raise PlanBudgetExhausted(f"No ARA* pass finished after {expansions} expansions.")
+    best.expansions = expansions
+    best.pushes = pushes
+    best.stale_pops = stale_pops
+    best.peak_open = peak_open
+    return best
+
+
+def _dilate(mask: npt.NDArray[np.bool_], steps: int) -> npt.NDArray[np.bool_]:
+    # Grows mask by steps cells in all eight directions.
+    for _ in range(steps):
+        grown = mask.copy()
+        grown[1:] |= mask[:-1]
+        grown[:-1] |= mask[1:]
+        mask = grown.copy()
+        mask[:, 1:] |= grown[:, :-1]
+        mask[:, :-1] |= grown[:, 1:]
+    return mask
+
+
+def coarse_to_fine(
+    grid: GridMap,
+    start: Node,
+    goal: Node,
+    level: Optional[int] = None,
+    band: int = 1,
+) -> Optional[PlanResult]:
+    # Finds a corridor with astar_flat on a coarse level of the occupancy
+    # pyramid, then searches at full resolution only inside the corridor's
+    # blocks grown by band coarse cells. Coarse cells are blocked if any of
+    # their cells is, so narrow passages may vanish at a level; finer levels are
+    # tried in turn, ending with a plain full-resolution search. Paths are
+    # near-optimal rather than shortest, and the counters add up every search.
+    if not grid.in_bounds(start) or not grid.in_bounds(goal):
+        return None
+    if not grid.is_free(start) or not grid.is_free(goal):
+        return None
+    if level is None:
+        # Aim for a corridor about 32 coarse cells long.
+        level = (int(manhattan(start, goal)) // 32).bit_length()
+    level = min(level, grid.levels)
+
+    searches: List[PlanResult] = []
+
+    def combined(result: PlanResult) -> PlanResult:
+        searches.append(result)
+        result.expansions = sum(r.expansions for r in searches)
+        result.pushes = sum(r.pushes for r in searches)
+        result.stale_pops = sum(r.stale_pops for r in searches)
+        result.peak_open = max(r.peak_open for r in searches)
+        return result
+
+    for k in range(level, 0, -1):
+        coarse = grid.level(k).grid.copy()
+        # The blocks holding start and goal may be partly blocked; let the
+        # corridor use them anyway.
+        coarse[start[1] >> k, start[0] >> k] = 0
+        coarse[goal[1] >> k, goal[0] >> k] = 0
+        corridor = astar_flat(
+            GridMap(coarse), (start[0] >> k, start[1] >> k), (goal[0] >> k, goal[1] >> k)
+        )
+        if corridor is None:
+            continue
+        searches.append(corridor)
+        mask = np.zeros(coarse.shape, dtype=bool)
+        xs, ys = zip(*corridor.path)
+        mask[list(ys), list(xs)] = True
+        mask = _dilate(mask, band)
+        rows = np.flatnonzero(mask.any(axis=1))
+        cols = np.flatnonzero(mask.any(axis=0))
+        cy0, cy1 = int(rows[0]), int(rows[-1]) + 1
+        cx0, cx1 = int(cols[0]), int(cols[-1]) + 1
+        x0, y0 = cx0 << k, cy0 << k
+        x1, y1 = min(cx1 << k, grid.width), min(cy1 << k, grid.height)
+        band_cells = mask[cy0:cy1, cx0:cx1].repeat(1 << k, axis=0).repeat(1 << k, axis=1)
+        window = grid.grid[y0:y1, x0:x1].copy()
+        window[~band_cells[: y1 - y0, : x1 - x0]] = 1
+        fine = astar_flat(
+            GridMap(window), (start[0] - x0, start[1] - y0), (goal[0] - x0, goal[1] - y0)
+        )
+        if fine is None:
+            # Blocks on the corridor are entirely free, so this only happens
+            # when start or goal cannot reach them inside the band.
+            break
+        fine.path = [(x + x0, y + y0) for x, y in fine.path]
+        return combined(fine)
+
+    result = astar_flat(grid, start, goal)
+    return None if result is None else combined(result)
+
+
+def _bidirectional(
+    grid: GridMap,
+    start: Node,
+    goal: Node,
+    heuristic: Optional[Callable[[Node, Node], float]],
+) -> Optional[PlanResult]:
+    # Alternating forward/backward search on the flat layout of astar_flat,
+    # always expanding the side with the smaller open list. Both sides use the
+    # average potential p(n) = (h(n, goal) - h(n, start)) / 2 (forward keys
+    # add it, backward keys subtract it), so each side is Dijkstra on the same
+    # reduced costs and the search may stop as soon as the two smallest keys
+    # sum to at least the best meeting cost. heuristic=None is plain
+    # bidirectional Dijkstra.
+    if not grid.in_bounds(start) or not grid.in_bounds(goal):
+        return None
+    if not grid.is_free(start) or not grid.is_free(goal):
+        return None
+    if start == goal:
+        return PlanResult(path=[start], cost=0.0)
+
+    cells, stride = _flat_layout(grid)
+    size = len(cells)
+    start_idx = (start[0] + 1) * stride + start[1] + 1
+    goal_idx = (goal[0] + 1) * stride + goal[1] + 1
+    sx, sy = start[0] + 1, start[1] + 1
+    gx, gy = goal[0] + 1, goal[1] + 1
+    offsets = (stride, -stride, 1, -1)
+    inline_manhattan = heuristic is manhattan
+
+    def potential(idx: int) -> float:
+        x, y = divmod(idx, stride)
+        if inline_manhattan:
+            return 0.5 * (abs(x - gx) + abs(y - gy) - abs(x - sx) - abs(y - sy))
+        if heuristic is None:
+            return 0.0
+        node = (x - 1, y - 1)
+        return 0.5 * (heuristic(node, goal) - heuristic(node, start))
+
+    g_cost = ([math.inf] * size, [math.inf] * size)
+    parent = ([-1] * size, [-1] * size)
+    closed = (bytearray(size), bytearray(size))
+    g_cost[0][start_idx] = 0.0
+    g_cost[1][goal_idx] = 0.0
+    heaps: Tuple[List[Tuple[float, int]], List[Tuple[float, int]]] = (
+        [(potential(start_idx), start_idx)],
+        [(-potential(goal_idx), goal_idx)],
+    )
+    sign = (1.0, -1.0)
+    best = math.inf
+    meet = -1
+    heappush = heapq.heappush
+    heappop = heapq.heappop
+    stats = _SearchStats()
+
+    while heaps[0] and heaps[1]:
+        if heaps[0][0][0] + heaps[1][0][0] >= best:
+            break
+        side = 0 if len(heaps[0]) <= len(heaps[1]) else 1
+        heap, own, other = heaps[side], g_cost[side], g_cost[1 - side]
+        seen, links = closed[side], parent[side]
+        stats.pop(len(heaps[0]) + len(heaps[1]))
+        _, current = heappop(heap)
+        if seen[current]:
+            stats.stale_pops += 1
+            continue
+        seen[current] = 1
+
+        tentative = own[current] + 1.0
+        for offset in offsets:
+            nxt = current + offset
+            if cells[nxt] or seen[nxt] or tentative >= own[nxt]:
+                continue
+            links[nxt] = current
+            own[nxt] = tentative
+            if tentative + other[nxt] < best:
+                best = tentative + other[nxt]
+                meet = nxt
+            heappush(heap, (tentative + sign[side] * potential(nxt), nxt))
+
+    if meet < 0:
+        return None
+    path: List[Node] = []
+    node = meet
+    while node != -1:
+        x, y = divmod(node, stride)
+        path.append((x - 1, y - 1))
+        node = parent[0][node]
+    path.reverse()
+    node = parent[1][meet]
+    while node != -1:
+        x, y = divmod(node, stride)
+        path.append((x - 1, y - 1))
+        node = parent[1][node]
+    return stats.result(path, best, len(heaps[0]) + len(heaps[1]))
+
+
+def bidirectional_astar(
+    grid: GridMap,
+    start: Node,
+    goal: Node,
+    heuristic=manhattan,
+) -> Optional[PlanResult]:
+    return _bidirectional(grid, start, goal, heuristic)
+
+
+def bidirectional_dijkstra(grid: GridMap, start: Node, goal: Node) -> Optional[PlanResult]:
+    return _bidirectional(grid, start, goal, None)
+
+
+def octile(a: Node, b: Node) -> float:
+    dx = abs(a[0] - b[0])
+    dy = abs(a[1] - b[1])
+    return max(dx, dy) + (math.sqrt(2.0) - 1.0) * min(dx, dy)
+
+
+def _jump(
+    cells: bytes, stride: int, node: Node, dx: int, dy: int, goal: Node
+) -> Optional[Node]:
+    # Walk from node in direction (dx, dy) until a jump point, the goal, or a
+    # blocked cell. Diagonal moves never cut corners.
+    x, y = node
+
+    def free(cx: int, cy: int) -> bool:
+        return cells[(cx + 1) * stride + cy + 1] == 0
+
+    while True:
+        x += dx
+        y += dy
+        if not free(x, y):
+            return None
+        if (x, y) == goal:
+            return (x, y)
+        if dx and dy:
+            if _jump(cells, stride, (x, y), dx, 0, goal) is not None:
+                return (x, y)
+            if _jump(cells, stride, (x, y), 0, dy, goal) is not None:
+                return (x, y)
+            if not (free(x + dx, y) and free(x, y + dy)):
+                return None
+        elif dx:
+            if (free(x, y - 1) and not free(x - dx, y - 1)) or (
+                free(x, y + 1) and not free(x - dx, y + 1)
+            ):
+                return (x, y)
+        else:
+            if (free(x - 1, y) and not free(x - 1, y - dy)) or (
+                free(x + 1, y) and not free(x + 1, y - dy)
+            ):
+                return (x, y)
+
+
+def _jps_directions(
+    cells: bytes, stride: int, node: Node, parent: Optional[Node]
+) -> List[Tuple[int, int]]:
+    x, y = node
+
+    def free(cx: int, cy: int) -> bool:
+        return cells[(cx + 1) * stride + cy + 1] == 0
+
+    if parent is None:
+        dirs = [(1, 0), (-1, 0), (0, 1), (0, -1)]
+        dirs += [
+            (ddx, ddy)
+            for ddx, ddy in ((1, 1), (1, -1), (-1, 1), (-1, -1))
+            if free(x + ddx, y) and free(x, y + ddy)
+        ]
+        return dirs
+
+    dx = (x > parent[0]) - (x < parent[0])
+    dy = (y > parent[1]) - (y < parent[1])
+    dirs = []
+    if dx and dy:
+        dirs += [(0, dy), (dx, 0)]
+        if free(x, y + dy) and free(x + dx, y):
+            dirs.append((dx, dy))
+    elif dx:
+        up = free(x, y + 1)
+        down = free(x, y - 1)
+        if free(x + dx, y):
+            dirs.append((dx, 0))
+            if up:
+                dirs.append((dx, 1))
+            if down:
+                dirs.append((dx, -1))
+        if up:
+            dirs.append((0, 1))
+        if down:
+            dirs.append((0, -1))
+    else:
+        right = free(x + 1, y)
+        left = free(x - 1, y)
+        if free(x, y + dy):
+            dirs.append((0, dy))
+            if right:
+                dirs.append((1, dy))
+            if left:
+                dirs.append((-1, dy))
+        if right:
+            dirs.append((1, 0))
+        if left:
+            dirs.append((-1, 0))
+    return dirs
+
+
+def _expand_jumps(jumps: List[Node]) -> List[Node]:
+    path = [jumps[0]]
+    for x1, y1 in jumps[1:]:
+        x, y = path[-1]
+        dx = (x1 > x) - (x1 < x)
+        dy = (y1 > y) - (y1 < y)
+        while (x, y) != (x1, y1):
+            x += dx
+            y += dy
+            path.append((x, y))
+    return path
+
+
+def jump_point_search(grid: GridMap, start: Node, goal: Node) -> Optional[PlanResult]:
+    # 8-connected JPS without corner cutting; cost is the octile path length and
+    # the returned path is expanded back to consecutive cells.
+    if not grid.in_bounds(start) or not grid.in_bounds(goal):
+        return None
+    if not grid.is_free(start) or not grid.is_free(goal):
+        return None
+
+    cells, stride = _flat_layout(grid)
+    open_heap: List[Tuple[float, Node]] = [(0.0, start)]
+    came_from: Dict[Node, Node] = {}
+    g_cost: Dict[Node, float] = {start: 0.0}
+    closed = set()
+    stats = _SearchStats()
+
+    while open_heap:
+        stats.pop(len(open_heap))
+        _, current = heapq.heappop(open_heap)
+        if current in closed:
+            stats.stale_pops += 1
+            continue
+        if current == goal:
+            jumps = reconstruct(came_from, start, goal)
+            return stats.result(_expand_jumps(jumps), g_cost[current], len(open_heap))
+        closed.add(current)
+
+        parent = came_from.get(current)
+        for dx, dy in _jps_directions(cells, stride, current, parent):
+            jump = _jump(cells, stride, current, dx, dy, goal)
+            if jump is None or jump in closed:
+                continue
+            tentative = g_cost[current] + octile(current, jump)
+            if jump not in g_cost or tentative < g_cost[jump]:
+                came_from[jump] = current
+                g_cost[jump] = tentative
+                heapq.heappush(open_heap, (tentative + octile(jump, goal), jump))
+
+    return None
+
+
+def dijkstra(grid: MapLike, start: Node, goal: Node) -> Optional[PlanResult]:
     return astar(grid, start, goal, heuristic=lambda *_: 0.0)
 
 
-def theta_star(grid: GridMap, start: Node, goal: Node) -> Optional[PlanResult]:
+class _Visibility:
+    # line_of_sight memoized for one search; checks counts the lines actually
+    # traced. Keys keep the pair's order because a Bresenham line from a to b
+    # need not visit the same cells as b to a.
+    def __init__(self, grid: MapLike) -> None:
+        self.grid = grid
+        self.checks = 0
+        self._memo: Dict[Tuple[Node, Node], bool] = {}
+
+    def __call__(self, a: Node, b: Node) -> bool:
+        seen = self._memo.get((a, b))
+        if seen is None:
+            self.checks += 1
+            seen = self._memo[(a, b)] = line_of_sight(self.grid, a, b)
+        return seen
+
+
+def theta_star(grid: MapLike, start: Node, goal: Node) -> Optional[PlanResult]:
     if not grid.in_bounds(start) or not grid.in_bounds(goal):
         return None
     if not grid.is_free(start) or not grid.is_free(goal):
@@ -125,19 +726,28 @@ def theta_star(grid: GridMap, start: Node, goal: Node) -> Optional[PlanResult]:
     heapq.heappush(open_heap, (0.0, start))
     parent: Dict[Node, Node] = {start: start}
     g_cost: Dict[Node, float] = {start: 0.0}
+    visible = _Visibility(grid)
+    stats = _SearchStats()
 
     while open_heap:
-        _, current = heapq.heappop(open_heap)
+        stats.pop(len(open_heap))
+        f_cost, current = heapq.heappop(open_heap)
+        if f_cost > g_cost[current] + euclidean(current, goal):
+            # Pushed before the node's cost improved; expanding it again would
+            # repeat relaxations already made from the better entry.
+            stats.stale_pops += 1
+            continue
         if current == goal:
             path = reconstruct(parent, start, goal)
-            return PlanResult(path=path, cost=g_cost[current])
+            stats.los_checks = visible.checks
+            return stats.result(path, g_cost[current], len(open_heap))
 
         for nxt in _neighbors(grid, current, diagonal=True):
             if nxt not in g_cost:
                 g_cost[nxt] = float("inf")
                 parent[nxt] = current
 
-            if line_of_sight(grid, parent[current], nxt):
+            if visible(parent[current], nxt):
                 tentative = g_cost[parent[current]] + euclidean(parent[current], nxt)
                 if tentative < g_cost[nxt]:
                     parent[nxt] = parent[current]
@@ -155,17 +765,203 @@ def theta_star(grid: GridMap, start: Node, goal: Node) -> Optional[PlanResult]:
     return None
 
 
+def lazy_theta_star(grid: MapLike, start: Node, goal: Node) -> Optional[PlanResult]:
+    # Lazy Theta* (Nash, Koenig & Tovey): neighbours optimistically inherit the
+    # expanded node's parent, and the line of sight to that parent is only
+    # checked when the neighbour is itself expanded. If it fails, the node
+    # falls back to its best already-expanded neighbour.
+    if not grid.in_bounds(start) or not grid.in_bounds(goal):
+        return None
+    if not grid.is_free(start) or not grid.is_free(goal):
+        return None
+
+    open_heap: List[Tuple[float, Node]] = [(0.0, start)]
+    parent: Dict[Node, Node] = {start: start}
+    g_cost: Dict[Node, float] = {start: 0.0}
+    closed = set()
+    visible = _Visibility(grid)
+    stats = _SearchStats()
+
+    while open_heap:
+        stats.pop(len(open_heap))
+        _, current = heapq.heappop(open_heap)
+        if current in closed:
+            stats.stale_pops += 1
+            continue
+        source = parent[current]
+        if source != current and not visible(source, current):
+            best = math.inf
+            for prev in _neighbors(grid, current, diagonal=True):
+                if prev in closed and g_cost[prev] + euclidean(prev, current) < best:
+                    best = g_cost[prev] + euclidean(prev, current)
+                    source = prev
+            parent[current] = source
+            g_cost[current] = best
+        if current == goal:
+            path = reconstruct(parent, start, goal)
+            stats.los_checks = visible.checks
+            return stats.result(path, g_cost[current], len(open_heap))
+        closed.add(current)
+
+        for nxt in _neighbors(grid, current, diagonal=True):
+            if nxt in closed:
+                continue
+            tentative = g_cost[source] + euclidean(source, nxt)
+            if tentative < g_cost.get(nxt, math.inf):
+                parent[nxt] = source
+                g_cost[nxt] = tentative
+                heapq.heappush(open_heap, (tentative + euclidean(nxt, goal), nxt))
+
+    return None
+
+
+# Planners that need the dense flat layout (or an abstraction built from it).
+# On a TiledGridMap they run on a window; the rest probe cells through
+# in_bounds / is_free and run on the tiles directly.
+_DENSE_METHODS = (
+    "alt",
+    "ara",
+    "astar_flat",
+    "bidirectional_astar",
+    "bidirectional_dijkstra",
+    "coarse_to_fine",
+    "goal_field",
+    "hpa",
+    "jps",
+)
+
+
+# Dense methods on the 4-connected unit-cost grid of astar, for which A* on the
+# tiles is an equivalent (optimal) fallback. jps is 8-connected and has none.
+_TILED_FALLBACK_METHODS = frozenset(_DENSE_METHODS) - {"jps"}
+
+
+def _plan_windowed(
+    grid: TiledGridMap, start: Node, goal: Node, method: str, max_cells: int
+) -> Optional[PlanResult]:
+    # Plans on a dense copy of the start/goal bounding box grown by a margin,
+    # doubling the margin until no path leaving the window could be cheaper
+    # than the one found. A path through a cell outside a margin of m is at
+    # least 2 * hypot(m + 1, |start - goal| / 2) long (the ellipse with foci at
+    # start and goal), and every planner's cost is at least its Euclidean
+    # length. Windows past max_cells fall back to A* on the tiles, whose memory
+    # grows with the cells it expands rather than with the window. That only
+    # stands in for methods searching the same 4-connected unit-cost grid
+    # (A* is optimal there); others raise ValueError.
+    if not grid.in_bounds(start) or not grid.in_bounds(goal):
+        return None
+    if not grid.is_free(start) or not grid.is_free(goal):
+        return None
+    half = euclidean(start, goal) / 2.0
+    margin = max(8, int(half) // 4)
+    while True:
+        x0 = max(0, min(start[0], goal[0]) - margin)
+        y0 = max(0, min(start[1], goal[1]) - margin)
+        x1 = min(grid.width, max(start[0], goal[0]) + margin + 1)
+        y1 = min(grid.height, max(start[1], goal[1]) + margin + 1)
+        whole = (x0, y0, x1, y1) == (0, 0, grid.width, grid.height)
+        if (x1 - x0) * (y1 - y0) > max_cells:
+            if method not in _TILED_FALLBACK_METHODS:
+                raise ValueError(
+                    f"Window of {(x1 - x0) * (y1 - y0)} cells exceeds max_window_cells and "
+                    f"{method} has no tile-based fallback."
+                )
+            return astar(grid, start, goal)
+        window = GridMap(grid.region(x0, y0, x1, y1))
+        result = _plan_dense(
+            window, (start[0] - x0, start[1] - y0), (goal[0] - x0, goal[1] - y0), method
+        )
+        if result is not None and (whole or result.cost <= 2.0 * math.hypot(margin + 1, half)):
+            result.path = [(x + x0, y + y0) for x, y in result.path]
+            return result
+        if result is None and whole:
+            return None
+        margin *= 2
+
+
+def _plan_dense(grid: GridMap, start: Node, goal: Node, method: str) -> Optional[PlanResult]:
+    # Window planning bypasses the goal field and HPA caches: a throwaway
+    # window would only evict the entries of maps that are queried again.
+    if method == "goal_field":
+        from .goal_field import goal_field
+
+        return goal_field(grid, goal).extract(start)
+    if method == "hpa":
+        from .hpa import ClusterGraph
+
+        return ClusterGraph(grid).plan(start, goal)
+    return plan_path(grid, start, goal, method)
+
+
 def plan_path(
-    grid: GridMap,
+    grid: MapLike,
     start: Node,
     goal: Node,
     method: str = "astar",
+    max_window_cells: int = 1 << 22,
+    cache: Optional[PlanCache] = None,
+    deadline_ms: Optional[float] = None,
+    max_expansions: Optional[int] = None,
 ) -> Optional[PlanResult]:
+    """Plan from start to goal with the named method.
+
+    Returns None when there is no path. With deadline_ms or max_expansions
+    (ara only), the result may be a suboptimal path from an earlier pass, and
+    PlanBudgetExhausted is raised if the budget runs out before any path.
+
+    On a TiledGridMap, dense methods run on a window around start and goal.
+    A window larger than max_window_cells falls back to A* on the tiles for
+    methods on the same 4-connected unit-cost grid (A* returns their optimal
+    cost); jps, which is 8-connected, raises ValueError instead.
+    """
     method = method.lower()
+    budgeted = deadline_ms is not None or max_expansions is not None
+    if budgeted:
+        # A budgeted answer depends on timing, so it is never cached.
+        if method != "ara" or not isinstance(grid, GridMap):
+            raise ValueError("Planning budgets apply only to the ara planner on a GridMap.")
+        return ara_star(grid, start, goal, deadline_ms, max_expansions)
+    if cache is not None and isinstance(grid, GridMap):
+        dense = grid
+
+        def search() -> Optional[PlanResult]:
+            return plan_path(dense, start, goal, method, max_window_cells)
+
+        return cache.plan(dense, start, goal, method, search)
     if method == "astar":
         return astar(grid, start, goal)
     if method == "dijkstra":
         return dijkstra(grid, start, goal)
     if method == "theta":
         return theta_star(grid, start, goal)
+    if method == "lazy_theta":
+        return lazy_theta_star(grid, start, goal)
+    if isinstance(grid, TiledGridMap):
+        if method not in _DENSE_METHODS:
+            raise ValueError(f"Unknown planner method: {method}")
+        return _plan_windowed(grid, start, goal, method, max_window_cells)
+    if method == "astar_flat":
+        return astar_flat(grid, start, goal)
+    if method == "bidirectional_astar":
+        return bidirectional_astar(grid, start, goal)
+    if method == "bidirectional_dijkstra":
+        return bidirectional_dijkstra(grid, start, goal)
+    if method == "goal_field":
+        from .goal_field import default_cache
+
+        return default_cache.plan(grid, start, goal)
+    if method == "hpa":
+        from .hpa import default_cache as hpa_cache
+
+        return hpa_cache.plan(grid, start, goal)
+    if method == "jps":
+        return jump_point_search(grid, start, goal)
+    if method == "coarse_to_fine":
+        return coarse_to_fine(grid, start, goal)
+    if method == "alt":
+        from .landmarks import default_cache as landmark_cache
+
+        return landmark_cache.plan(grid, start, goal)
+    if method == "ara":
+        return ara_star(grid, start, goal)
     raise ValueError(f"Unknown planner method: {method}")
@@ -2,17 +2,24 @@ from __future__ import annotations
 
 import math
 import random
+import time
 from dataclasses import dataclass
-from typing import List, Tuple
+from typing import Dict, List, Protocol, Tuple
+
+import numpy as np
 
 from .collision import path_in_collision
 from .control import PurePursuitParams, pure_pursuit_control
-from .costmap import CostMap, LocalCostmapParams
+from .costmap import CostMap, CostMapLike, IncrementalCostMap, LocalCostmapParams
+from .dstar import DStarLite
 from .dynamic import DynamicObstacleField
+from .hpa import ClusterGraph
 from .local_planner import DWAParams, dwa_control
 from .localization import EKF, LocalizationParams
 from .map import GridMap
-from .planner import plan_path
+from .path_index import PathIndex
+from .plan_cache import PlanCache
+from .planner import PlanBudgetExhausted, plan_path
 from .sensors import noisy_control, noisy_position
 
 Pose = Tuple[float, float, float]
@@ -26,39 +33,317 @@ class SimParams:
     goal_tolerance: float = 0.3
 
 
-def simulate_path(
-    path: List[Point],
-    start_pose: Pose,
-    params: SimParams,
-    ctrl_params: PurePursuitParams,
-) -> List[Pose]:
-    poses: List[Pose] = [start_pose]
-    target_idx = 0
+class Controller(Protocol):
+    def command(self, sim: Simulator, pose: Pose) -> Tuple[float, float]: ...
+
+
+class Estimator(Protocol):
+    @property
+    def pose(self) -> Pose: ...
+
+    def update(self, true_pose: Pose, v: float, omega: float, dt: float) -> None: ...
+
+
+class World(Protocol):
+    # update() runs before control each tick and returns False to end the run;
+    # on_stuck() returns True if the world handles a stalled controller.
+    def update(self, sim: Simulator) -> bool: ...
+
+    def after_step(self, sim: Simulator) -> None: ...
+
+    def on_stuck(self, sim: Simulator) -> bool: ...
+
+
+class Simulator:
+    # One fixed-step loop for every run mode. Each tick: goal check on the
+    # control pose (the estimate when an estimator is attached), world update,
+    # controller command, unicycle integration of the true pose and estimator
+    # update. Poses are written into arrays sized for max_steps up front.
+    def __init__(
+        self,
+        path: List[Point],
+        start_pose: Pose,
+        params: SimParams,
+        controller: Controller,
+        goal: Point | None = None,
+        costmap: CostMap | None = None,
+        estimator: Estimator | None = None,
+        world: World | None = None,
+    ) -> None:
+        self.params = params
+        self.controller = controller
+        self.estimator = estimator
+        self.world = world
+        self.goal = path[-1] if goal is None else goal
+        self.costmap = costmap
+        self.path = path
+        self.path_index = PathIndex(path)
+        self.done = False
+        self.stage_seconds: Dict[str, float] = {"world": 0.0, "control": 0.0, "estimate": 0.0}
+        size = max(0, params.max_steps) + 1
+        self._true = np.empty((size, 3))
+        self._est = np.empty((size, 3)) if estimator is not None else None
+        self._pose: Pose = start_pose
+        self._true[0] = start_pose
+        if self._est is not None:
+            self._est[0] = start_pose
+        self.count = 1
+
+    def set_path(self, path: List[Point]) -> None:
+        self.path = path
+        self.path_index = PathIndex(path)
+
+    @property
+    def pose(self) -> Pose:
+        return self._pose
+
+    @property
+    def control_pose(self) -> Pose:
+        return self._pose if self.estimator is None else self.estimator.pose
+
+    @property
+    def true_poses(self) -> List[Pose]:
+        return [(x, y, yaw) for x, y, yaw in self._true[: self.count].tolist()]
+
+    @property
+    def est_poses(self) -> List[Pose]:
+        if self._est is None:
+            return self.true_poses
+        return [(x, y, yaw) for x, y, yaw in self._est[: self.count].tolist()]
+
+    def stop(self) -> None:
+        self.done = True
+
+    def on_stuck(self) -> None:
+        # A stalled controller ends the run unless the world reacts (e.g. replans).
+        if self.world is None or not self.world.on_stuck(self):
+            self.stop()
+
+    def step(self) -> bool:
+        if self.done or self.count >= len(self._true):
+            self.done = True
+            return False
+        pose = self.control_pose
+        gx, gy = self.goal
+        if math.hypot(gx - pose[0], gy - pose[1]) <= self.params.goal_tolerance:
+            self.done = True
+            return False
+
+        if self.world is not None:
+            t0 = time.perf_counter()
+            alive = self.world.update(self)
+            self.stage_seconds["world"] += time.perf_counter() - t0
+            if not alive:
+                self.done = True
+                return False
+
+        t0 = time.perf_counter()
+        v, omega = self.controller.command(self, pose)
+        self.stage_seconds["control"] += time.perf_counter() - t0
+        if self.done:
+            return False
+
+        dt = self.params.dt
+        x, y, yaw = self._pose
+        x += v * math.cos(yaw) * dt
+        y += v * math.sin(yaw) * dt
+        yaw += omega * dt
+        self._pose = (x, y, yaw)
+        self._true[self.count] = self._pose
+        if self.estimator is not None and self._est is not None:
+            t0 = time.perf_counter()
+            self.estimator.update(self._pose, v, omega, dt)
+            self._est[self.count] = self.estimator.pose
+            self.stage_seconds["estimate"] += time.perf_counter() - t0
+        self.count += 1
+        if self.world is not None:
+            self.world.after_step(self)
+        return True
+
+    def run(self) -> Simulator:
+        while self.step():
+            pass
+        return self
+
+
+class PurePursuitController:
+    def __init__(self, params: PurePursuitParams) -> None:
+        self.params = params
+        self.target_idx = 0
+
+    def command(self, sim: Simulator, pose: Pose) -> Tuple[float, float]:
+        v, omega, self.target_idx = pure_pursuit_control(
+            pose, sim.path, self.params, self.target_idx, sim.path_index
+        )
+        return v, omega
+
+
+class DWAController:
+    def __init__(
+        self,
+        params: DWAParams,
+        local_params: LocalCostmapParams | None = None,
+        stuck_limit: int = 10,
+    ) -> None:
+        self.params = params
+        self.local_params = local_params
+        self.stuck_limit = stuck_limit
+        self.stuck_steps = 0
+
+    def command(self, sim: Simulator, pose: Pose) -> Tuple[float, float]:
+        if sim.costmap is None:
+            raise ValueError("DWAController needs a simulator costmap.")
+        active_costmap: CostMapLike = sim.costmap
+        local = self.local_params
+        if local and local.enabled:
+            active_costmap = sim.costmap.windowed(
+                (pose[0], pose[1]), local.radius, local.unknown_as_obstacle
+            )
+        v, omega, _ = dwa_control(
+            pose, sim.path, active_costmap, self.params, sim.params.dt, sim.path_index
+        )
+        if abs(v) < 1e-3 and abs(omega) < 1e-3:
+            self.stuck_steps += 1
+            if self.stuck_steps >= self.stuck_limit:
+                sim.on_stuck()
+        else:
+            self.stuck_steps = 0
+        return v, omega
 
-    for _ in range(params.max_steps):
-        x, y, yaw = poses[-1]
-        gx, gy = path[-1]
-        if math.hypot(gx - x, gy - y) <= params.goal_tolerance:
-            break
 
-        v, omega, target_idx = pure_pursuit_control(
-            (x, y, yaw), path, ctrl_params, target_idx
-        )
+class EKFEstimator:
+    def __init__(self, start_pose: Pose, params: LocalizationParams) -> None:
+        self.params = params
+        self.rng = random.Random(params.seed)
+        self.ekf = EKF(start_pose, params)
+
+    @property
+    def pose(self) -> Pose:
+        return self.ekf.pose
+
+    def update(self, true_pose: Pose, v: float, omega: float, dt: float) -> None:
+        v_noisy, omega_noisy = noisy_control(v, omega, self.params.noise, self.rng)
+        self.ekf.predict(v_noisy, omega_noisy, dt)
+        self.ekf.update(noisy_position(true_pose, self.params.noise, self.rng))
+
+
+def _grid_to_path(plan: List[Tuple[int, int]]) -> List[Point]:
+    return [(float(x), float(y)) for x, y in plan]
+
+
+def _pose_to_cell(pose: Pose) -> Tuple[int, int]:
+    x, y, _ = pose
+    return int(round(x)), int(round(y))
+
 
-        x += v * math.cos(yaw) * params.dt
-        y += v * math.sin(yaw) * params.dt
-        yaw += omega * params.dt
-        poses.append((x, y, yaw))
+class DynamicWorld:
+    # Moves the dynamic obstacles, keeps the layered costmap current and replans
+    # when the path is blocked, on a fixed interval, or after DWA stalls.
+    def __init__(
+        self,
+        base_grid: GridMap,
+        inflation_radius: float,
+        dynamic_field: DynamicObstacleField,
+        goal: Tuple[int, int],
+        replan_interval: int,
+        max_replans: int,
+        global_planner: str,
+        incremental_replan: bool = False,
+        replan_budget_ms: float | None = None,
+    ) -> None:
+        self.base_grid = base_grid
+        self.dynamic_field = dynamic_field
+        self.goal = goal
+        self.replan_interval = replan_interval
+        self.max_replans = max_replans
+        self.global_planner = global_planner
+        if replan_budget_ms is not None and (incremental_replan or global_planner != "ara"):
+            raise ValueError("Replan budgets need the anytime planner: use global_planner='ara'.")
+        self.incremental_replan = incremental_replan
+        self.replan_budget_ms = replan_budget_ms
+        self.layered = IncrementalCostMap(base_grid, inflation_radius)
+        self.replanner: DStarLite | None = None
+        self.hierarchy: ClusterGraph | None = None
+        # Replans often repeat a query on a costmap whose inflated layer did
+        # not change (or changed back); the fingerprint kept by the layered
+        # costmap makes those lookups cheap.
+        self.plans = PlanCache(max_entries=64)
+        self.steps_since_replan = 0
+        self.replans = 0
+
+    def update(self, sim: Simulator) -> bool:
+        self.dynamic_field.step(sim.params.dt, self.base_grid)
+        full_costmap = self.layered.update(self.dynamic_field.cells(self.base_grid))
+        sim.costmap = full_costmap
+        if self.incremental_replan:
+            # D* Lite reads the live inflated buffer and repairs around changed cells.
+            if self.replanner is None:
+                self.replanner = DStarLite(full_costmap.inflated_map(), self.goal)
+            self.replanner.mark_changed(self.layered.changed)
+        elif self.global_planner == "hpa":
+            # The cluster abstraction also reads the live buffer; only clusters
+            # holding changed cells are rebuilt before the next replan.
+            if self.hierarchy is None:
+                self.hierarchy = ClusterGraph(full_costmap.inflated_map())
+            self.hierarchy.mark_changed(self.layered.changed)
 
-    return poses
+        needs_replan = False
+        if self.replan_interval > 0 and self.steps_since_replan >= self.replan_interval:
+            needs_replan = True
+        if path_in_collision(full_costmap, sim.path):
+            needs_replan = True
+        if not needs_replan:
+            return True
+
+        start_cell = _pose_to_cell(sim.control_pose)
+        if self.replanner is not None:
+            plan = self.replanner.plan(start_cell)
+        elif self.hierarchy is not None:
+            plan = self.hierarchy.plan(start_cell, self.goal)
+        elif self.replan_budget_ms is not None:
+            try:
+                plan = plan_path(
+                    full_costmap.inflated_map(),
+                    start_cell,
+                    self.goal,
+                    self.global_planner,
+                    deadline_ms=self.replan_budget_ms,
+                )
+            except PlanBudgetExhausted:
+                # No pass finished within the tick: keep the current path and
+                # try again next tick.
+                return True
+        else:
+            plan = plan_path(
+                full_costmap.inflated_map(),
+                start_cell,
+                self.goal,
+                self.global_planner,
+                cache=self.plans,
+            )
+        if plan is None:
+            return False
+        sim.set_path(_grid_to_path(plan.path))
+        self.steps_since_replan = 0
+        self.replans += 1
+        return self.replans < self.max_replans
 
+    def after_step(self, sim: Simulator) -> None:
+        self.steps_since_replan += 1
 
-def _step_pose(pose: Pose, v: float, omega: float, dt: float) -> Pose:
-    x, y, yaw = pose
-    x += v * math.cos(yaw) * dt
-    y += v * math.sin(yaw) * dt
-    yaw += omega * dt
-    return (x, y, yaw)
+    def on_stuck(self, sim: Simulator) -> bool:
+        self.steps_since_replan = self.replan_interval
+        return True
+
+
+def simulate_path(
+    path: List[Point],
+    start_pose: Pose,
+    params: SimParams,
+    ctrl_params: PurePursuitParams,
+) -> List[Pose]:
+    sim = Simulator(path, start_pose, params, PurePursuitController(ctrl_params))
+    return sim.run().true_poses
 
 
 def simulate_path_localized(
@@ -68,32 +353,14 @@ def simulate_path_localized(
     ctrl_params: PurePursuitParams,
     loc_params: LocalizationParams,
 ) -> Tuple[List[Pose], List[Pose]]:
-    rng = random.Random(loc_params.seed)
-    ekf = EKF(start_pose, loc_params)
-    true_poses: List[Pose] = [start_pose]
-    est_poses: List[Pose] = [start_pose]
-    target_idx = 0
-
-    for _ in range(params.max_steps):
-        est_pose = ekf.pose
-        gx, gy = path[-1]
-        if math.hypot(gx - est_pose[0], gy - est_pose[1]) <= params.goal_tolerance:
-            break
-
-        v, omega, target_idx = pure_pursuit_control(
-            est_pose, path, ctrl_params, target_idx
-        )
-
-        true_pose = _step_pose(true_poses[-1], v, omega, params.dt)
-        v_noisy, omega_noisy = noisy_control(v, omega, loc_params.noise, rng)
-        ekf.predict(v_noisy, omega_noisy, params.dt)
-        measurement = noisy_position(true_pose, loc_params.noise, rng)
-        ekf.update(measurement)
-
-        true_poses.append(true_pose)
-        est_poses.append(ekf.pose)
-
-    return true_poses, est_poses
+    sim = Simulator(
+        path,
+        start_pose,
+        params,
+        PurePursuitController(ctrl_params),
+        estimator=EKFEstimator(start_pose, loc_params),
+    ).run()
+    return sim.true_poses, sim.est_poses
 
 
 def simulate_dwa(
@@ -104,36 +371,9 @@ def simulate_dwa(
     dwa_params: DWAParams,
     local_params: LocalCostmapParams | None = None,
 ) -> List[Pose]:
-    poses: List[Pose] = [start_pose]
-    stuck_steps = 0
-
-    for _ in range(params.max_steps):
-        x, y, yaw = poses[-1]
-        gx, gy = path[-1]
-        if math.hypot(gx - x, gy - y) <= params.goal_tolerance:
-            break
-
-        active_costmap = costmap
-        if local_params and local_params.enabled:
-            active_costmap = costmap.windowed(
-                (x, y), local_params.radius, local_params.unknown_as_obstacle
-            )
-        v, omega, _ = dwa_control(
-            (x, y, yaw), path, active_costmap, dwa_params, params.dt
-        )
-        if abs(v) < 1e-3 and abs(omega) < 1e-3:
-            stuck_steps += 1
-            if stuck_steps >= 10:
-                break
-        else:
-            stuck_steps = 0
-
-        x += v * math.cos(yaw) * params.dt
-        y += v * math.sin(yaw) * params.dt
-        yaw += omega * params.dt
-        poses.append((x, y, yaw))
-
-    return poses
+    controller = DWAController(dwa_params, local_params)
+    sim = Simulator(path, start_pose, params, controller, costmap=costmap)
+    return sim.run().true_poses
 
 
 def simulate_dwa_localized(
@@ -145,52 +385,15 @@ def simulate_dwa_localized(
     loc_params: LocalizationParams,
     local_params: LocalCostmapParams | None = None,
 ) -> Tuple[List[Pose], List[Pose]]:
-    rng = random.Random(loc_params.seed)
-    ekf = EKF(start_pose, loc_params)
-    true_poses: List[Pose] = [start_pose]
-    est_poses: List[Pose] = [start_pose]
-    stuck_steps = 0
-
-    for _ in range(params.max_steps):
-        est_pose = ekf.pose
-        gx, gy = path[-1]
-        if math.hypot(gx - est_pose[0], gy - est_pose[1]) <= params.goal_tolerance:
-            break
-
-        active_costmap = costmap
-        if local_params and local_params.enabled:
-            active_costmap = costmap.windowed(
-                (est_pose[0], est_pose[1]),
-                local_params.radius,
-                local_params.unknown_as_obstacle,
-            )
-        v, omega, _ = dwa_control(est_pose, path, active_costmap, dwa_params, params.dt)
-        if abs(v) < 1e-3 and abs(omega) < 1e-3:
-            stuck_steps += 1
-            if stuck_steps >= 10:
-                break
-        else:
-            stuck_steps = 0
-
-        true_pose = _step_pose(true_poses[-1], v, omega, params.dt)
-        v_noisy, omega_noisy = noisy_control(v, omega, loc_params.noise, rng)
-        ekf.predict(v_noisy, omega_noisy, params.dt)
-        measurement = noisy_position(true_pose, loc_params.noise, rng)
-        ekf.update(measurement)
-
-        true_poses.append(true_pose)
-        est_poses.append(ekf.pose)
-
-    return true_poses, est_poses
-
-
-def _grid_to_path(plan: List[Tuple[int, int]]) -> List[Point]:
-    return [(float(x), float(y)) for x, y in plan]
-
-
-def _pose_to_cell(pose: Pose) -> Tuple[int, int]:
-    x, y, _ = pose
-    return int(round(x)), int(round(y))
+    sim = Simulator(
+        path,
+        start_pose,
+        params,
+        DWAController(dwa_params, local_params),
+        costmap=costmap,
+        estimator=EKFEstimator(start_pose, loc_params),
+    ).run()
+    return sim.true_poses, sim.est_poses
 
 
 def simulate_dwa_dynamic(
@@ -206,69 +409,29 @@ def simulate_dwa_dynamic(
     max_replans: int,
     global_planner: str,
     local_params: LocalCostmapParams | None = None,
+    incremental_replan: bool = False,
+    replan_budget_ms: float | None = None,
 ) -> Tuple[List[Pose], List[Point]]:
-    poses: List[Pose] = [start_pose]
-    current_path = path
-    stuck_steps = 0
-    steps_since_replan = 0
-    replans = 0
-
-    for _ in range(params.max_steps):
-        x, y, yaw = poses[-1]
-        gx, gy = goal
-        if math.hypot(gx - x, gy - y) <= params.goal_tolerance:
-            break
-
-        dynamic_field.step(params.dt, base_grid)
-        full_costmap = CostMap.from_grid(
-            base_grid,
-            inflation_radius,
-            occupied=dynamic_field.cells(base_grid),
-        )
-
-        needs_replan = False
-        if replan_interval > 0 and steps_since_replan >= replan_interval:
-            needs_replan = True
-        if path_in_collision(full_costmap, current_path):
-            needs_replan = True
-
-        if needs_replan:
-            start_cell = _pose_to_cell(poses[-1])
-            plan = plan_path(full_costmap.inflated_map(), start_cell, goal, global_planner)
-            if plan is None:
-                break
-            current_path = _grid_to_path(plan.path)
-            steps_since_replan = 0
-            replans += 1
-            if replans >= max_replans:
-                break
-
-        active_costmap = full_costmap
-        if local_params and local_params.enabled:
-            active_costmap = full_costmap.windowed(
-                (x, y), local_params.radius, local_params.unknown_as_obstacle
-            )
-        v, omega, _ = dwa_control(
-            (x, y, yaw),
-            current_path,
-            active_costmap,
-            dwa_params,
-            params.dt,
-        )
-        if abs(v) < 1e-3 and abs(omega) < 1e-3:
-            stuck_steps += 1
-            if stuck_steps >= 10:
-                steps_since_replan = replan_interval
-        else:
-            stuck_steps = 0
-
-        x += v * math.cos(yaw) * params.dt
-        y += v * math.sin(yaw) * params.dt
-        yaw += omega * params.dt
-        poses.append((x, y, yaw))
-        steps_since_replan += 1
-
-    return poses, current_path
+    world = DynamicWorld(
+        base_grid,
+        inflation_radius,
+        dynamic_field,
+        goal,
+        replan_interval,
+        max_replans,
+        global_planner,
+        incremental_replan,
+        replan_budget_ms,
+    )
+    sim = Simulator(
+        path,
+        start_pose,
+        params,
+        DWAController(dwa_params, local_params),
+        goal=(float(goal[0]), float(goal[1])),
+        world=world,
+    ).run()
+    return sim.true_poses, sim.path
 
 
 def simulate_dwa_dynamic_localized(
@@ -285,71 +448,27 @@ def simulate_dwa_dynamic_localized(
     loc_params: LocalizationParams,
     global_planner: str,
     local_params: LocalCostmapParams | None = None,
+    incremental_replan: bool = False,
+    replan_budget_ms: float | None = None,
 ) -> Tuple[List[Pose], List[Pose], List[Point]]:
-    rng = random.Random(loc_params.seed)
-    ekf = EKF(start_pose, loc_params)
-    true_poses: List[Pose] = [start_pose]
-    est_poses: List[Pose] = [start_pose]
-    current_path = path
-    stuck_steps = 0
-    steps_since_replan = 0
-    replans = 0
-
-    for _ in range(params.max_steps):
-        est_pose = ekf.pose
-        gx, gy = goal
-        if math.hypot(gx - est_pose[0], gy - est_pose[1]) <= params.goal_tolerance:
-            break
-
-        dynamic_field.step(params.dt, base_grid)
-        full_costmap = CostMap.from_grid(
-            base_grid,
-            inflation_radius,
-            occupied=dynamic_field.cells(base_grid),
-        )
-
-        needs_replan = False
-        if replan_interval > 0 and steps_since_replan >= replan_interval:
-            needs_replan = True
-        if path_in_collision(full_costmap, current_path):
-            needs_replan = True
-
-        if needs_replan:
-            start_cell = _pose_to_cell(est_pose)
-            plan = plan_path(full_costmap.inflated_map(), start_cell, goal, global_planner)
-            if plan is None:
-                break
-            current_path = _grid_to_path(plan.path)
-            steps_since_replan = 0
-            replans += 1
-            if replans >= max_replans:
-                break
-
-        active_costmap = full_costmap
-        if local_params and local_params.enabled:
-            active_costmap = full_costmap.windowed(
-                (est_pose[0], est_pose[1]),
-                local_params.radius,
-                local_params.unknown_as_obstacle,
-            )
-        v, omega, _ = dwa_control(
-            est_pose, current_path, active_costmap, dwa_params, params.dt
-        )
-        if abs(v) < 1e-3 and abs(omega) < 1e-3:
-            stuck_steps += 1
-            if stuck_steps >= 10:
-                steps_since_replan = replan_interval
-        else:
-            stuck_steps = 0
-
-        true_pose = _step_pose(true_poses[-1], v, omega, params.dt)
-        v_noisy, omega_noisy = noisy_control(v, omega, loc_params.noise, rng)
-        ekf.predict(v_noisy, omega_noisy, params.dt)
-        measurement = noisy_position(true_pose, loc_params.noise, rng)
-        ekf.update(measurement)
-
-        true_poses.append(true_pose)
-        est_poses.append(ekf.pose)
-        steps_since_replan += 1
-
-    return true_poses, est_poses, current_path
+    world = DynamicWorld(
+        base_grid,
+        inflation_radius,
+        dynamic_field,
+        goal,
+        replan_interval,
+        max_replans,
+        global_planner,
+        incremental_replan,
+        replan_budget_ms,
+    )
+    sim = Simulator(
+        path,
+        start_pose,
+        params,
+        DWAController(dwa_params, local_params),
+        goal=(float(goal[0]), float(goal[1])),
+        estimator=EKFEstimator(start_pose, loc_params),
+        world=world,
+    ).run()
+    return sim.true_poses, sim.est_poses, sim.path
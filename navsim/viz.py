@@ -4,7 +4,7 @@ from typing import List, Tuple
 
 import matplotlib.pyplot as plt
 
-from .map import GridMap
+from .map import Grid, GridMap
 
 Point = Tuple[float, float]
 Pose = Tuple[float, float, float]
@@ -17,7 +17,7 @@ def plot_scene(
     start: Tuple[int, int],
     goal: Tuple[int, int],
     out_path: str,
-    display_grid: List[List[int]] | None = None,
+    display_grid: Grid | None = None,
     est_poses: List[Pose] | None = None,
 ) -> None:
     fig, ax = plt.subplots(figsize=(6, 6))
@@ -60,7 +60,7 @@ def render_gif(
     goal: Tuple[int, int],
     out_path: str,
     step: int = 3,
-    display_grid: List[List[int]] | None = None,
+    display_grid: Grid | None = None,
     est_poses: List[Pose] | None = None,
 ) -> None:
     import imageio.v2 as imageio
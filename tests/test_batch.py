@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from navsim.batch import simulate_path_batch
+from navsim.control import PurePursuitParams
+from navsim.costmap import CostMap
+from navsim.localization import LocalizationParams
+from navsim.map import demo_grid
+from navsim.planner import plan_path
+from navsim.sensors import SensorNoise
+from navsim.sim import SimParams, simulate_path, simulate_path_localized
+
+
+def _paths():
+    grid = demo_grid()
+    pairs = [((0, 0), (9, 9)), ((9, 0), (0, 9)), ((4, 4), (0, 0)), ((0, 2), (9, 4))]
+    paths = []
+    for start, goal in pairs:
+        plan = plan_path(grid, start, goal, "astar")
+        assert plan is not None
+        paths.append([(float(x), float(y)) for x, y in plan.path])
+    starts = [(path[0][0], path[0][1], 0.3 * i) for i, path in enumerate(paths)]
+    return paths, starts
+
+
+def test_batch_matches_single_trial_simulation():
+    paths, starts = _paths()
+    params = SimParams(max_steps=120)
+    ctrl = PurePursuitParams()
+    result = simulate_path_batch(paths, starts, params, ctrl, record=True)
+    assert result.poses is not None
+    for i, (path, start) in enumerate(zip(paths, starts)):
+        expected = simulate_path(path, start, params, ctrl)
+        assert len(result.poses[i]) == len(expected) == result.steps[i] + 1
+        assert np.allclose(result.poses[i], expected, atol=1e-9)
+        assert np.allclose(result.final_poses[i], expected[-1], atol=1e-9)
+
+
+def test_batch_with_ekf_matches_localized_simulation():
+    paths, starts = _paths()
+    params = SimParams()
+    ctrl = PurePursuitParams()
+    loc = LocalizationParams(noise=SensorNoise(), seed=4)
+    result = simulate_path_batch(paths, starts, params, ctrl, loc_params=loc, record=True)
+    assert result.poses is not None and result.est_poses is not None
+    for i, (path, start) in enumerate(zip(paths, starts)):
+        true_poses, est_poses = simulate_path_localized(path, start, params, ctrl, loc)
+        assert np.allclose(result.poses[i], true_poses, atol=1e-9)
+        assert np.allclose(result.est_poses[i], est_poses, atol=1e-9)
+
+
+def test_batch_flags_collisions():
+    grid = demo_grid()
+    costmap = CostMap.from_grid(grid, 0.0)
+    cells = [(x, y) for y in range(grid.height) for x in range(grid.width)]
+    occupied = next(cell for cell in cells if costmap.is_occupied(cell))
+    path = [(float(occupied[0]), float(occupied[1]))]
+    start = (float(occupied[0]), float(occupied[1]), 0.0)
+    result = simulate_path_batch([path], [start], SimParams(), PurePursuitParams(), costmap=costmap)
+    assert result.collision.tolist() == [True]
+    assert result.steps.tolist() == [0]
+    assert result.traj_length[0] == pytest.approx(0.0)
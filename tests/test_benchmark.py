@@ -0,0 +1,93 @@
+import pytest
+
+from navsim.benchmark import BenchmarkConfig, _free_cells, run_benchmark
+from navsim.costmap import CostMap
+from navsim.local_planner import DWAParams
+from navsim.map import demo_grid, load_map, save_map, warehouse_grid
+from navsim.sim import SimParams
+
+
+def _strip_timing(rows):
+    return [{key: value for key, value in row.items() if not key.endswith("_ms")} for row in rows]
+
+
+def test_parallel_benchmark_matches_serial():
+    grid = demo_grid()
+    costmap = CostMap.from_grid(grid, 0.0)
+    cfg = BenchmarkConfig(
+        inflation_radius=0.0,
+        global_planner="astar",
+        local_planner="pure_pursuit",
+        lookahead=0.8,
+        speed=0.8,
+        dwa=DWAParams(),
+    )
+    pairs = [((0, 0), (9, 9)), ((9, 0), (0, 9)), ((4, 4), (0, 0)), ((0, 2), (9, 4))]
+    serial = run_benchmark(grid, costmap, cfg, SimParams(), pairs, "astar")
+    parallel = run_benchmark(grid, costmap, cfg, SimParams(), pairs, "astar", workers=2)
+    assert _strip_timing(parallel) == _strip_timing(serial)
+
+
+def test_batched_pure_pursuit_matches_per_trial_runs():
+    grid = demo_grid()
+    costmap = CostMap.from_grid(grid, 0.5)
+    cfg = BenchmarkConfig(
+        inflation_radius=0.5,
+        global_planner="astar",
+        local_planner="pure_pursuit",
+        lookahead=0.8,
+        speed=0.8,
+        dwa=DWAParams(),
+    )
+    pairs = [((0, 0), (9, 9)), ((9, 0), (0, 9)), ((4, 4), (0, 0)), ((0, 2), (9, 4))]
+    batched = run_benchmark(grid, costmap, cfg, SimParams(), pairs, "astar")
+    per_trial = run_benchmark(grid, costmap, cfg, SimParams(), pairs, "astar", batch=False)
+    for row, expected in zip(_strip_timing(batched), _strip_timing(per_trial)):
+        for key, value in expected.items():
+            assert row[key] == pytest.approx(value, rel=1e-9, abs=1e-12)
+
+
+def test_benchmark_rows_split_timing_and_count_search_work():
+    grid = demo_grid()
+    costmap = CostMap.from_grid(grid, 0.0)
+    cfg = BenchmarkConfig(
+        inflation_radius=0.0,
+        global_planner="theta",
+        local_planner="dwa",
+        lookahead=0.8,
+        speed=0.8,
+        dwa=DWAParams(),
+    )
+    rows = run_benchmark(grid, costmap, cfg, SimParams(max_steps=50), [((0, 0), (9, 9))], "theta")
+    row = rows[0]
+    assert 0.0 < row["plan_ms"] <= row["elapsed_ms"]
+    assert 0.0 < row["control_ms"] <= row["elapsed_ms"]
+    assert row["collision_ms"] > 0.0
+    assert 0 < row["expansions"] <= row["pushes"]
+    assert row["los_checks"] > 0
+    assert row["peak_open"] > 0
+
+
+def test_free_cells_index_like_row_major_list():
+    costmap = CostMap.from_grid(warehouse_grid(23, 17), 0.5)
+    expected = [
+        (x, y)
+        for y in range(costmap.height)
+        for x in range(costmap.width)
+        if not costmap.is_occupied((x, y))
+    ]
+    cells = _free_cells(costmap)
+    assert len(cells) == len(expected)
+    assert [cells[i] for i in range(len(cells))] == expected
+
+
+def test_free_cells_skip_any_nonzero_byte_of_a_map_file(tmp_path):
+    path = tmp_path / "odd.map"
+    save_map(warehouse_grid(23, 17), path)
+    with path.open("r+b") as handle:
+        handle.seek(-1, 2)
+        handle.write(bytes([2]))
+    costmap = CostMap.from_grid(load_map(path), 0.0)
+    cells = _free_cells(costmap)
+    assert (22, 16) not in [cells[i] for i in range(len(cells))]
+    assert all(not costmap.is_occupied(cells[i]) for i in range(len(cells)))
@@ -1,4 +1,11 @@
-from navsim.collision import path_in_collision, point_in_collision, trajectory_in_collision
+import numpy as np
+
+from navsim.collision import (
+    path_in_collision,
+    point_in_collision,
+    points_in_collision,
+    trajectory_in_collision,
+)
 from navsim.costmap import CostMap
 from navsim.map import GridMap
 
@@ -31,3 +38,13 @@ def test_trajectory_in_collision():
     costmap = _make_costmap()
     poses = [(0.0, 0.0, 0.0), (1.0, 1.0, 0.0)]
     assert trajectory_in_collision(costmap, poses)
+
+
+def test_points_in_collision_matches_scalar_checks():
+    costmap = _make_costmap()
+    xs = np.array([1.0, 0.0, -1.0, 0.5, 1.5, 2.6, 2.4])
+    ys = np.array([1.0, 0.0, 0.0, 0.5, 1.5, 0.0, 2.4])
+    windowed = costmap.windowed((0.0, 0.0), 1.2, unknown_as_obstacle=True)
+    for active in (costmap, windowed):
+        expected = [point_in_collision(active, (x, y)) for x, y in zip(xs, ys)]
+        assert points_in_collision(active, xs, ys).tolist() == expected
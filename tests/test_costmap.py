@@ -1,5 +1,10 @@
-from navsim.costmap import CostMap
-from navsim.map import GridMap
+import math
+
+import numpy as np
+
+from navsim.collision import points_in_collision
+from navsim.costmap import CostMap, IncrementalCostMap, TiledCostMap
+from navsim.map import GridMap, TiledGridMap, warehouse_grid
 
 
 def test_inflation_marks_neighbors():
@@ -67,3 +72,105 @@ def test_windowed_unknown_as_obstacle():
     costmap = CostMap.from_grid(grid, 0.0)
     windowed = costmap.windowed((1.0, 1.0), radius=0.5, unknown_as_obstacle=True)
     assert windowed.is_occupied((0, 0))
+
+
+def test_inflation_matches_disk_footprint():
+    grid = GridMap(
+        [
+            [0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 1, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0],
+        ]
+    )
+    costmap = CostMap.from_grid(grid, 2.0)
+    assert costmap.is_occupied((3, 1))
+    assert costmap.is_occupied((4, 4))
+    assert not costmap.is_occupied((5, 5))
+    costmap = CostMap.from_grid(grid, 2 ** 0.5)
+    assert costmap.is_occupied((4, 4))
+    assert not costmap.is_occupied((3, 1))
+
+
+def test_distance_field_tracks_nearest_obstacle():
+    grid = GridMap(
+        [
+            [0, 0, 0, 0],
+            [0, 0, 0, 0],
+            [0, 0, 0, 1],
+        ]
+    )
+    costmap = CostMap.from_grid(grid, 0.0, occupied=[(0, 0)])
+    assert costmap.distance[2, 3] == 0.0
+    assert costmap.distance[0, 0] == 0.0
+    assert abs(costmap.distance[1, 2] - 2 ** 0.5) < 1e-9
+    assert costmap.distance[0, 2] == 2.0
+
+
+def test_incremental_costmap_matches_full_rebuild():
+    grid = GridMap(
+        [
+            [0, 0, 0, 0, 0],
+            [0, 1, 0, 0, 0],
+            [0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0],
+        ]
+    )
+    layered = IncrementalCostMap(grid, 1.0)
+    for cells in ([(3, 3)], [(3, 4), (0, 4)], [(1, 2)], []):
+        incremental = layered.update(cells)
+        full = CostMap.from_grid(grid, 1.0, occupied=cells)
+        assert np.array_equal(incremental.inflated, full.inflated)
+        assert np.array_equal(incremental.occupancy, full.occupancy)
+        assert np.array_equal(incremental.clearance, full.clearance)
+    assert np.array_equal(layered.update([]).inflated, layered.static.inflated)
+
+
+def test_incremental_costmap_reports_changed_cells():
+    grid = GridMap([[0] * 4 for _ in range(4)])
+    layered = IncrementalCostMap(grid, 0.0)
+    layered.update([(1, 1)])
+    assert layered.changed == [(1, 1)]
+    layered.update([(1, 1), (2, 2)])
+    assert layered.changed == [(2, 2)]
+    layered.update([(2, 2), (1, 1)])
+    assert layered.changed == []
+    layered.update([])
+    assert sorted(layered.changed) == [(1, 1), (2, 2)]
+
+
+def test_windowed_view_crops_region():
+    grid = GridMap([[0] * 10 for _ in range(10)])
+    costmap = CostMap.from_grid(grid, 0.0, occupied=[(1, 1), (8, 8)])
+    windowed = costmap.windowed((1.0, 1.0), radius=1.5)
+    x0, y0, cells = windowed.region()
+    assert (x0, y0) == (0, 0)
+    assert cells.shape == (5, 5)
+    assert cells[1, 1] == 1
+    assert not windowed.is_occupied((8, 8))
+    assert np.array_equal(windowed.inflated[:5, :5], cells)
+
+
+def test_clearance_field_matches_inflated_cells():
+    grid = GridMap([[0] * 6 for _ in range(5)])
+    costmap = CostMap.from_grid(grid, 1.0, occupied=[(4, 2)])
+    xs = np.array([0.0, 1.0, 2.0, 2.5])
+    ys = np.array([2.0, 2.0, 0.0, 2.0])
+    assert costmap.clearance_at(xs, ys).tolist() == [3.0, 2.0, math.sqrt(5.0), 0.5]
+    windowed = costmap.windowed((1.0, 2.0), radius=2.0)
+    assert windowed.clearance_at(xs[:2], ys[:2]).tolist() == [3.0, 2.0]
+    assert math.isinf(costmap.windowed((0.0, 0.0), radius=1.0).clearance_at(xs, ys)[0])
+
+
+def test_tiled_inflation_matches_full_map_across_tile_borders():
+    grid = warehouse_grid(50, 37)
+    costmap = CostMap.from_grid(grid, 1.5)
+    tiled = TiledCostMap.from_grid(TiledGridMap.from_grid(grid, tile_size=8, max_tiles=4), 1.5)
+    assert np.array_equal(tiled.inflated_map().region(0, 0, 50, 37), costmap.inflated)
+    xs = np.array([-1.0, 2.4, 7.6, 8.2, 49.0])
+    ys = np.array([3.0, 2.6, 12.0, 3.9, 36.2])
+    assert np.array_equal(points_in_collision(tiled, xs, ys), points_in_collision(costmap, xs, ys))
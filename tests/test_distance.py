@@ -0,0 +1,65 @@
+import math
+
+import numpy as np
+
+from navsim.distance import (
+    IncrementalDistance,
+    distance_transform,
+    sample_bilinear,
+    squared_distance_transform,
+)
+
+
+def _brute_force(grid):
+    ys, xs = np.nonzero(grid)
+    out = np.full(grid.shape, np.inf)
+    for y in range(grid.shape[0]):
+        for x in range(grid.shape[1]):
+            for oy, ox in zip(ys, xs):
+                out[y, x] = min(out[y, x], (x - ox) ** 2 + (y - oy) ** 2)
+    return out
+
+
+def test_squared_distance_transform_is_exact():
+    rng = np.random.default_rng(3)
+    for _ in range(20):
+        grid = (rng.random((9, 13)) < 0.1).astype(np.uint8)
+        assert np.array_equal(squared_distance_transform(grid), _brute_force(grid))
+
+
+def test_bounded_transform_clips_far_cells():
+    grid = np.zeros((1, 6), dtype=np.uint8)
+    grid[0, 0] = 1
+    dist = distance_transform(grid, max_distance=2.5)
+    assert list(dist[0, :3]) == [0.0, 1.0, 2.0]
+    assert all(math.isinf(d) for d in dist[0, 3:])
+
+
+def test_empty_grid_is_infinitely_far():
+    grid = np.zeros((2, 3), dtype=np.uint8)
+    assert np.isinf(distance_transform(grid)).all()
+
+
+def test_sample_bilinear_interpolates_and_clamps():
+    field = np.array([[0.0, 1.0], [2.0, np.inf]])
+    xs = np.array([0.0, 0.5, 0.0, -3.0, 1.0])
+    ys = np.array([0.0, 0.0, 0.5, 0.0, 0.0])
+    assert sample_bilinear(field, xs, ys).tolist() == [0.0, 0.5, 1.0, 3.0, 1.0]
+    assert math.isinf(sample_bilinear(field, np.array([0.5]), np.array([0.5]))[0])
+
+
+def test_incremental_distance_matches_full_transform():
+    rng = np.random.default_rng(0)
+    grid = (rng.random((30, 40)) < 0.05).astype(np.uint8)
+    field = IncrementalDistance(grid)
+    for _ in range(50):
+        cells = {(int(rng.integers(40)), int(rng.integers(30))) for _ in range(3)}
+        for x, y in cells:
+            grid[y, x] ^= 1
+        assert np.array_equal(field.update(cells), distance_transform(grid))
+    # Clearing every obstacle and adding one back both pass through the empty field.
+    cells = [(int(x), int(y)) for y, x in np.argwhere(grid)]
+    grid[:] = 0
+    assert np.isinf(field.update(cells)).all()
+    grid[5, 7] = 1
+    assert np.array_equal(field.update([(7, 5)]), distance_transform(grid))
@@ -0,0 +1,58 @@
+import numpy as np
+
+from navsim.dstar import DStarLite
+from navsim.map import GridMap, demo_grid
+from navsim.planner import astar
+
+
+def test_dstar_lite_matches_astar_cost():
+    grid = demo_grid()
+    planner = DStarLite(grid, (9, 9))
+    result = planner.plan((0, 0))
+    expected = astar(grid, (0, 0), (9, 9))
+    assert result is not None
+    assert expected is not None
+    assert result.cost == expected.cost
+    assert result.path[0] == (0, 0)
+    assert result.path[-1] == (9, 9)
+
+
+def test_dstar_lite_repairs_after_changes():
+    cells = np.zeros((5, 5), dtype=np.uint8)
+    grid = GridMap(cells)
+    planner = DStarLite(grid, (4, 0))
+    first = planner.plan((0, 0))
+    assert first is not None
+    assert first.cost == 4.0
+
+    cells[0:4, 2] = 1
+    planner.mark_changed([(2, y) for y in range(4)])
+    blocked = planner.plan((1, 0))
+    assert blocked is not None
+    assert blocked.cost == 11.0
+    assert all(grid.is_free(cell) for cell in blocked.path)
+
+    cells[4, 2] = 1
+    planner.mark_changed([(2, 4)])
+    assert planner.plan((1, 0)) is None
+
+
+def test_dstar_lite_counts_only_real_expansions():
+    class CountingDict(dict):
+        writes = 0
+
+        def __setitem__(self, key, value):
+            CountingDict.writes += 1
+            super().__setitem__(key, value)
+
+    cells = np.zeros((8, 8), dtype=np.uint8)
+    grid = GridMap(cells)
+    planner = DStarLite(grid, (7, 0))
+    assert planner.plan((0, 0)) is not None
+    # Every expansion sets g exactly once; requeueing an outdated key does not.
+    planner.g = CountingDict(planner.g)
+    cells[0:7, 4] = 1
+    planner.mark_changed([(4, y) for y in range(7)])
+    result = planner.plan((2, 1))
+    assert result is not None
+    assert result.expansions == CountingDict.writes > 0
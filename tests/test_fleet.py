@@ -0,0 +1,81 @@
+import math
+import sys
+
+from navsim.costmap import CostMap
+from navsim.fleet import Fleet, FleetParams, SpatialHash, main, plan_requests
+from navsim.hpa import default_cache
+from navsim.map import GridMap, demo_grid
+from navsim.planner import plan_path
+from navsim.sim import SimParams
+
+
+def test_spatial_hash_near_matches_scan():
+    points = {i: (0.7 * i % 9.0, 1.3 * i % 7.0) for i in range(40)}
+    index = SpatialHash(cell_size=2.0)
+    for item, point in points.items():
+        index.move(item, point)
+    index.move(3, (8.5, 6.5))
+    points[3] = (8.5, 6.5)
+    index.remove(5)
+    del points[5]
+    for center in ((0.0, 0.0), (4.2, 3.1), (8.0, 6.0)):
+        expected = sorted(
+            item
+            for item, (x, y) in points.items()
+            if math.hypot(x - center[0], y - center[1]) <= 2.5
+        )
+        assert index.near(center, 2.5) == expected
+    assert len(index) == 39
+
+
+def test_plan_requests_share_goal_fields():
+    grid = demo_grid()
+    requests = [((0, 0), (9, 9)), ((9, 0), (9, 9)), ((0, 9), (4, 4))]
+    plans = plan_requests(grid, requests, "astar", min_shared=2)
+    for (start, goal), plan in zip(requests, plans):
+        expected = plan_path(grid, start, goal, "astar")
+        assert plan is not None and expected is not None
+        assert plan.cost == expected.cost
+        assert plan.path[0] == start and plan.path[-1] == goal
+
+
+def test_fleet_robots_pass_head_on_without_overlap():
+    costmap = CostMap.from_grid(GridMap([[0] * 12 for _ in range(3)]), 0.0)
+    starts = [(0.0, 1.0, 0.0), (11.0, 1.0, math.pi)]
+    fleet = Fleet(costmap, starts, [(11, 1), (0, 1)], sim_params=SimParams(max_steps=600))
+    clearance = 2.0 * fleet.params.robot_radius
+    while fleet.tick < 600 and fleet.step():
+        if fleet.active == 2:
+            (ax, ay, _), (bx, by, _) = fleet.poses
+            assert math.hypot(ax - bx, ay - by) >= clearance
+    report = fleet.run()
+    assert report.completed == 2
+    assert sum(row["replans"] for row in report.rows()) > 0
+    assert report.summary()["robot_steps_per_second"] > 0.0
+
+
+
+def test_detours_leave_shared_planner_caches_alone():
+    costmap = CostMap.from_grid(GridMap([[0] * 12 for _ in range(3)]), 0.0)
+    starts = [(0.0, 1.0, 0.0), (11.0, 1.0, math.pi)]
+    default_cache.invalidate()
+    fleet = Fleet(
+        costmap,
+        starts,
+        [(11, 1), (0, 1)],
+        FleetParams(global_planner="hpa"),
+        SimParams(max_steps=600),
+    )
+    report = fleet.run()
+    assert report.completed == 2
+    assert sum(row["replans"] for row in report.rows()) > 0
+    # Only the shared costmap's abstraction, none for the throwaway windows.
+    assert len(default_cache) == 1
+
+
+def test_empty_fleet_writes_header_only(tmp_path, monkeypatch):
+    path = tmp_path / "fleet.csv"
+    monkeypatch.setattr(sys, "argv", ["navsim-fleet", "--robots", "0", "--csv", str(path)])
+    main()
+    lines = path.read_text().splitlines()
+    assert len(lines) == 1 and lines[0].startswith("robot,completed")
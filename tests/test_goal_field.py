@@ -0,0 +1,89 @@
+import math
+
+from navsim.collision import path_in_collision
+from navsim.costmap import IncrementalCostMap
+from navsim.dynamic import DynamicObstacle, DynamicObstacleField
+from navsim.goal_field import GoalFieldCache, default_cache, goal_field
+from navsim.local_planner import DWAParams
+from navsim.map import demo_grid
+from navsim.planner import astar, plan_path
+from navsim.sim import DWAController, DynamicWorld, SimParams, Simulator
+
+
+def test_goal_field_paths_match_astar_cost():
+    grid = demo_grid()
+    field = goal_field(grid, (9, 9))
+    for start in [(0, 0), (9, 0), (4, 4)]:
+        expected = astar(grid, start, (9, 9))
+        result = field.extract(start)
+        assert expected is not None
+        assert result is not None
+        assert result.cost == expected.cost
+        assert result.path[0] == start
+        assert result.path[-1] == (9, 9)
+        assert len(result.path) == int(result.cost) + 1
+
+
+def test_goal_field_marks_obstacles_unreachable():
+    grid = demo_grid()
+    field = goal_field(grid, (9, 9))
+    assert math.isinf(field.cost_to_go((1, 1)))
+    assert field.extract((1, 1)) is None
+
+
+def test_goal_field_cache_hits_and_evicts():
+    grid = demo_grid()
+    cache = GoalFieldCache(max_entries=2)
+    cache.plan(grid, (0, 0), (9, 9))
+    cache.plan(grid, (4, 4), (9, 9))
+    assert (cache.hits, cache.misses) == (1, 1)
+    cache.get(grid, (0, 9))
+    cache.get(grid, (9, 0))
+    assert len(cache) == 2
+    cache.get(grid, (9, 9))
+    assert cache.misses == 4
+
+
+def test_goal_field_heuristic_is_exact():
+    grid = demo_grid()
+    field = goal_field(grid, (9, 9))
+    result = astar(grid, (0, 0), (9, 9), heuristic=field.heuristic)
+    assert result is not None
+    assert result.cost == field.cost_to_go((0, 0))
+
+
+def test_goal_field_cache_sees_incremental_costmap_updates():
+    grid = demo_grid()
+    layered = IncrementalCostMap(grid, 0.0)
+    cache = GoalFieldCache()
+    first = cache.plan(layered.update([]).inflated_map(), (0, 0), (9, 9))
+    blocked = layered.update([(4, 0), (4, 1), (4, 2)]).inflated_map()
+    result = cache.plan(blocked, (0, 0), (9, 9))
+    expected = astar(blocked, (0, 0), (9, 9))
+    assert first is not None and result is not None and expected is not None
+    assert result.cost == expected.cost
+    assert (4, 0) in first.path and (4, 0) not in result.path
+    assert all(blocked.is_free(node) for node in result.path)
+
+
+def test_dynamic_replans_with_goal_field_avoid_current_obstacles():
+    class CheckedWorld(DynamicWorld):
+        def update(self, sim: Simulator) -> bool:
+            replans = self.replans
+            running = super().update(sim)
+            if self.replans > replans:
+                assert sim.costmap is not None
+                assert not path_in_collision(sim.costmap, sim.path)
+            return running
+
+    grid = demo_grid()
+    obstacles = [DynamicObstacle(2.0, 7.0, 0.6, 0.0), DynamicObstacle(7.0, 2.0, 0.0, 0.6)]
+    default_cache.invalidate()
+    world = CheckedWorld(grid, 0.0, DynamicObstacleField(obstacles), (9, 9), 1, 50, "goal_field")
+    plan = plan_path(grid, (0, 0), (9, 9))
+    assert plan is not None
+    path = [(float(x), float(y)) for x, y in plan.path]
+    Simulator(
+        path, (0.0, 0.0, 0.0), SimParams(), DWAController(DWAParams()), goal=(9.0, 9.0), world=world
+    ).run()
+    assert world.replans == 50
@@ -0,0 +1,80 @@
+from navsim.costmap import IncrementalCostMap
+from navsim.hpa import ClusterGraph, ClusterGraphCache
+from navsim.map import GridMap, demo_grid, warehouse_grid
+from navsim.planner import astar, plan_path
+
+
+def test_hpa_paths_are_valid_and_near_optimal():
+    grid = demo_grid()
+    graph = ClusterGraph(grid, cluster_size=3)
+    free = [(x, y) for x in range(10) for y in range(10) if grid.is_free((x, y))]
+    total = optimal = 0.0
+    for start in free[::3]:
+        for goal in free[::2]:
+            expected = astar(grid, start, goal)
+            result = graph.plan(start, goal)
+            assert (result is None) == (expected is None)
+            if result is None or expected is None:
+                continue
+            assert result.path[0] == start
+            assert result.path[-1] == goal
+            assert len(result.path) == int(result.cost) + 1
+            for (x0, y0), (x1, y1) in zip(result.path, result.path[1:]):
+                assert abs(x1 - x0) + abs(y1 - y0) == 1
+                assert grid.is_free((x1, y1))
+            assert result.cost >= expected.cost
+            total += result.cost
+            optimal += expected.cost
+    assert total <= 1.1 * optimal
+
+
+def test_hpa_rebuilds_only_touched_clusters():
+    grid = GridMap(warehouse_grid(64, 64).grid.copy())
+    graph = ClusterGraph(grid, cluster_size=8)
+    built = graph.rebuilds
+    # Close an aisle crossing inside one cluster, next to its right border.
+    grid.grid[20:23, 23] = 1
+    graph.mark_changed([(23, y) for y in range(20, 23)])
+    assert graph.plan((1, 1), (62, 62)) is not None
+    assert 1 <= graph.rebuilds - built <= 2
+
+    fresh = ClusterGraph(grid, cluster_size=8)
+    assert graph._borders == fresh._borders
+    assert graph._edges == fresh._edges
+    result = graph.plan((20, 21), (30, 21))
+    expected = fresh.plan((20, 21), (30, 21))
+    assert result is not None and expected is not None
+    assert result.cost == expected.cost
+    assert all(grid.is_free(node) for node in result.path)
+
+
+def test_plan_path_hpa_uses_cached_abstraction():
+    grid = demo_grid()
+    cache = ClusterGraphCache(cluster_size=4)
+    first = cache.plan(grid, (0, 0), (9, 9))
+    second = cache.plan(grid, (9, 0), (0, 9))
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert first is not None and second is not None
+    assert plan_path(grid, (0, 0), (9, 9), "hpa") is not None
+
+
+def test_cluster_graph_cache_sees_incremental_costmap_updates():
+    grid = demo_grid()
+    layered = IncrementalCostMap(grid, 0.0)
+    cache = ClusterGraphCache(cluster_size=4)
+    first = cache.plan(layered.update([]).inflated_map(), (0, 0), (9, 0))
+    blocked = layered.update([(4, 0)]).inflated_map()
+    result = cache.plan(blocked, (0, 0), (9, 0))
+    assert first is not None and result is not None
+    assert (4, 0) in first.path and (4, 0) not in result.path
+    assert all(blocked.is_free(node) for node in result.path)
+    assert cache.misses == 2
+
+
+def test_hpa_refinement_gives_up_on_unreported_changes():
+    grid = GridMap([[0] * 12 for _ in range(4)])
+    graph = ClusterGraph(grid, cluster_size=4)
+    # Wall off the middle cluster without mark_changed(): its edges are stale
+    # and refining them must fail instead of spinning.
+    grid.grid[:, 5] = 1
+    assert graph.plan((0, 1), (11, 1)) is None
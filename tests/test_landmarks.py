@@ -0,0 +1,81 @@
+import numpy as np
+
+from navsim.costmap import CostMap
+from navsim.goal_field import goal_field
+from navsim.landmarks import LandmarkCache, load_landmarks, select_landmarks
+from navsim.map import GridMap, demo_grid, load_map, save_map, warehouse_grid
+from navsim.planner import astar_flat, plan_path
+
+
+def test_landmark_heuristic_is_admissible_and_consistent():
+    grid = demo_grid()
+    landmarks = select_landmarks(grid, 4)
+    assert len(landmarks.nodes) == 4 and len(set(landmarks.nodes)) == 4
+    free = [(x, y) for x in range(10) for y in range(10) if grid.is_free((x, y))]
+    for goal in free[::3]:
+        exact = goal_field(grid, goal)
+        for node in free:
+            h = landmarks.heuristic(node, goal)
+            assert h <= exact.cost_to_go(node)
+            for nxt in grid.neighbors(node):
+                assert h <= landmarks.heuristic(nxt, goal) + 1.0
+
+
+def test_alt_matches_astar_with_fewer_expansions():
+    cells = warehouse_grid(120, 90).grid.copy()
+    cells[:, 40] = 1
+    cells[85:, 40] = 0
+    cells[:, 80] = 1
+    cells[:4, 80] = 0
+    grid = GridMap(cells)
+    landmarks = select_landmarks(grid)
+    pairs = [((1, 1), (118, 1)), ((30, 10), (60, 10)), ((119, 89), (2, 45)), ((60, 60), (118, 80))]
+    baseline = alt = 0
+    for start, goal in pairs:
+        expected = astar_flat(grid, start, goal)
+        result = landmarks.plan(start, goal)
+        assert expected is not None and result is not None
+        assert result.cost == expected.cost
+        assert result.expansions <= expected.expansions
+        baseline += expected.expansions
+        alt += result.expansions
+    assert alt < 0.6 * baseline
+    # An unreachable goal in a walled-off pocket is pruned at once.
+    cells[10:13, 10:13] = 1
+    cells[11, 11] = 0
+    walled = select_landmarks(GridMap(cells))
+    assert walled.heuristic((1, 1), (11, 11)) == np.inf
+
+
+def test_landmarks_are_saved_next_to_map_file(tmp_path):
+    path = tmp_path / "warehouse.map"
+    save_map(warehouse_grid(50, 40), path)
+    cache = LandmarkCache(count=4)
+    first = cache.get(load_map(path))
+    assert (tmp_path / "warehouse.map.alt4.npz").exists()
+
+    fresh = LandmarkCache(count=4)
+    grid = load_map(path)
+    again = fresh.get(grid)
+    assert (fresh.disk_hits, fresh.misses) == (1, 0)
+    assert again.nodes == first.nodes
+    assert np.array_equal(again.distances, first.distances)
+    assert fresh.get(GridMap(grid.grid.copy())).nodes == first.nodes and fresh.hits == 2
+
+    other = warehouse_grid(50, 40).grid.copy()
+    other[0, 0] = 1
+    assert load_landmarks(tmp_path / "warehouse.map.alt4.npz", GridMap(other)) is None
+    assert plan_path(grid, (1, 1), (48, 38), "alt") is not None
+
+
+def test_landmarks_for_inflated_map_file_are_saved_per_radius(tmp_path):
+    path = tmp_path / "warehouse.map"
+    save_map(warehouse_grid(50, 40), path)
+    LandmarkCache(count=4).get(CostMap.from_grid(load_map(path), 1.0).inflated_map())
+    assert (tmp_path / "warehouse.map.r1.alt4.npz").exists()
+    fresh = LandmarkCache(count=4)
+    fresh.get(CostMap.from_grid(load_map(path), 1.0).inflated_map())
+    assert (fresh.disk_hits, fresh.misses) == (1, 0)
+    # A radius of zero leaves the cells unchanged and shares the map's file.
+    LandmarkCache(count=4).get(CostMap.from_grid(load_map(path), 0.0).inflated_map())
+    assert (tmp_path / "warehouse.map.alt4.npz").exists()
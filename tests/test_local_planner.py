@@ -1,3 +1,4 @@
+from navsim.collision import trajectory_in_collision
 from navsim.costmap import CostMap
 from navsim.local_planner import DWAParams, dwa_control
 from navsim.map import GridMap
@@ -47,3 +48,21 @@ def test_dwa_returns_stop_when_blocked():
     assert v == 0.0
     assert omega == 0.0
     assert len(traj) == 1
+
+
+def test_dwa_trajectory_avoids_obstacles():
+    grid = GridMap(
+        [
+            [0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0],
+            [0, 0, 1, 0, 0],
+            [0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0],
+        ]
+    )
+    costmap = CostMap.from_grid(grid, 0.0)
+    path = [(0.0, 2.0), (4.0, 2.0)]
+    v, omega, traj = dwa_control((0.0, 2.0, 0.0), path, costmap, DWAParams(horizon=2.5), dt=0.1)
+    assert v > 0.0
+    assert traj[0] == (0.0, 2.0, 0.0)
+    assert not trajectory_in_collision(costmap, traj)
@@ -0,0 +1,141 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from navsim.costmap import CostMap
+from navsim.map import (
+    GridMap,
+    TiledGridMap,
+    load_map,
+    load_tiled_map,
+    save_map,
+    warehouse_grid,
+)
+
+
+def test_list_grid_is_stored_as_uint8_array():
+    grid = GridMap(
+        [
+            [0, 1],
+            [0, 0],
+        ]
+    )
+    assert isinstance(grid.grid, np.ndarray)
+    assert grid.grid.dtype == np.uint8
+    assert not grid.is_free((1, 0))
+    assert grid.is_free((0, 1))
+    assert list(grid.neighbors((0, 0))) == [(0, 1)]
+
+
+def test_array_grid_is_not_copied():
+    array = np.zeros((3, 4), dtype=np.uint8)
+    grid = GridMap(array)
+    assert grid.grid is array
+    assert (grid.width, grid.height) == (4, 3)
+    costmap = CostMap.from_grid(grid, 0.0)
+    assert costmap.inflated_map().grid is costmap.inflated
+
+
+def test_uint8_grid_with_other_nonzero_values_is_normalized():
+    array = np.array([[0, 255], [0, 1]], dtype=np.uint8)
+    grid = GridMap(array)
+    assert grid.grid.tolist() == [[0, 1], [0, 1]]
+    costmap = CostMap.from_grid(GridMap(array), 0.0)
+    for cell in [(0, 0), (1, 0), (0, 1), (1, 1)]:
+        assert costmap.is_occupied(cell) == (not grid.is_free(cell))
+
+
+def test_loaded_raw_map_stays_memory_mapped(tmp_path):
+    path = tmp_path / "odd.map"
+    save_map(warehouse_grid(20, 10), path)
+    with path.open("r+b") as handle:
+        handle.seek(-1, 2)
+        handle.write(bytes([2]))
+    grid = load_map(path)
+    assert isinstance(grid.grid.base, np.memmap)
+    assert not grid.is_free((19, 9))
+    costmap = CostMap.from_grid(grid, 0.0)
+    assert costmap.inflated is grid.grid and costmap.is_occupied((19, 9))
+
+
+def test_warehouse_grid_keeps_perimeter_free():
+    grid = warehouse_grid(40, 30)
+    assert grid.grid.any()
+    assert not grid.grid[:3].any() and not grid.grid[:, :3].any()
+
+
+def test_map_file_round_trip(tmp_path):
+    grid = warehouse_grid(37, 21)
+    for packed in (False, True):
+        path = tmp_path / f"map_{packed}.bin"
+        save_map(grid, path, packed=packed)
+        loaded = load_map(path)
+        assert loaded.grid.dtype == np.uint8
+        assert np.array_equal(loaded.grid, grid.grid)
+        assert loaded.is_free((0, 0))
+
+
+def test_raw_map_is_memory_mapped_and_pickles_by_path(tmp_path):
+    grid = warehouse_grid(64, 64)
+    path = tmp_path / "warehouse.map"
+    save_map(grid, path)
+    loaded = load_map(path)
+    assert isinstance(loaded.grid.base, np.memmap)
+    assert not loaded.grid.flags.writeable
+    payload = pickle.dumps(CostMap.from_grid(loaded, 0.0))
+    assert len(payload) < loaded.grid.size
+    restored = pickle.loads(payload)
+    assert np.array_equal(restored.inflated, grid.grid)
+    assert isinstance(restored.base.grid.base, np.memmap)
+
+
+def test_load_map_rejects_other_files(tmp_path):
+    path = tmp_path / "bad.map"
+    path.write_bytes(b"not a map at all, but long enough for a header")
+    with pytest.raises(ValueError):
+        load_map(path)
+
+
+@pytest.mark.parametrize("packed", [False, True])
+def test_tiled_map_reads_tiles_on_demand(tmp_path, packed):
+    grid = warehouse_grid(70, 45)
+    path = tmp_path / "warehouse.map"
+    save_map(grid, path, packed=packed)
+    tiled = load_tiled_map(path, tile_size=16, max_tiles=3)
+    assert (tiled.width, tiled.height) == (70, 45)
+    assert tiled.loads == 0
+    assert np.array_equal(tiled.region(0, 0, 70, 45), grid.grid)
+    assert np.array_equal(tiled.region(11, 5, 60, 40), grid.grid[5:40, 11:60])
+    assert len(tiled._tiles) == 3 and tiled.evictions == tiled.loads - 3
+    for node in [(0, 0), (3, 3), (69, 44), (33, 17)]:
+        assert tiled.is_free(node) == grid.is_free(node)
+    assert list(tiled.neighbors((2, 2))) == list(grid.neighbors((2, 2)))
+
+    copy = pickle.loads(pickle.dumps(tiled))
+    assert copy.loads == 0
+    assert np.array_equal(copy.region(0, 0, 70, 45), grid.grid)
+
+
+def test_tiled_map_cells_gathers_across_tiles():
+    grid = warehouse_grid(40, 40)
+    tiled = TiledGridMap.from_grid(grid, tile_size=8, max_tiles=2)
+    xs = np.array([0, 3, 39, 12, 25], dtype=np.int64)
+    ys = np.array([0, 3, 39, 30, 4], dtype=np.int64)
+    assert np.array_equal(tiled.cells(xs, ys), grid.grid[ys, xs])
+
+
+def test_pyramid_levels_are_conservative_max_pools():
+    grid = warehouse_grid(37, 21)
+    assert grid.levels == 6
+    assert grid.level(0) is grid
+    level2 = grid.level(2)
+    assert level2 is grid.level(2)
+    assert level2.grid.shape == (6, 10)
+    for y in range(6):
+        for x in range(10):
+            block = grid.grid[y * 4 : y * 4 + 4, x * 4 : x * 4 + 4]
+            assert level2.grid[y, x] == block.max()
+    assert grid.level(grid.levels).grid.shape == (1, 1)
+    with pytest.raises(ValueError):
+        grid.level(grid.levels + 1)
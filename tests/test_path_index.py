@@ -0,0 +1,41 @@
+import math
+
+import numpy as np
+
+from navsim.path_index import PathIndex
+
+
+def _random_walk(rng, length):
+    steps = rng.choice([(1.0, 0.0), (-1.0, 0.0), (0.0, 1.0), (0.0, -1.0)], size=length)
+    return [tuple(p) for p in np.cumsum(steps, axis=0).tolist()]
+
+
+def test_distance_matches_linear_scan():
+    rng = np.random.default_rng(5)
+    for _ in range(10):
+        path = _random_walk(rng, 300)
+        index = PathIndex(path, bucket_size=1.5)
+        xs = rng.uniform(-30.0, 30.0, size=40)
+        ys = rng.uniform(-30.0, 30.0, size=40)
+        points = np.asarray(path)
+        expected = np.hypot(xs[:, None] - points[:, 0], ys[:, None] - points[:, 1]).min(axis=1)
+        assert np.array_equal(index.distance(xs, ys), expected)
+
+
+def test_lookahead_index_matches_linear_scan():
+    rng = np.random.default_rng(9)
+    path = _random_walk(rng, 200)
+    index = PathIndex(path)
+    for start in range(0, 210, 7):
+        point = (float(rng.uniform(-10, 10)), float(rng.uniform(-10, 10)))
+        expected = len(path) - 1
+        for i in range(start, len(path)):
+            if math.hypot(path[i][0] - point[0], path[i][1] - point[1]) >= 2.5:
+                expected = i
+                break
+        assert index.lookahead_index(point, 2.5, start) == expected
+
+
+def test_empty_path_is_infinitely_far():
+    index = PathIndex([])
+    assert math.isinf(index.distance(np.array([0.0]), np.array([0.0]))[0])
@@ -0,0 +1,49 @@
+import pickle
+
+from navsim.costmap import CostMap, IncrementalCostMap
+from navsim.map import GridMap, demo_grid, occupancy_fingerprint, warehouse_grid
+from navsim.plan_cache import PlanCache
+from navsim.planner import plan_path
+
+
+def test_plan_cache_hits_on_same_occupancy():
+    cache = PlanCache(max_entries=2)
+    first = plan_path(demo_grid(), (0, 0), (9, 9), "astar", cache=cache)
+    # A different GridMap with the same cells shares the entry.
+    second = plan_path(demo_grid(), (0, 0), (9, 9), "ASTAR", cache=cache)
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert first is not None and second is not None
+    assert second.path == first.path and second.path is not first.path
+    second.path.clear()
+    third = plan_path(demo_grid(), (0, 0), (9, 9), "astar", cache=cache)
+    assert third is not None and third.path == first.path
+
+    assert plan_path(demo_grid(), (0, 0), (1, 1), "astar", cache=cache) is None
+    assert plan_path(demo_grid(), (0, 0), (1, 1), "astar", cache=cache) is None
+    plan_path(demo_grid(), (0, 0), (9, 0), "astar", cache=cache)
+    assert len(cache) == 2 and cache.misses == 3
+
+    changed = demo_grid().grid.copy()
+    changed[0, 5] = 1
+    rerouted = plan_path(GridMap(changed), (0, 0), (9, 9), "astar", cache=cache)
+    assert rerouted is not None and cache.misses == 4
+
+
+def test_incremental_costmap_tracks_fingerprint():
+    layered = IncrementalCostMap(warehouse_grid(40, 30), 1.0)
+    for cells in [[(1, 1), (20, 2)], [(20, 2), (38, 28)], [], [(1, 1), (20, 2)]]:
+        costmap = layered.update(cells)
+        assert costmap.inflated_map().fingerprint == occupancy_fingerprint(costmap.inflated)
+    rebuilt = CostMap.from_grid(warehouse_grid(40, 30), 1.0)
+    assert layered.update([]).inflated_map().fingerprint == rebuilt.inflated_map().fingerprint
+
+
+def test_plan_cache_disk_tier_survives_new_cache(tmp_path):
+    cache = PlanCache(directory=tmp_path)
+    expected = plan_path(demo_grid(), (0, 0), (9, 9), "jps", cache=cache)
+    reloaded = pickle.loads(pickle.dumps(cache))
+    assert len(reloaded) == 0
+    result = plan_path(demo_grid(), (0, 0), (9, 9), "jps", cache=reloaded)
+    assert (reloaded.hits, reloaded.disk_hits, reloaded.misses) == (1, 1, 0)
+    assert expected is not None and result is not None
+    assert result.path == expected.path and result.cost == expected.cost
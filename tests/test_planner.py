@@ -1,5 +1,25 @@
-from navsim.map import demo_grid
-from navsim.planner import astar, dijkstra, plan_path, theta_star
+import math
+
+import numpy as np
+import pytest
+
+import navsim.planner as planner
+from navsim.map import GridMap, TiledGridMap, demo_grid, warehouse_grid
+from navsim.planner import (
+    PlanBudgetExhausted,
+    ara_star,
+    astar,
+    astar_flat,
+    bidirectional_astar,
+    bidirectional_dijkstra,
+    coarse_to_fine,
+    dijkstra,
+    jump_point_search,
+    lazy_theta_star,
+    line_of_sight,
+    plan_path,
+    theta_star,
+)
 
 
 def test_astar_finds_path():
@@ -48,3 +68,207 @@ def test_plan_path_dispatch():
     goal = (9, 9)
     result = plan_path(grid, start, goal, method="dijkstra")
     assert result is not None
+
+
+def test_astar_flat_matches_astar():
+    grid = demo_grid()
+    for start, goal in [((0, 0), (9, 9)), ((9, 0), (0, 9)), ((2, 2), (7, 4))]:
+        expected = astar(grid, start, goal)
+        result = astar_flat(grid, start, goal)
+        assert expected is not None
+        assert result is not None
+        assert result.path == expected.path
+        assert result.cost == expected.cost
+
+
+def test_astar_flat_unreachable_goal():
+    grid = GridMap(
+        [
+            [0, 1, 0],
+            [0, 1, 0],
+            [0, 1, 0],
+        ]
+    )
+    assert astar_flat(grid, (0, 0), (2, 2)) is None
+    assert plan_path(grid, (0, 0), (0, 2), method="astar_flat") is not None
+
+
+def test_jps_path_is_connected_and_shorter_than_astar():
+    grid = demo_grid()
+    start = (0, 0)
+    goal = (9, 9)
+    a_star = astar(grid, start, goal)
+    jps = jump_point_search(grid, start, goal)
+    assert a_star is not None
+    assert jps is not None
+    assert jps.path[0] == start
+    assert jps.path[-1] == goal
+    for (x0, y0), (x1, y1) in zip(jps.path, jps.path[1:]):
+        assert max(abs(x1 - x0), abs(y1 - y0)) == 1
+        assert grid.is_free((x1, y1))
+        assert grid.is_free((x1, y0)) and grid.is_free((x0, y1))
+    assert jps.cost <= a_star.cost + 1e-6
+
+
+def test_jps_open_grid_is_diagonal():
+    grid = GridMap([[0] * 5 for _ in range(5)])
+    result = plan_path(grid, (0, 0), (4, 2), method="jps")
+    assert result is not None
+    assert abs(result.cost - (2 + 2 * 2 ** 0.5)) < 1e-9
+    assert len(result.path) == 5
+
+
+def test_bidirectional_searches_match_astar_cost():
+    grid = demo_grid()
+    free = [(x, y) for x in range(10) for y in range(10) if grid.is_free((x, y))]
+    for start in free[::4]:
+        for goal in free[::3]:
+            expected = astar(grid, start, goal)
+            assert expected is not None
+            for search in (bidirectional_astar, bidirectional_dijkstra):
+                result = search(grid, start, goal)
+                assert result is not None
+                assert result.cost == expected.cost
+                assert result.path[0] == start
+                assert result.path[-1] == goal
+                assert len(result.path) == int(result.cost) + 1
+                for (x0, y0), (x1, y1) in zip(result.path, result.path[1:]):
+                    assert abs(x1 - x0) + abs(y1 - y0) == 1
+                    assert grid.is_free((x1, y1))
+
+
+def test_bidirectional_unreachable_goal():
+    grid = GridMap(
+        [
+            [0, 1, 0],
+            [0, 1, 0],
+            [0, 1, 0],
+        ]
+    )
+    assert plan_path(grid, (0, 0), (2, 2), method="bidirectional_astar") is None
+    assert plan_path(grid, (0, 0), (2, 2), method="bidirectional_dijkstra") is None
+    result = plan_path(grid, (0, 0), (0, 2), method="bidirectional_dijkstra")
+    assert result is not None and result.cost == 2.0
+
+
+def test_lazy_theta_matches_theta_with_fewer_line_of_sight_checks(monkeypatch):
+    grid = demo_grid()
+    calls = []
+
+    def counting(grid, a, b):
+        calls.append((a, b))
+        return line_of_sight(grid, a, b)
+
+    monkeypatch.setattr(planner, "line_of_sight", counting)
+    pairs = [((0, 0), (9, 9)), ((9, 0), (0, 9)), ((2, 2), (7, 4)), ((0, 9), (9, 3))]
+    theta_calls = lazy_calls = 0
+    for start, goal in pairs:
+        calls.clear()
+        theta = theta_star(grid, start, goal)
+        theta_calls += len(calls)
+        calls.clear()
+        lazy = plan_path(grid, start, goal, method="lazy_theta")
+        lazy_calls += len(calls)
+        assert theta is not None and lazy is not None
+        assert lazy.path[0] == start and lazy.path[-1] == goal
+        for a, b in zip(lazy.path, lazy.path[1:]):
+            assert line_of_sight(grid, a, b)
+        assert abs(lazy.cost - theta.cost) <= 0.02 * theta.cost
+    assert lazy_calls < theta_calls / 2
+
+
+def test_lazy_theta_blocked_endpoints():
+    grid = demo_grid()
+    assert lazy_theta_star(grid, (1, 1), (9, 9)) is None
+    assert lazy_theta_star(grid, (0, 0), (0, 0)) is not None
+
+
+def test_plan_results_carry_search_counters():
+    grid = demo_grid()
+    tuple_keyed = astar(grid, (0, 0), (9, 9))
+    flat = astar_flat(grid, (0, 0), (9, 9))
+    theta = theta_star(grid, (0, 0), (9, 9))
+    assert tuple_keyed is not None and flat is not None and theta is not None
+    assert tuple_keyed.expansions == flat.expansions > 0
+    assert tuple_keyed.pushes == flat.pushes
+    for result in (tuple_keyed, flat, theta):
+        assert result.expansions + result.stale_pops <= result.pushes
+        assert 0 < result.peak_open <= result.pushes
+    assert flat.los_checks == 0
+    assert theta.los_checks > 0
+
+
+def test_tiled_map_plans_match_dense_map():
+    grid = warehouse_grid(60, 48)
+    tiled = TiledGridMap.from_grid(grid, tile_size=8, max_tiles=4)
+    pairs = [((1, 1), (58, 46)), ((2, 45), (57, 2)), ((20, 2), (22, 2))]
+    for method in ["astar", "astar_flat", "bidirectional_astar", "goal_field", "jps", "theta"]:
+        for start, goal in pairs:
+            expected = plan_path(grid, start, goal, method)
+            result = plan_path(tiled, start, goal, method)
+            assert expected is not None and result is not None
+            assert math.isclose(result.cost, expected.cost)
+            assert result.path[0] == start and result.path[-1] == goal
+            assert all(tiled.is_free(node) for node in result.path)
+    assert len(tiled._tiles) <= 4
+    # Past max_window_cells the 4-connected dense planners fall back to A* on
+    # the tiles, which keeps their optimal cost; 8-connected jps has no fallback.
+    for method in ["astar_flat", "bidirectional_astar", "goal_field"]:
+        result = plan_path(tiled, (1, 1), (58, 46), method, max_window_cells=100)
+        assert result is not None and result.cost == 102.0
+    with pytest.raises(ValueError):
+        plan_path(tiled, (1, 1), (58, 46), "jps", max_window_cells=100)
+
+
+def test_coarse_to_fine_refines_inside_corridor():
+    grid = warehouse_grid(200, 160)
+    start, goal = (1, 1), (197, 158)
+    expected = astar_flat(grid, start, goal)
+    result = coarse_to_fine(grid, start, goal)
+    assert expected is not None and result is not None
+    assert result.path[0] == start and result.path[-1] == goal
+    assert len(result.path) == int(result.cost) + 1
+    for (x0, y0), (x1, y1) in zip(result.path, result.path[1:]):
+        assert abs(x1 - x0) + abs(y1 - y0) == 1
+        assert grid.is_free((x1, y1))
+    assert expected.cost <= result.cost <= 1.05 * expected.cost
+    assert result.expansions < expected.expansions / 2
+    assert plan_path(grid, start, goal, "coarse_to_fine") is not None
+
+
+def test_coarse_to_fine_falls_back_when_passages_vanish():
+    # A single-cell gap disappears at every coarse level.
+    cells = np.zeros((32, 32), dtype=np.uint8)
+    cells[:, 16] = 1
+    cells[5, 16] = 0
+    grid = GridMap(cells)
+    result = coarse_to_fine(grid, (0, 31), (31, 31), level=3)
+    expected = astar_flat(grid, (0, 31), (31, 31))
+    assert result is not None and expected is not None
+    assert result.cost == expected.cost
+    assert coarse_to_fine(GridMap(np.ones((4, 4), dtype=np.uint8)), (0, 0), (3, 3)) is None
+
+
+def test_ara_star_improves_until_budget_runs_out():
+    rng = np.random.default_rng(0)
+    cells = (rng.random((120, 120)) < 0.3).astype(np.uint8)
+    cells[0, 0] = cells[119, 119] = 0
+    grid = GridMap(cells)
+    start, goal = (0, 0), (119, 119)
+    optimal = astar_flat(grid, start, goal)
+    final = ara_star(grid, start, goal)
+    assert optimal is not None and final is not None
+    assert final.cost == optimal.cost and final.suboptimality == 1.0
+    partial = ara_star(grid, start, goal, max_expansions=final.expansions - 1)
+    assert partial is not None and 1.0 <= partial.suboptimality <= 2.5
+    assert optimal.cost < partial.cost <= partial.suboptimality * optimal.cost
+    # Out of budget before the first pass: no path yet, which is not "no path".
+    with pytest.raises(PlanBudgetExhausted):
+        plan_path(grid, start, goal, "ara", max_expansions=0)
+    trivial = ara_star(grid, start, start)
+    assert trivial is not None and trivial.path == [start] and trivial.peak_open == 1
+    walled = cells.copy()
+    walled[:, 60] = 1
+    assert ara_star(GridMap(walled), start, goal, max_expansions=10**6) is None
+    with pytest.raises(ValueError):
+        plan_path(grid, start, goal, "astar", deadline_ms=5.0)
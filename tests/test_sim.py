@@ -0,0 +1,71 @@
+import pytest
+
+from navsim.control import PurePursuitParams
+from navsim.costmap import CostMap
+from navsim.dynamic import DynamicObstacleField
+from navsim.local_planner import DWAParams
+from navsim.map import GridMap, demo_grid
+from navsim.sim import (
+    DWAController,
+    DynamicWorld,
+    PurePursuitController,
+    SimParams,
+    Simulator,
+    simulate_path,
+)
+
+
+def test_simulator_steps_until_goal():
+    path = [(0.0, 0.0), (1.0, 0.0), (2.0, 0.0)]
+    sim = Simulator(path, (0.0, 0.0, 0.0), SimParams(), PurePursuitController(PurePursuitParams()))
+    assert sim.step()
+    assert sim.count == 2
+    sim.run()
+    assert sim.done
+    assert not sim.step()
+    assert sim.true_poses == simulate_path(path, (0.0, 0.0, 0.0), SimParams(), PurePursuitParams())
+    assert abs(sim.pose[0] - 2.0) <= SimParams().goal_tolerance
+    assert set(sim.stage_seconds) == {"world", "control", "estimate"}
+
+
+def test_simulator_respects_max_steps():
+    path = [(0.0, 0.0), (50.0, 0.0)]
+    sim = Simulator(
+        path, (0.0, 0.0, 0.0), SimParams(max_steps=5), PurePursuitController(PurePursuitParams())
+    ).run()
+    assert len(sim.true_poses) == 6
+
+
+def test_stuck_dwa_controller_stops_run():
+    grid = GridMap([[0, 1, 0], [1, 1, 0], [0, 0, 0]])
+    costmap = CostMap.from_grid(grid, 0.0)
+    path = [(0.0, 0.0), (2.0, 2.0)]
+    controller = DWAController(DWAParams(omega_max=0.0), stuck_limit=3)
+    sim = Simulator(path, (0.0, 0.0, 0.0), SimParams(), controller, costmap=costmap).run()
+    assert controller.stuck_steps == 3
+    assert sim.count == 3
+
+
+def test_budgeted_replan_keeps_path_until_a_pass_finishes():
+    grid = demo_grid()
+    path = [(0.0, 0.0), (1.0, 0.0)]
+    sim = Simulator(path, (0.0, 0.0, 0.0), SimParams(), PurePursuitController(PurePursuitParams()))
+    world = DynamicWorld(
+        grid, 0.0, DynamicObstacleField([]), (9, 9), 1, 10, "ara", replan_budget_ms=0.0
+    )
+    world.steps_since_replan = 1
+    assert world.update(sim)
+    assert sim.path == path and world.replans == 0
+    world.replan_budget_ms = 50.0
+    assert world.update(sim)
+    assert world.replans == 1 and sim.path[-1] == (9.0, 9.0)
+
+    # An unreachable goal still ends the run instead of retrying every tick.
+    walled = GridMap([[0, 1, 0], [0, 1, 0], [0, 1, 0]])
+    world = DynamicWorld(
+        walled, 0.0, DynamicObstacleField([]), (2, 0), 1, 10, "ara", replan_budget_ms=50.0
+    )
+    world.steps_since_replan = 1
+    assert not world.update(sim)
+    with pytest.raises(ValueError):
+        DynamicWorld(grid, 0.0, DynamicObstacleField([]), (9, 9), 1, 10, "astar", False, 5.0)